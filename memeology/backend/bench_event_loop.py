@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Event-loop responsiveness under a slow XRPL node
+- Starts a local fake rippled JSON-RPC server that answers account_lines
+  after --xrpl-delay-ms
+- Runs the API in-process (lifespan included) and fires --requests
+  /api/wallet/balance calls, --concurrency at a time
+- Meanwhile a probe measures event-loop lag (how late a 10 ms sleep wakes
+  up) and the latency of GET / , which never touches XRPL
+- `--blocking` swaps in the old synchronous JsonRpcClient.request() call for
+  comparison
+
+With XRPL reads on the async client, loop lag and GET / latency should stay
+flat however slow the node is; with --blocking they grow with the delay.
+
+Examples:
+  python bench_event_loop.py
+  python bench_event_loop.py --blocking
+  python bench_event_loop.py --xrpl-delay-ms 2000 --requests 100 --concurrency 50
+  python bench_event_loop.py --save loop.json
+  python bench_event_loop.py --baseline loop.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+WLO_ISSUER = "rN7n7otQDd6FczFgLdlqtyMVrn3NnrcVcU"
+
+
+class FakeRippled:
+    """account_lines / account_nfts / tx with a fixed delay, on a thread per request"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.bytes_sent = 0
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "FakeRippled":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_POST(self):
+                rpc = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.calls += 1
+                time.sleep(fake.delay)
+                body = json.dumps({"result": fake.handle(rpc)}).encode()
+                fake.bytes_sent += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128  # bursts of new connections when the pool is cold
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+    @staticmethod
+    def handle(rpc: dict) -> dict:
+        account = rpc["params"][0].get("account", "")
+        if rpc["method"] == "account_lines":
+            return {"status": "success", "account": account, "lines": [
+                {"account": WLO_ISSUER, "currency": "WLO", "balance": "1500"}]}
+        if rpc["method"] == "account_nfts":
+            return {"status": "success", "account": account, "account_nfts": []}
+        return {"status": "error", "error": "unknownCmd"}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summary_ms(values: List[float]) -> Dict[str, float]:
+    return {"p50": round(percentile(values, 50) * 1000, 2), "p99": round(percentile(values, 99) * 1000, 2),
+            "max": round(max(values, default=0.0) * 1000, 2)}
+
+
+async def probe_loop(stop: asyncio.Event, lags: List[float], interval: float = 0.01):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def probe_root(client, stop: asyncio.Event, latencies: List[float], interval: float = 0.02):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+def use_blocking_client(xrpl_rpc):
+    """Replace xrpl_rpc.request with the pre-change behaviour: a sync JsonRpcClient on the loop
+
+    JsonRpcClient.request() runs its own asyncio.run(), which refuses to start
+    inside a running loop, so it is run on a worker thread that the loop then
+    waits on synchronously, stalling the loop for the round trip just as a
+    plain blocking call would.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from xrpl.clients import JsonRpcClient
+
+    pool = ThreadPoolExecutor(max_workers=1)
+
+    async def blocking_request(req, timeout=None, url=None):
+        return pool.submit(JsonRpcClient(url or xrpl_rpc.XRPL_SERVER).request, req).result()
+    xrpl_rpc.request = blocking_request
+
+
+async def run(args, fake: FakeRippled) -> dict:
+    import httpx
+    import main
+    import xrpl_rpc
+
+    if args.blocking:
+        use_blocking_client(xrpl_rpc)
+    # An empty, fresh template catalog keeps the lifespan's refresher from calling Imgflip
+    main.catalog._install([], time.time())
+
+    lags: List[float] = []
+    root_latencies: List[float] = []
+    balance_latencies: List[float] = []
+    failures = 0
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Idle baseline first, so the numbers below can be read against it
+        idle: List[float] = []
+        idle_stop = asyncio.Event()
+        idle_probe = asyncio.create_task(probe_loop(idle_stop, idle))
+        await asyncio.sleep(0.5)
+        idle_stop.set()
+        await idle_probe
+
+        probes = [asyncio.create_task(probe_loop(stop, lags)),
+                  asyncio.create_task(probe_root(client, stop, root_latencies))]
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def balance(i: int):
+            nonlocal failures
+            async with sem:
+                started = time.perf_counter()
+                res = await client.get("/api/wallet/balance", params={"address": f"rBench{i}"})
+                balance_latencies.append(time.perf_counter() - started)
+                if not res.json().get("success"):
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(balance(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*probes)
+
+    return {
+        "mode": "blocking" if args.blocking else "async",
+        "xrpl_delay_ms": args.xrpl_delay_ms,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "balance_per_s": round(args.requests / elapsed, 1),
+        "idle_loop_lag_ms": summary_ms(idle),
+        "loop_lag_ms": summary_ms(lags),
+        "root_latency_ms": summary_ms(root_latencies),
+        "balance_latency_ms": summary_ms(balance_latencies),
+        "xrpl_calls": fake.calls,
+    }
+
+
+def print_report(result: dict, baseline: Optional[dict]):
+    def line(label: str, key: str):
+        current = result[key]
+        text = f"p50 {current['p50']:.2f} ms, p99 {current['p99']:.2f} ms, max {current['max']:.2f} ms"
+        if baseline and key in baseline:
+            text += f"  (baseline p99 {baseline[key]['p99']:.2f} ms)"
+        print(f"   {label:<20} {text}")
+
+    print(f"🐢 XRPL delay {result['xrpl_delay_ms']} ms, {result['requests']} balance requests, "
+          f"{result['concurrency']} concurrent, {result['mode']} XRPL client")
+    print(f"🚀 {result['balance_per_s']} balance/s in {result['elapsed_s']}s, {result['failures']} failed, "
+          f"{result['xrpl_calls']} XRPL calls")
+    line("loop lag (idle)", "idle_loop_lag_ms")
+    line("loop lag (load)", "loop_lag_ms")
+    line("GET / latency", "root_latency_ms")
+    line("balance latency", "balance_latency_ms")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Measure event-loop lag while XRPL is slow")
+    ap.add_argument("--xrpl-delay-ms", type=float, default=500, help="Fake rippled response delay")
+    ap.add_argument("--requests", type=int, default=40, help="Balance requests to send")
+    ap.add_argument("--concurrency", type=int, default=20, help="Balance requests in flight")
+    ap.add_argument("--blocking", action="store_true", help="Use the old synchronous JsonRpcClient call")
+    ap.add_argument("--save", help="Write the result as JSON to this path")
+    ap.add_argument("--baseline", help="Compare against a result saved with --save")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    fake = FakeRippled(args.xrpl_delay_ms / 1000).start()
+    os.environ["XRPL_SERVER"] = fake.url
+    os.environ.setdefault("XRPL_MAX_CONCURRENCY", str(args.concurrency))
+    os.environ.setdefault("XRPL_QUEUE_TIMEOUT", "60")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    try:
+        result = asyncio.run(run(args, fake))
+    finally:
+        fake.stop()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved result to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+/api/user/nfts against fake IPFS gateways
+- A fake rippled returns --nfts NFTs with ipfs:// metadata URIs (and
+  --broken of them pointing at content no gateway has)
+- Three fake gateways: "slow" (--slow-ms, first in IPFS_GATEWAYS, like
+  ipfs.io was), "fast" (--fast-ms) and "down" (503s)
+- Calls /api/user/nfts cold, then warm, and reports latency, gateway hits
+  and whether every NFT resolved
+- `--legacy` uses the slow gateway only with NFT_METADATA_CONCURRENCY=1,
+  i.e. the old one-at-a-time fetch through a single gateway
+- `--stream ndjson|sse` reads the streamed form instead and also reports
+  the time to the first NFT; `--limit` asks for only the first N
+
+Examples:
+  python bench_nft_metadata.py
+  python bench_nft_metadata.py --legacy
+  python bench_nft_metadata.py --nfts 300 --slow-ms 800
+  python bench_nft_metadata.py --nfts 3000 --stream ndjson
+  python bench_nft_metadata.py --nfts 3000 --stream sse --limit 24
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_event_loop import FakeRippled
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+
+
+def cid(i: int) -> str:
+    return "Qm" + hashlib.sha256(str(i).encode()).hexdigest()[:44]
+
+
+class NFTNode(FakeRippled):
+    def __init__(self, nfts: int, broken: int):
+        super().__init__(0.0)
+        self.nfts = [{"NFTokenID": f"{i:064X}", "Issuer": WALLET, "Flags": 8, "nft_serial": i,
+                      "URI": f"ipfs://{cid(-i if i < broken else i)}/metadata.json".encode().hex().upper()}
+                     for i in range(nfts)]
+
+    def handle(self, rpc: dict) -> dict:
+        params = rpc["params"][0]
+        if rpc["method"] != "account_nfts":
+            return {"status": "error", "error": "unknownCmd"}
+        # rippled pages account_nfts: limit 20-400 (default 100), opaque marker
+        limit = max(20, min(int(params.get("limit", 100)), 400))
+        start = int(params.get("marker", 0))
+        result = {"status": "success", "account": params["account"], "account_nfts": self.nfts[start:start + limit],
+                  "ledger_index": 90000000, "validated": True}
+        if start + limit < len(self.nfts):
+            result["marker"] = str(start + limit)
+        return result
+
+
+class FakeGateway:
+    def __init__(self, known: set, delay: float, status: int = 200):
+        self.known = known
+        self.delay = delay
+        self.status = status
+        self.hits = Counter()
+
+    def start(self) -> "FakeGateway":
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                time.sleep(gateway.delay)
+                content = self.path.split("/")[2]
+                known = gateway.status == 200 and content in gateway.known
+                gateway.hits["ok" if known else "miss"] += 1
+                if known:
+                    body = json.dumps({"name": f"Waldo #{content[:6]}", "image": f"ipfs://{content}/image.png",
+                                       "collection": "Bench"}).encode()
+                    status = 200
+                else:
+                    body = b'{"error": "not found"}'
+                    status = gateway.status if gateway.status != 200 else 404
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128
+
+            def handle_error(self, request, client_address):
+                pass  # losing requests of a race are cancelled mid-response
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def stop(self):
+        self.server.shutdown()
+
+
+async def read_stream(client, params: dict) -> dict:
+    """Time to the first NFT and to the "done" event of a streamed listing"""
+    started = time.perf_counter()
+    first, done = None, None
+    async with client.stream("GET", "/api/user/nfts", params=params) as res:
+        async for line in res.aiter_lines():
+            if params["format"] == "sse":
+                if not line.startswith("data: "):
+                    continue
+                line = line[len("data: "):]
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "nft" and first is None:
+                first = time.perf_counter() - started
+            elif event["type"] == "done":
+                done = event
+    return {"ms": round((time.perf_counter() - started) * 1000, 1), "nfts_with_images": done["count"],
+            "total_nfts": done["total_nfts"], "first_ms": round(first * 1000, 1) if first is not None else None}
+
+
+async def run(args) -> dict:
+    import httpx
+    import uvicorn
+    import main
+
+    main.catalog._install([], time.time())
+    results = {}
+    # A real server: httpx's ASGITransport buffers whole responses, hiding the streaming
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+        params = {"wallet_address": WALLET}
+        if args.limit:
+            params["limit"] = args.limit
+        for label in ("cold", "warm"):
+            if args.stream:
+                results[label] = await read_stream(client, {**params, "format": args.stream})
+                continue
+            started = time.perf_counter()
+            res = await client.get("/api/user/nfts", params=params)
+            elapsed = time.perf_counter() - started
+            body = res.json()
+            results[label] = {"ms": round(elapsed * 1000, 1), "nfts_with_images": body["count"],
+                              "total_nfts": body["total_nfts"], "first_ms": None}
+        results["cache"] = main.nft_metadata.stats()
+    server.should_exit = True
+    await serving
+    return results
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="NFT metadata resolution latency")
+    ap.add_argument("--nfts", type=int, default=100)
+    ap.add_argument("--broken", type=int, default=5, help="NFTs whose metadata no gateway has")
+    ap.add_argument("--slow-ms", type=float, default=400)
+    ap.add_argument("--fast-ms", type=float, default=60)
+    ap.add_argument("--legacy", action="store_true", help="One gateway, one fetch at a time")
+    ap.add_argument("--stream", choices=("ndjson", "sse"), help="Read the streamed listing")
+    ap.add_argument("--limit", type=int, help="Only the first N NFTs")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    node = NFTNode(args.nfts, args.broken).start()
+    known = {cid(i) for i in range(args.broken, args.nfts)}
+    slow = FakeGateway(known, args.slow_ms / 1000).start()
+    fast = FakeGateway(known, args.fast_ms / 1000).start()
+    down = FakeGateway(known, 0.01, 503).start()
+
+    os.environ["XRPL_SERVER"] = node.url
+    os.environ["XRPL_WS_SERVER"] = ""
+    os.environ.setdefault("HTTP_MAX_PER_HOST", "32")
+    if args.legacy:
+        os.environ["IPFS_GATEWAYS"] = slow.url
+        os.environ["NFT_METADATA_CONCURRENCY"] = "1"
+    else:
+        os.environ["IPFS_GATEWAYS"] = ",".join(g.url for g in (slow, down, fast))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        for server in (node, slow, fast, down):
+            server.stop()
+
+    print(f"🖼️  {args.nfts} NFTs ({args.broken} broken), gateways: slow {args.slow_ms:.0f} ms, "
+          f"fast {args.fast_ms:.0f} ms, down{' (legacy: slow only, sequential)' if args.legacy else ''}")
+    for label in ("cold", "warm"):
+        r = results[label]
+        first = f", first NFT after {r['first_ms']:.1f} ms" if r["first_ms"] is not None else ""
+        print(f"   {label:<5} {r['ms']:>9.1f} ms, {r['nfts_with_images']}/{r['total_nfts']} NFTs with images{first}")
+    print(f"   gateway requests: slow {sum(slow.hits.values())}, fast {sum(fast.hits.values())}, "
+          f"down {sum(down.hits.values())}")
+    cache = results["cache"]
+    print(f"📊 fetches {cache['fetches']}, failures {cache['failures']}, hits {cache['hits']} "
+          f"(negative {cache['negative_hits']}), gateways {json.dumps(cache['gateways'])}")
+
+
+if __name__ == "__main__":
+    main()
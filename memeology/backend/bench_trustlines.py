@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+WLO balance lookup against a wallet with thousands of trustlines
+- Fake rippled holding --trustlines lines for one wallet, the WLO line at
+  --wlo-position (default: the last one), honouring peer / limit / marker
+  like rippled (default page 200, max 400)
+- Runs --lookups balance lookups three ways:
+  - unfiltered: the old AccountLines(account) call, first page only
+  - all-pages: unfiltered, following every marker (correct, but heavy)
+  - peer: main.get_wallet_balance (peer=WLO issuer, validated ledger)
+- Reports bytes received per lookup, latency, and whether the WLO balance
+  was found
+
+Examples:
+  python bench_trustlines.py
+  python bench_trustlines.py --trustlines 20000 --lookups 50
+  python bench_trustlines.py --wlo-position 0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+from bench_event_loop import WLO_ISSUER, FakeRippled, summary_ms
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+WLO_BALANCE = "1234.5"
+VALIDATED_LEDGER = 90000000
+
+
+class TrustlineNode(FakeRippled):
+    def __init__(self, delay: float, trustlines: int, wlo_position: int):
+        super().__init__(delay)
+        self.lines: List[dict] = [
+            {"account": f"rIssuer{i:06d}", "currency": f"T{i % 1000:02d}", "balance": "10", "limit": "1000000",
+             "limit_peer": "0", "quality_in": 0, "quality_out": 0, "no_ripple": True, "no_ripple_peer": False}
+            for i in range(trustlines - 1)
+        ]
+        wlo_line = dict(self.lines[0] if self.lines else {}, account=WLO_ISSUER, currency="WLO", balance=WLO_BALANCE)
+        self.lines.insert(min(wlo_position, len(self.lines)), wlo_line)
+
+    def handle(self, rpc: dict) -> dict:
+        params = rpc["params"][0]
+        if rpc["method"] != "account_lines":
+            return {"status": "error", "error": "unknownCmd"}
+        lines = self.lines
+        if params.get("peer"):
+            lines = [line for line in lines if line["account"] == params["peer"]]
+        limit = max(10, min(int(params.get("limit", 200)), 400))
+        start = int(params.get("marker", 0))
+        page = lines[start:start + limit]
+        result = {"status": "success", "account": params["account"], "lines": page,
+                  "ledger_index": VALIDATED_LEDGER, "validated": True}
+        if start + limit < len(lines):
+            result["marker"] = str(start + limit)
+        return result
+
+
+async def unfiltered(xrpl_rpc, follow_markers: bool) -> float:
+    from xrpl.models.requests import AccountLines
+
+    req = AccountLines(account=WALLET)
+    if follow_markers:
+        responses = [page async for page in xrpl_rpc.pages(req, max_pages=10 ** 6)]
+    else:
+        responses = [await xrpl_rpc.request(req)]
+    for response in responses:
+        for line in response.result.get("lines", []):
+            if line.get("currency") == "WLO" and line.get("account") == WLO_ISSUER:
+                return float(line["balance"])
+    return 0.0
+
+
+async def run(args, node: TrustlineNode) -> Dict[str, dict]:
+    import main
+    import xrpl_rpc
+
+    modes = {
+        "unfiltered": lambda: unfiltered(xrpl_rpc, follow_markers=False),
+        "all-pages": lambda: unfiltered(xrpl_rpc, follow_markers=True),
+        "peer": lambda: main.get_wallet_balance(WALLET),
+    }
+    results = {}
+    for name, lookup in modes.items():
+        calls, sent = node.calls, node.bytes_sent
+        latencies, found = [], 0
+        for _ in range(args.lookups):
+            started = time.perf_counter()
+            balance = await lookup()
+            latencies.append(time.perf_counter() - started)
+            if isinstance(balance, dict):
+                balance = balance["wlo_balance"]
+            found += balance == float(WLO_BALANCE)
+        results[name] = {
+            "requests_per_lookup": (node.calls - calls) / args.lookups,
+            "kb_per_lookup": round((node.bytes_sent - sent) / args.lookups / 1024, 1),
+            "latency_ms": summary_ms(latencies),
+            "found": f"{found}/{args.lookups}",
+        }
+    return results
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Trustline payload and latency for WLO balance lookups")
+    ap.add_argument("--trustlines", type=int, default=5000, help="Trustlines on the wallet")
+    ap.add_argument("--wlo-position", type=int, default=10 ** 9, help="Index of the WLO line (default last)")
+    ap.add_argument("--lookups", type=int, default=20)
+    ap.add_argument("--xrpl-delay-ms", type=float, default=5, help="Fake node delay per request")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    node = TrustlineNode(args.xrpl_delay_ms / 1000, args.trustlines, args.wlo_position).start()
+    os.environ["XRPL_SERVER"] = node.url
+    os.environ["XRPL_WS_SERVER"] = ""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        results = asyncio.run(run(args, node))
+    finally:
+        node.stop()
+
+    print(f"🔗 {args.trustlines} trustlines, WLO line at position {min(args.wlo_position, args.trustlines - 1)}, "
+          f"{args.lookups} lookups per mode")
+    for name, r in results.items():
+        lat = r["latency_ms"]
+        print(f"   {name:<11} {r['requests_per_lookup']:>5.1f} req, {r['kb_per_lookup']:>8.1f} KB, "
+              f"p50 {lat['p50']:.2f} ms, p99 {lat['p99']:.2f} ms, WLO found {r['found']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Wallet tier cache against a local fake rippled
+- JSON-RPC (account_lines, from bench_event_loop.FakeRippled) answers after
+  --xrpl-delay-ms; a websocket endpoint records subscribe/unsubscribe
+  commands and can push transactions
+- Runs the API in-process (lifespan included) and calls /api/user/tier
+  --rounds times for each of --wallets wallets
+- Then pushes a validated Payment touching one wallet over the stream and
+  checks that its next tier check goes back to XRPL while the others stay
+  cached
+
+Examples:
+  python bench_wallet_cache.py
+  python bench_wallet_cache.py --wallets 200 --rounds 20 --xrpl-delay-ms 100
+  python bench_wallet_cache.py --no-cache   # WALLET_CACHE_TTL=0, every check hits XRPL
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List, Set
+
+from bench_event_loop import WLO_ISSUER, FakeRippled, summary_ms
+
+
+class FakeStream:
+    """rippled's websocket subscribe API, as far as the wallet cache uses it"""
+
+    def __init__(self):
+        self.subscribed: Set[str] = set()
+        self.commands: List[dict] = []
+        self.sockets = set()
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def start(self) -> "FakeStream":
+        import websockets
+
+        async def handler(ws, *args):
+            self.sockets.add(ws)
+            try:
+                async for raw in ws:
+                    command = json.loads(raw)
+                    self.commands.append(command)
+                    if command["command"] == "subscribe":
+                        self.subscribed.update(command["accounts"])
+                    elif command["command"] == "unsubscribe":
+                        self.subscribed.difference_update(command["accounts"])
+                    await ws.send(json.dumps({"type": "response", "status": "success", "result": {}}))
+            finally:
+                self.sockets.discard(ws)
+
+        self.server = await websockets.serve(handler, "127.0.0.1", 0)
+        return self
+
+    async def push_payment(self, source: str, destination: str, amount: str):
+        message = {
+            "type": "transaction",
+            "validated": True,
+            "engine_result": "tesSUCCESS",
+            "transaction": {"TransactionType": "Payment", "Account": source, "Destination": destination,
+                            "Amount": {"currency": "WLO", "issuer": WLO_ISSUER, "value": amount}},
+            "meta": {"AffectedNodes": [{"ModifiedNode": {
+                "LedgerEntryType": "RippleState",
+                "FinalFields": {"HighLimit": {"issuer": destination, "currency": "WLO", "value": "0"},
+                                "LowLimit": {"issuer": WLO_ISSUER, "currency": "WLO", "value": "0"}}}}],
+                "TransactionResult": "tesSUCCESS"},
+        }
+        for ws in list(self.sockets):
+            await ws.send(json.dumps(message))
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+async def run(args, rippled: FakeRippled) -> dict:
+    import httpx
+
+    stream = await FakeStream().start()
+    os.environ["XRPL_WS_SERVER"] = stream.url
+    import main
+    from wallet_cache import cache
+
+    main.catalog._install([], time.time())
+    wallets = [f"rWallet{i:05d}" for i in range(args.wallets)]
+    first, warm = [], []
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def tier(wallet: str) -> float:
+            started = time.perf_counter()
+            res = await client.get("/api/user/tier", params={"wallet": wallet})
+            assert res.json()["tier"] == "waldocoin", res.text
+            return time.perf_counter() - started
+
+        for rnd in range(args.rounds):
+            latencies = await asyncio.gather(*(tier(w) for w in wallets))
+            (first if rnd == 0 else warm).extend(latencies)
+        calls_before = rippled.calls
+
+        invalidation = None
+        if not args.no_cache:
+            await wait_for(lambda: set(wallets) <= stream.subscribed)
+            await stream.push_payment("rSomeoneElse", wallets[0], "25")
+            await wait_for(lambda: cache.counters["invalidated"] > 0)
+            await asyncio.gather(*(tier(w) for w in wallets))
+            invalidation = {"xrpl_calls_after_push": rippled.calls - calls_before,
+                            "subscribed": len(stream.subscribed)}
+
+    await stream.stop()
+    return {
+        "wallets": args.wallets,
+        "rounds": args.rounds,
+        "cache": not args.no_cache,
+        "xrpl_delay_ms": args.xrpl_delay_ms,
+        "xrpl_calls": calls_before,
+        "first_check_ms": summary_ms(first),
+        "repeat_check_ms": summary_ms(warm),
+        "invalidation": invalidation,
+        "cache_stats": cache.stats(),
+    }
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Tier check latency with the wallet cache")
+    ap.add_argument("--wallets", type=int, default=50)
+    ap.add_argument("--rounds", type=int, default=10, help="Tier checks per wallet")
+    ap.add_argument("--xrpl-delay-ms", type=float, default=50, help="Fake rippled response delay")
+    ap.add_argument("--no-cache", action="store_true", help="Set WALLET_CACHE_TTL=0")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    rippled = FakeRippled(args.xrpl_delay_ms / 1000).start()
+    os.environ["XRPL_SERVER"] = rippled.url
+    os.environ.setdefault("XRPL_MAX_CONCURRENCY", "64")
+    os.environ.setdefault("XRPL_QUEUE_TIMEOUT", "60")
+    os.environ.setdefault("HTTP_MAX_PER_HOST", "64")
+    if args.no_cache:
+        os.environ["WALLET_CACHE_TTL"] = "0"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        result = asyncio.run(run(args, rippled))
+    finally:
+        rippled.stop()
+
+    print(f"👛 {result['wallets']} wallets x {result['rounds']} tier checks, XRPL delay {result['xrpl_delay_ms']} ms, "
+          f"cache {'on' if result['cache'] else 'off'}")
+    print(f"📡 {result['xrpl_calls']} XRPL calls for {result['wallets'] * result['rounds']} tier checks")
+    for label, key in (("first check", "first_check_ms"), ("repeat checks", "repeat_check_ms")):
+        s = result[key]
+        print(f"   {label:<14} p50 {s['p50']:.2f} ms, p99 {s['p99']:.2f} ms, max {s['max']:.2f} ms")
+    if result["invalidation"]:
+        inv = result["invalidation"]
+        print(f"🔔 Payment to one wallet pushed: {inv['xrpl_calls_after_push']} XRPL call(s) on the next "
+              f"round, {inv['subscribed']} accounts subscribed")
+    print(f"📊 {json.dumps(result['cache_stats'])}")
+
+
+if __name__ == "__main__":
+    main()
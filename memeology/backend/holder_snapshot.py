@@ -0,0 +1,50 @@
+"""
+WLO balances from the bot's holder snapshot (waldo-twitter-bot/waldo_core/holders.py).
+
+The bot periodically pages through every trustline of the issuer and writes
+each holder's balance to the shared Redis:
+
+  {holders}:balances   sorted set, wallet -> WLO balance (holders only)
+  {holders}:meta       ledger_index, finished_at, ...
+
+`balance(wallet)` reads a wallet's balance from there in one round trip,
+so a tier check needs no XRPL query. It returns None when REDIS_URL is not
+set, no snapshot exists, or the last one is older than
+HOLDER_SNAPSHOT_MAX_AGE seconds; callers then ask XRPL. A wallet missing
+from a fresh snapshot holds no WLO.
+"""
+import os
+import time
+from typing import NamedTuple, Optional
+
+import redis_store
+
+BALANCES_KEY = "{holders}:balances"
+META_KEY = "{holders}:meta"
+HOLDER_SNAPSHOT_MAX_AGE = float(os.getenv("HOLDER_SNAPSHOT_MAX_AGE", "1800"))
+
+
+class SnapshotBalance(NamedTuple):
+    wlo_balance: float
+    ledger_index: int
+    finished_at: float
+
+
+async def balance(wallet: str) -> Optional[SnapshotBalance]:
+    r = redis_store.client()
+    if r is None:
+        return None
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.hmget(META_KEY, "ledger_index", "finished_at")
+        pipe.zscore(BALANCES_KEY, wallet)
+        (ledger_index, finished_at), score = await pipe.execute()
+    except Exception as e:
+        print(f"⚠️ Could not read holder snapshot from Redis: {e}")
+        return None
+    if not finished_at:
+        return None
+    finished_at = float(finished_at)
+    if time.time() - finished_at > HOLDER_SNAPSHOT_MAX_AGE:
+        return None
+    return SnapshotBalance(float(score or 0), int(ledger_index or 0), finished_at)
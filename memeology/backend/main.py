@@ -4,19 +4,43 @@ FastAPI server for meme generation and AI suggestions
 Part of WALDO LABS ecosystem
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import httpx
 import os
+from contextlib import aclosing, asynccontextmanager
 from typing import Optional, Dict
-from xrpl.clients import JsonRpcClient
 from xrpl.models.requests import AccountNFTs, AccountLines, AccountInfo
 from xrpl.wallet import Wallet
 import json
 import uuid
-
-app = FastAPI(title="Memeology API", description="AI-Powered Meme Generator by WALDO LABS")
+import asyncio
+import outbound
+import profiler
+import holder_snapshot
+import nft_listing
+import nft_metadata
+import redis_store
+import xrpl_rpc
+from wallet_cache import cache as wallet_cache, XRPL_WS_SERVER
+from template_catalog import CACHE_CONTROL, CatalogUnavailable, catalog
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for all outbound HTTP (see outbound.py)
+    await outbound.start()
+    refresher = asyncio.create_task(catalog.run())
+    # Drops cached wallet tiers as soon as their transactions validate (see wallet_cache.py)
+    tx_stream = asyncio.create_task(wallet_cache.run()) if XRPL_WS_SERVER else None
+    yield
+    refresher.cancel()
+    if tx_stream:
+        tx_stream.cancel()
+    await outbound.aclose()
+    await redis_store.aclose()
+
+app = FastAPI(title="Memeology API", description="AI-Powered Meme Generator by WALDO LABS", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -44,12 +68,16 @@ IMGFLIP_USERNAME = os.getenv("IMGFLIP_USERNAME")
 IMGFLIP_PASSWORD = os.getenv("IMGFLIP_PASSWORD")
 
 # XRPL Configuration
-XRPL_SERVER = os.getenv("XRPL_SERVER", "https://s1.ripple.com:51234")  # Mainnet
-# XRPL_SERVER = "https://s.altnet.rippletest.net:51234"  # Testnet
+# XRPL node: XRPL_SERVER, read in xrpl_rpc.py (mainnet by default;
+# testnet is https://s.altnet.rippletest.net:51234)
 
 # WALDOCOIN Token Configuration
 WLO_ISSUER = os.getenv("WLO_ISSUER", "rN7n7otQDd6FczFgLdlqtyMVrn3NnrcVcU")  # WALDOCOIN issuer
 WLO_CURRENCY = "WLO"
+# WLO held for the WALDOCOIN tier (the bot's holder snapshot uses the same threshold)
+WALDOCOIN_TIER_MIN = 1000
+# Trustlines per account_lines page; with the WLO peer filter one page is almost always enough
+ACCOUNT_LINES_PAGE_SIZE = int(os.getenv("ACCOUNT_LINES_PAGE_SIZE", "10"))
 
 # XUMM API Configuration (for wallet login)
 XUMM_API_KEY = os.getenv("XUMM_API_KEY", "")
@@ -92,44 +120,43 @@ async def xumm_login():
         # Create XUMM sign-in request
         session_uuid = str(uuid.uuid4())
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://xumm.app/api/v1/platform/payload",
-                headers={
-                    "X-API-Key": XUMM_API_KEY,
-                    "X-API-Secret": XUMM_API_SECRET,
-                    "Content-Type": "application/json"
+        response = await outbound.post(
+            "https://xumm.app/api/v1/platform/payload",
+            headers={
+                "X-API-Key": XUMM_API_KEY,
+                "X-API-Secret": XUMM_API_SECRET,
+                "Content-Type": "application/json"
+            },
+            json={
+                "txjson": {
+                    "TransactionType": "SignIn"
                 },
-                json={
-                    "txjson": {
-                        "TransactionType": "SignIn"
-                    },
-                    "options": {
-                        "submit": False,
-                        "return_url": {
-                            "web": "https://memeology.fun"
-                        }
+                "options": {
+                    "submit": False,
+                    "return_url": {
+                        "web": "https://memeology.fun"
                     }
                 }
-            )
+            }
+        )
 
-            data = response.json()
+        data = response.json()
 
-            if data.get("uuid"):
-                xumm_sessions[session_uuid] = {
-                    "xumm_uuid": data["uuid"],
-                    "created_at": "now",
-                    "signed": False
-                }
+        if data.get("uuid"):
+            xumm_sessions[session_uuid] = {
+                "xumm_uuid": data["uuid"],
+                "created_at": "now",
+                "signed": False
+            }
 
-                return {
-                    "success": True,
-                    "uuid": session_uuid,
-                    "qr_url": data["refs"]["qr_png"],
-                    "websocket_url": data["refs"]["websocket_status"]
-                }
-            else:
-                raise HTTPException(status_code=500, detail="Failed to create XUMM payload")
+            return {
+                "success": True,
+                "uuid": session_uuid,
+                "qr_url": data["refs"]["qr_png"],
+                "websocket_url": data["refs"]["websocket_status"]
+            }
+        else:
+            raise HTTPException(status_code=500, detail="Failed to create XUMM payload")
     except Exception as e:
         return {
             "success": False,
@@ -150,39 +177,38 @@ async def xumm_status(uuid: str):
         if not XUMM_API_KEY or not XUMM_API_SECRET:
             return {"success": False, "error": "XUMM not configured"}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://xumm.app/api/v1/platform/payload/{xumm_uuid}",
-                headers={
-                    "X-API-Key": XUMM_API_KEY,
-                    "X-API-Secret": XUMM_API_SECRET
-                }
-            )
+        response = await outbound.get(
+            f"https://xumm.app/api/v1/platform/payload/{xumm_uuid}",
+            headers={
+                "X-API-Key": XUMM_API_KEY,
+                "X-API-Secret": XUMM_API_SECRET
+            }
+        )
 
-            data = response.json()
+        data = response.json()
 
-            if data.get("meta", {}).get("signed"):
-                account = data["response"]["account"]
-                xumm_sessions[uuid]["signed"] = True
-                xumm_sessions[uuid]["account"] = account
+        if data.get("meta", {}).get("signed"):
+            account = data["response"]["account"]
+            xumm_sessions[uuid]["signed"] = True
+            xumm_sessions[uuid]["account"] = account
 
-                return {
-                    "success": True,
-                    "signed": True,
-                    "account": account
-                }
-            elif data.get("meta", {}).get("cancelled"):
-                return {
-                    "success": True,
-                    "signed": False,
-                    "rejected": True
-                }
-            else:
-                return {
-                    "success": True,
-                    "signed": False,
-                    "pending": True
-                }
+            return {
+                "success": True,
+                "signed": True,
+                "account": account
+            }
+        elif data.get("meta", {}).get("cancelled"):
+            return {
+                "success": True,
+                "signed": False,
+                "rejected": True
+            }
+        else:
+            return {
+                "success": True,
+                "signed": False,
+                "pending": True
+            }
     except Exception as e:
         return {
             "success": False,
@@ -190,77 +216,20 @@ async def xumm_status(uuid: str):
         }
 
 @app.get("/api/templates/imgflip")
-async def get_imgflip_templates(tier: str = "free"):
-    """Fetch popular meme templates from Imgflip
+async def get_imgflip_templates(tier: str = "free", if_none_match: Optional[str] = Header(None)):
+    """Popular meme templates from Imgflip, sliced for the tier (see template_catalog.tier_payload)
 
-    Tiers:
-    - free: 50 templates, no fees
-    - waldocoin: 150 templates, small WLO fees (0.1 WLO per meme), NFT art integration
-    - premium: ALL 200+ templates, unlimited memes, no fees, $5/month (WLO/XRP/Credit), NFT art integration
+    Served from the cached catalog with an ETag, so clients revalidate with
+    If-None-Match and get a 304 while it is unchanged.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://api.imgflip.com/get_memes")
-            data = response.json()
-
-            if data.get("success"):
-                all_memes = data["data"]["memes"]
-                total_count = len(all_memes)
-
-                if tier == "premium":
-                    # Premium tier: ALL templates, unlimited, no fees
-                    return {
-                        "memes": all_memes,
-                        "count": total_count,
-                        "tier": "premium",
-                        "features": {
-                            "templates": "unlimited",
-                            "memes_per_day": "unlimited",
-                            "fee_per_meme": "none",
-                            "ai_suggestions": "unlimited",
-                            "custom_fonts": True,
-                            "no_watermark": True,
-                            "nft_art_integration": True
-                        }
-                    }
-                elif tier == "waldocoin":
-                    # WALDOCOIN tier: 150 templates, small fees
-                    return {
-                        "memes": all_memes[:150],
-                        "count": 150,
-                        "tier": "waldocoin",
-                        "features": {
-                            "templates": 150,
-                            "memes_per_day": "unlimited",
-                            "fee_per_meme": "0.1 WLO",
-                            "ai_suggestions": "50/day",
-                            "custom_fonts": True,
-                            "no_watermark": False,
-                            "nft_art_integration": True
-                        },
-                        "upgrade_message": f"⬆️ Upgrade to Premium for {total_count - 150} more templates and no fees!"
-                    }
-                else:
-                    # Free tier: 50 templates, limited features
-                    return {
-                        "memes": all_memes[:50],
-                        "count": 50,
-                        "tier": "free",
-                        "features": {
-                            "templates": 50,
-                            "memes_per_day": 10,
-                            "fee_per_meme": "none",
-                            "ai_suggestions": "5/day",
-                            "custom_fonts": False,
-                            "no_watermark": False,
-                            "nft_art_integration": False
-                        },
-                        "upgrade_message": f"🪙 Hold WALDOCOIN for {150 - 50} more templates + NFT art OR 💎 Premium for unlimited!"
-                    }
-            else:
-                raise HTTPException(status_code=500, detail="Failed to fetch templates")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        cached = await catalog.response(tier)
+    except CatalogUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    headers = {"ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+    if cached.not_modified(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
 @app.get("/api/user/usage")
 async def get_user_usage(wallet: str):
@@ -326,41 +295,40 @@ async def create_meme(request: MemeCreateRequest):
                 # TODO: Verify actual payment transaction hash
                 # TODO: Deduct 0.1 WLO from balance (would be done via XRPL transaction)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.imgflip.com/caption_image",
-                data={
-                    "template_id": request.template_id,
-                    "username": IMGFLIP_USERNAME,
-                    "password": IMGFLIP_PASSWORD,
-                    "text0": request.text_top,
-                    "text1": request.text_bottom,
-                }
-            )
-            data = response.json()
-
-            if data.get("success"):
-                # Track usage
-                if request.user_id:
-                    today = datetime.now().strftime("%Y-%m-%d")
-                    if request.user_id not in user_meme_counts:
-                        user_meme_counts[request.user_id] = {}
-                    user_meme_counts[request.user_id][today] = user_meme_counts[request.user_id].get(today, 0) + 1
-
-                fee_charged = "none"
-                if tier == "waldocoin":
-                    fee_charged = "0.1 WLO"
-
-                return {
-                    "success": True,
-                    "image_url": data["data"]["url"],
-                    "page_url": data["data"]["page_url"],
-                    "tier": tier,
-                    "fee_charged": fee_charged,
-                    "wlo_balance": wlo_balance
-                }
-            else:
-                raise HTTPException(status_code=400, detail=data.get("error_message", "Failed to create meme"))
+        response = await outbound.post(
+            "https://api.imgflip.com/caption_image",
+            data={
+                "template_id": request.template_id,
+                "username": IMGFLIP_USERNAME,
+                "password": IMGFLIP_PASSWORD,
+                "text0": request.text_top,
+                "text1": request.text_bottom,
+            }
+        )
+        data = response.json()
+
+        if data.get("success"):
+            # Track usage
+            if request.user_id:
+                today = datetime.now().strftime("%Y-%m-%d")
+                if request.user_id not in user_meme_counts:
+                    user_meme_counts[request.user_id] = {}
+                user_meme_counts[request.user_id][today] = user_meme_counts[request.user_id].get(today, 0) + 1
+
+            fee_charged = "none"
+            if tier == "waldocoin":
+                fee_charged = "0.1 WLO"
+
+            return {
+                "success": True,
+                "image_url": data["data"]["url"],
+                "page_url": data["data"]["page_url"],
+                "tier": tier,
+                "fee_charged": fee_charged,
+                "wlo_balance": wlo_balance
+            }
+        else:
+            raise HTTPException(status_code=400, detail=data.get("error_message", "Failed to create meme"))
     except HTTPException:
         raise
     except Exception as e:
@@ -390,21 +358,30 @@ async def ai_suggest(request: AISuggestRequest):
 
 @app.get("/api/wallet/balance")
 async def get_wallet_balance(address: str):
-    """Get WLO token balance for a wallet address"""
-    try:
-        client = JsonRpcClient(XRPL_SERVER)
+    """Get WLO token balance for a wallet address
 
+    Reads only the wallet's trustlines with the WLO issuer (peer filter), from
+    the last validated ledger, following markers if the issuer has several
+    lines with the wallet.
+    """
+    try:
         # Get account lines (trustlines) to find WLO balance
-        from xrpl.models.requests import AccountLines
-        request = AccountLines(account=address)
-        response = client.request(request)
+        request = AccountLines(account=address, peer=WLO_ISSUER, ledger_index="validated",
+                               limit=ACCOUNT_LINES_PAGE_SIZE)
 
         wlo_balance = 0
+        ledger_index = None
 
-        if response.is_successful():
-            lines = response.result.get("lines", [])
-            for line in lines:
-                if line.get("currency") == WLO_CURRENCY and line.get("account") == WLO_ISSUER:
+        async with aclosing(xrpl_rpc.pages(request)) as pages:
+            async for response in pages:
+                if not response.is_successful():
+                    if response.result.get("error") != "actNotFound":
+                        raise xrpl_rpc.XRPLUnavailable(f"account_lines failed: {response.result.get('error')}")
+                    break
+                ledger_index = response.result.get("ledger_index")
+                line = next((line for line in response.result.get("lines", [])
+                             if line.get("currency") == WLO_CURRENCY and line.get("account") == WLO_ISSUER), None)
+                if line is not None:
                     wlo_balance = float(line.get("balance", 0))
                     break
 
@@ -412,7 +389,8 @@ async def get_wallet_balance(address: str):
             "success": True,
             "address": address,
             "wlo_balance": wlo_balance,
-            "wlo_issuer": WLO_ISSUER
+            "wlo_issuer": WLO_ISSUER,
+            "ledger_index": ledger_index
         }
     except Exception as e:
         return {
@@ -426,16 +404,26 @@ async def check_user_tier(wallet: str):
     """Check user's subscription tier based on WLO holdings and premium status
 
     Returns: free, waldocoin, or premium
+    Served from wallet_cache while the wallet has no new transactions.
     """
+    return await wallet_cache.get_or_load(wallet, load_user_tier)
+
+async def load_user_tier(wallet: str):
+    """Tier from the holder snapshot or a live balance lookup, and how long it may be cached (None: not at all)"""
     try:
-        # Check WLO balance
-        balance_data = await get_wallet_balance(wallet)
+        # Check WLO balance: the bot's holder snapshot, unless this wallet has transacted since
+        snapshot = await holder_snapshot.balance(wallet)
+        if snapshot is not None and not wallet_cache.changed_after(wallet, snapshot.ledger_index):
+            balance_data = {"success": True, "wlo_balance": snapshot.wlo_balance}
+        else:
+            balance_data = await get_wallet_balance(wallet)
         wlo_balance = balance_data.get("wlo_balance", 0)
 
         # Check premium subscription
         from datetime import datetime
         tier = "free"
         premium_expires = None
+        cache_ttl = None if not balance_data.get("success") else wallet_cache.ttl
 
         if wallet in premium_subscriptions:
             sub = premium_subscriptions[wallet]
@@ -443,9 +431,12 @@ async def check_user_tier(wallet: str):
             if expires_at and datetime.fromisoformat(expires_at) > datetime.now():
                 tier = "premium"
                 premium_expires = expires_at
+                if cache_ttl is not None:
+                    # Don't serve "premium" past the subscription's end
+                    cache_ttl = min(cache_ttl, (datetime.fromisoformat(expires_at) - datetime.now()).total_seconds())
 
         # Check WLO balance for WALDOCOIN tier (if not premium)
-        if tier != "premium" and wlo_balance >= 1000:
+        if tier != "premium" and wlo_balance >= WALDOCOIN_TIER_MIN:
             tier = "waldocoin"
 
         # Set features based on tier
@@ -486,14 +477,14 @@ async def check_user_tier(wallet: str):
             "wlo_balance": wlo_balance,
             "premium_expires": premium_expires,
             "features": features
-        }
+        }, cache_ttl
     except Exception as e:
         return {
             "tier": "free",
             "wallet": wallet,
             "wlo_balance": 0,
             "error": str(e)
-        }
+        }, None
 
 @app.post("/api/premium/subscribe")
 async def subscribe_premium(wallet: str, payment_tx: str):
@@ -503,11 +494,9 @@ async def subscribe_premium(wallet: str, payment_tx: str):
     """
     try:
         # Verify payment transaction on XRPL
-        client = JsonRpcClient(XRPL_SERVER)
-
         from xrpl.models.requests import Tx
         tx_request = Tx(transaction=payment_tx)
-        tx_response = client.request(tx_request)
+        tx_response = await xrpl_rpc.request(tx_request)
 
         if not tx_response.is_successful():
             raise HTTPException(status_code=400, detail="Invalid transaction hash")
@@ -528,6 +517,7 @@ async def subscribe_premium(wallet: str, payment_tx: str):
             "payment_tx": payment_tx,
             "subscribed_at": datetime.now().isoformat()
         }
+        wallet_cache.invalidate(wallet)
 
         return {
             "success": True,
@@ -537,115 +527,132 @@ async def subscribe_premium(wallet: str, payment_tx: str):
         }
     except HTTPException:
         raise
+    except xrpl_rpc.XRPLUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/user/nfts")
-async def get_user_nfts(wallet_address: str):
+async def get_user_nfts(wallet_address: str, offset: int = 0, limit: Optional[int] = None, format: str = "json",
+                        accept: Optional[str] = Header(None)):
     """Fetch user's NFTs from XRPL
 
     Returns NFT images that can be used in memes
     Only available for WALDOCOIN and Premium tiers
-    """
-    try:
-        # Connect to XRPL
-        client = JsonRpcClient(XRPL_SERVER)
-
-        # Fetch NFTs owned by the wallet
-        request = AccountNFTs(account=wallet_address)
-        response = client.request(request)
 
-        if not response.is_successful():
-            raise HTTPException(status_code=400, detail="Failed to fetch NFTs from XRPL")
+    Pages through every NFT the wallet holds. offset/limit select a slice for
+    lazy loading (next_offset is set when there are more). format=ndjson or
+    format=sse (or an Accept of application/x-ndjson / text/event-stream)
+    streams each NFT as soon as its metadata resolves, in completion order
+    with its "index", followed by a "done" event; see nft_listing.py.
+    """
+    if offset < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit >= 1")
+    if accept and format == "json":
+        if "application/x-ndjson" in accept:
+            format = "ndjson"
+        elif "text/event-stream" in accept:
+            format = "sse"
+    if format not in ("json", "ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be json, ndjson or sse")
 
-        nfts = []
-        account_nfts = response.result.get("account_nfts", [])
+    try:
+        # Fetch NFTs owned by the wallet (first page now, the rest as needed)
+        pages = await nft_listing.open_listing(wallet_address)
+    except nft_listing.ListingError:
+        raise HTTPException(status_code=400, detail="Failed to fetch NFTs from XRPL")
+    except xrpl_rpc.XRPLUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"Error fetching NFTs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    events = nft_listing.events(pages, offset, limit)
 
-        # Process each NFT
-        for nft in account_nfts:
+    if format != "json":
+        async def stream():
             try:
-                nft_id = nft.get("NFTokenID")
-                uri = nft.get("URI", "")
-
-                # Decode URI from hex if present
-                if uri:
-                    try:
-                        # URI is hex-encoded, decode it
-                        uri_decoded = bytes.fromhex(uri).decode('utf-8')
-                    except:
-                        uri_decoded = uri
-
-                    # Fetch metadata from URI
-                    metadata = await fetch_nft_metadata(uri_decoded)
-
-                    if metadata:
-                        nfts.append({
-                            "id": nft_id,
-                            "name": metadata.get("name", f"NFT {nft_id[:8]}..."),
-                            "image_url": metadata.get("image", ""),
-                            "collection": metadata.get("collection", "Unknown"),
-                            "token_id": nft_id,
-                            "issuer": nft.get("Issuer", ""),
-                            "uri": uri_decoded
-                        })
-                else:
-                    # No URI, create basic entry
-                    nfts.append({
-                        "id": nft_id,
-                        "name": f"NFT {nft_id[:8]}...",
-                        "image_url": "",
-                        "collection": "Unknown",
-                        "token_id": nft_id,
-                        "issuer": nft.get("Issuer", ""),
-                        "uri": ""
-                    })
+                async for event in events:
+                    yield encode_event(event)
             except Exception as e:
-                print(f"Error processing NFT: {e}")
-                continue
+                print(f"Error streaming NFTs: {e}")
+                yield encode_event({"type": "error", "detail": str(e)})
 
-        # Filter out NFTs without images
-        nfts_with_images = [nft for nft in nfts if nft.get("image_url")]
+        def encode_event(event: dict) -> bytes:
+            if format == "sse":
+                return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+            return (json.dumps(event) + "\n").encode()
+
+        media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+        return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+    try:
+        nfts_with_images = []
+        async for event in events:
+            if event.pop("type") == "nft":
+                nfts_with_images.append(event)
+            else:
+                done = event
+        # Filter out NFTs without images (already done), in wallet order
+        nfts_with_images.sort(key=lambda nft: nft.pop("index"))
 
         return {
             "success": True,
             "wallet": wallet_address,
             "nfts": nfts_with_images,
             "count": len(nfts_with_images),
-            "total_nfts": len(account_nfts)
+            "total_nfts": done["total_nfts"],
+            "offset": offset,
+            "next_offset": done["next_offset"]
         }
-    except HTTPException:
-        raise
+    except xrpl_rpc.XRPLUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Error fetching NFTs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 async def fetch_nft_metadata(uri: str):
-    """Fetch NFT metadata from URI (IPFS, HTTP, etc.)"""
-    try:
-        # Handle IPFS URIs
-        if uri.startswith("ipfs://"):
-            # Convert to HTTP gateway
-            ipfs_hash = uri.replace("ipfs://", "")
-            uri = f"https://ipfs.io/ipfs/{ipfs_hash}"
-
-        # Fetch metadata
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(uri)
+    """Fetch NFT metadata from URI (IPFS, HTTP, etc.); see nft_metadata.py"""
+    return await nft_metadata.resolve(uri)
 
-            if response.status_code == 200:
-                metadata = response.json()
+# 🔐 Internal endpoints: same X-Admin-Key header as the Twitter bot
+def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    if not x_admin_key or x_admin_key != os.getenv("X_ADMIN_KEY"):
+        raise HTTPException(status_code=403, detail="Unauthorized")
 
-                # Handle IPFS image URLs
-                if metadata.get("image", "").startswith("ipfs://"):
-                    ipfs_hash = metadata["image"].replace("ipfs://", "")
-                    metadata["image"] = f"https://ipfs.io/ipfs/{ipfs_hash}"
+@app.get("/admin/profile", dependencies=[Depends(require_admin_key)])
+async def profile(seconds: float = 10.0, interval_ms: float = 10.0, idle: bool = False, format: str = "collapsed"):
+    """Sample all threads (including the event loop) and return collapsed stacks
 
-                return metadata
-            else:
-                return None
-    except Exception as e:
-        print(f"Error fetching metadata from {uri}: {e}")
-        return None
+    Sampling runs in a worker thread so the event loop keeps serving, and
+    shows up in the profile, while it runs.
+    """
+    try:
+        result = await asyncio.to_thread(profiler.sample, seconds, interval_ms, idle)
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    if format == "json":
+        return result
+    return PlainTextResponse(profiler.collapsed(result))
+
+@app.get("/admin/http", dependencies=[Depends(require_admin_key)])
+async def http_pool():
+    """Outbound HTTP pool usage per host, plus the XRPL request queue"""
+    return {**outbound.stats(), "xrpl": xrpl_rpc.stats()}
+
+@app.get("/admin/nfts", dependencies=[Depends(require_admin_key)])
+async def nft_metadata_cache():
+    """NFT metadata cache and IPFS gateway latencies"""
+    return nft_metadata.stats()
+
+@app.get("/admin/wallets", dependencies=[Depends(require_admin_key)])
+async def wallet_tier_cache():
+    """Wallet tier cache hit rate and transaction stream state"""
+    return wallet_cache.stats()
+
+@app.get("/admin/templates", dependencies=[Depends(require_admin_key)])
+async def template_cache():
+    """Template catalog cache state"""
+    return catalog.stats()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,132 @@
+"""
+A wallet's NFTs, paged from XRPL and emitted as their metadata resolves.
+
+account_nfts returns at most 400 NFTs a call plus a `marker` for the rest.
+`open_listing()` reads the first page up front, so a bad wallet or an XRPL
+outage still becomes an HTTP error, and fetches further pages, pinned to
+the first page's validated ledger, only as far as offset + limit needs.
+
+`events()` starts metadata resolution (nft_metadata.py) for each NFT as
+soon as its page arrives, and yields each NFT with an image the moment its
+metadata resolves, tagged with its position in the wallet. The first
+records therefore go out while later pages and slower gateways are still
+in flight. A final "done" event carries the counts and `next_offset` when
+there are more NFTs past `limit`.
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+
+from xrpl.models.requests import AccountNFTs
+
+import nft_metadata
+import xrpl_rpc
+
+PAGE_SIZE = 400  # account_nfts maximum
+NFT_MAX_PAGES = 250  # 100k NFTs
+
+
+class ListingError(Exception):
+    """XRPL refused the account_nfts request (e.g. unknown account)"""
+
+
+def decode_uri(nft: dict) -> str:
+    uri = nft.get("URI", "")
+    try:
+        # URI is hex-encoded, decode it
+        return bytes.fromhex(uri).decode("utf-8") if uri else ""
+    except ValueError:
+        return uri
+
+
+def nft_record(nft: dict, uri: str, metadata: Optional[dict]) -> dict:
+    nft_id = nft.get("NFTokenID", "")
+    metadata = metadata or {}
+    return {
+        "id": nft_id,
+        "name": metadata.get("name", f"NFT {nft_id[:8]}..."),
+        "image_url": metadata.get("image", ""),
+        "collection": metadata.get("collection", "Unknown"),
+        "token_id": nft_id,
+        "issuer": nft.get("Issuer", ""),
+        "uri": uri
+    }
+
+
+async def open_listing(wallet: str) -> AsyncIterator[List[dict]]:
+    """Pages of the wallet's NFTs; the first is fetched before this returns"""
+    pages = xrpl_rpc.pages(AccountNFTs(account=wallet, ledger_index="validated", limit=PAGE_SIZE),
+                           max_pages=NFT_MAX_PAGES)
+    try:
+        first = await pages.__anext__()
+        if not first.is_successful():
+            raise ListingError(first.result.get("error_message") or first.result.get("error")
+                               or "account_nfts failed")
+    except BaseException:
+        await pages.aclose()
+        raise
+
+    async def rest():
+        try:
+            yield first.result.get("account_nfts", [])
+            async for page in pages:
+                if not page.is_successful():
+                    raise xrpl_rpc.XRPLUnavailable(f"account_nfts failed: {page.result.get('error')}")
+                yield page.result.get("account_nfts", [])
+        finally:
+            await pages.aclose()
+    return rest()
+
+
+async def events(pages: AsyncIterator[List[dict]], offset: int = 0,
+                 limit: Optional[int] = None) -> AsyncIterator[Dict]:
+    """{"type": "nft", "index": i, ...} per NFT with an image, then {"type": "done", ...}"""
+    end = offset + limit if limit is not None else None
+    queue: asyncio.Queue = asyncio.Queue()
+    summary = {"listed": 0, "has_more": False}
+
+    async def resolve(index: int, nft: dict, uri: str):
+        metadata = await nft_metadata.resolve(uri) if uri else None
+        await queue.put((index, nft_record(nft, uri, metadata)))
+
+    async def walk():
+        index = 0
+        resolvers = []
+        try:
+            async for page in pages:
+                for nft in page:
+                    if end is not None and index >= end:
+                        summary["has_more"] = True
+                        return
+                    if index >= offset:
+                        resolvers.append(asyncio.create_task(resolve(index, nft, decode_uri(nft))))
+                        summary["listed"] += 1
+                    index += 1
+        finally:
+            summary["seen"] = index
+            await asyncio.gather(*resolvers)
+            await pages.aclose()
+
+    walker = asyncio.create_task(walk())
+    walker.add_done_callback(lambda _: queue.put_nowait(None))
+    emitted = 0
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            index, record = item
+            if record["image_url"]:
+                emitted += 1
+                yield {"type": "nft", "index": index, **record}
+        walker.result()
+    finally:
+        walker.cancel()
+
+    yield {
+        "type": "done",
+        "count": emitted,
+        "listed": summary["listed"],
+        "offset": offset,
+        "next_offset": offset + summary["listed"] if summary["has_more"] else None,
+        "total_nfts": None if summary["has_more"] else summary["seen"],
+    }
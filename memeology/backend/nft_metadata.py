@@ -0,0 +1,234 @@
+"""
+NFT metadata resolution: concurrent, raced across IPFS gateways, cached by URI.
+
+`resolve_many(uris)` resolves a wallet's NFTs at most
+NFT_METADATA_CONCURRENCY at a time instead of one after another.
+
+IPFS content (ipfs://CID/..., or a gateway URL with /ipfs/CID/...) is raced
+across IPFS_GATEWAYS. The request to the gateway with the best recent
+latency starts first, and each further gateway joins after
+NFT_GATEWAY_STAGGER seconds. The first valid JSON wins and the rest are
+cancelled, so one slow or rate-limiting gateway no longer stalls the page.
+
+Results are cached by URI, in process memory and in Redis when REDIS_URL is
+set:
+- IPFS content is immutable, so it is cached for good
+- other http(s) metadata is cached for NFT_METADATA_TTL
+- a URI that fails everywhere is cached as missing for
+  NFT_METADATA_NEGATIVE_TTL, so a broken NFT is not re-fetched on every visit
+Concurrent lookups of one URI share a single fetch.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import outbound
+import redis_store
+
+IPFS_GATEWAYS = [g.strip().rstrip("/") for g in os.getenv(
+    "IPFS_GATEWAYS", "https://ipfs.io,https://dweb.link,https://gateway.pinata.cloud,https://nftstorage.link"
+).split(",") if g.strip()]
+NFT_METADATA_CONCURRENCY = int(os.getenv("NFT_METADATA_CONCURRENCY", "16"))
+NFT_METADATA_TIMEOUT = float(os.getenv("NFT_METADATA_TIMEOUT", "8"))
+NFT_GATEWAY_STAGGER = float(os.getenv("NFT_GATEWAY_STAGGER", "0.3"))
+NFT_METADATA_TTL = float(os.getenv("NFT_METADATA_TTL", "3600"))
+NFT_METADATA_NEGATIVE_TTL = float(os.getenv("NFT_METADATA_NEGATIVE_TTL", "300"))
+NFT_METADATA_CACHE_MAX = int(os.getenv("NFT_METADATA_CACHE_MAX", "20000"))
+REDIS_PREFIX = "memeology:nft_meta:"
+
+# ipfs://CID/path, ipfs://ipfs/CID/path, https://<gateway>/ipfs/CID/path
+_IPFS_PATH = re.compile(r"^(?:ipfs://(?:ipfs/)?|https?://[^/]+/ipfs/)(?P<path>[A-Za-z0-9]{46,}(?:/.*)?)$")
+
+_slots = asyncio.Semaphore(NFT_METADATA_CONCURRENCY)
+_cache: "OrderedDict[str, Tuple[Optional[dict], float]]" = OrderedDict()
+_loading: Dict[str, asyncio.Future] = {}
+# Per-gateway moving average latency (seconds) and outcome counts, for ordering and /admin/nfts
+_gateways: Dict[str, Dict[str, float]] = {g: {"latency": 1.0, "wins": 0, "failures": 0} for g in IPFS_GATEWAYS}
+_counters = {"hits": 0, "misses": 0, "redis_hits": 0, "negative_hits": 0, "fetches": 0, "failures": 0}
+
+
+class MetadataUnavailable(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def ipfs_path(uri: str) -> Optional[str]:
+    """"CID/path" for IPFS content, None for anything else"""
+    match = _IPFS_PATH.match(uri.strip())
+    return match.group("path") if match else None
+
+
+def gateway_url(uri: str) -> str:
+    """`uri` on the preferred gateway if it is IPFS content, else unchanged"""
+    path = ipfs_path(uri)
+    if path is None or not IPFS_GATEWAYS:
+        return uri
+    return f"{_ranked_gateways()[0]}/ipfs/{path}"
+
+
+def _ranked_gateways() -> List[str]:
+    return sorted(IPFS_GATEWAYS, key=lambda g: _gateways[g]["latency"])
+
+
+def _record(gateway: str, seconds: float, ok: bool, missing: bool = False):
+    stats = _gateways[gateway]
+    if ok:
+        stats["wins"] += 1
+    else:
+        stats["failures"] += 1
+        if not missing:
+            seconds = max(seconds, NFT_METADATA_TIMEOUT)  # push failing gateways down the order
+    stats["latency"] = 0.8 * stats["latency"] + 0.2 * seconds
+
+
+async def _get_json(url: str) -> dict:
+    response = await outbound.get(url, timeout=NFT_METADATA_TIMEOUT, follow_redirects=True)
+    if response.status_code != 200:
+        raise MetadataUnavailable(f"HTTP {response.status_code}", response.status_code)
+    metadata = response.json()
+    if not isinstance(metadata, dict):
+        raise MetadataUnavailable("metadata is not a JSON object")
+    return metadata
+
+
+async def _race(path: str) -> dict:
+    """First valid response for ipfs `path` across the gateways, staggered"""
+    gateways = _ranked_gateways()
+    errors = []
+
+    async def attempt(i: int, gateway: str):
+        await asyncio.sleep(i * NFT_GATEWAY_STAGGER)
+        started = time.perf_counter()
+        try:
+            metadata = await _get_json(f"{gateway}/ipfs/{path}")
+        except Exception as e:
+            # A 404 is the content's fault, not the gateway's
+            _record(gateway, time.perf_counter() - started, ok=False,
+                    missing=isinstance(e, MetadataUnavailable) and e.status == 404)
+            raise
+        _record(gateway, time.perf_counter() - started, ok=True)
+        return metadata
+
+    pending = {asyncio.create_task(attempt(i, g)) for i, g in enumerate(gateways)}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                errors.append(f"{type(task.exception()).__name__}: {task.exception()}")
+    finally:
+        for task in pending:
+            task.cancel()
+    raise MetadataUnavailable("; ".join(errors) or "no IPFS gateways configured")
+
+
+async def _fetch(uri: str) -> dict:
+    path = ipfs_path(uri)
+    metadata = await (_race(path) if path is not None else _get_json(uri))
+    image = metadata.get("image")
+    if isinstance(image, str) and ipfs_path(image) is not None:
+        metadata["image"] = gateway_url(image)
+    return metadata
+
+
+def _remember(uri: str, metadata: Optional[dict], ttl: float):
+    _cache[uri] = (metadata, time.monotonic() + ttl)
+    _cache.move_to_end(uri)
+    while len(_cache) > NFT_METADATA_CACHE_MAX:
+        _cache.popitem(last=False)
+
+
+async def _from_redis(uri: str) -> Tuple[bool, Optional[dict]]:
+    r = redis_store.client()
+    if r is None:
+        return False, None
+    try:
+        raw = await r.get(REDIS_PREFIX + uri)
+    except Exception as e:
+        print(f"⚠️ Could not read NFT metadata from Redis: {e}")
+        return False, None
+    if raw is None:
+        return False, None
+    return True, json.loads(raw)
+
+
+async def _to_redis(uri: str, metadata: Optional[dict], ttl: Optional[float]):
+    r = redis_store.client()
+    if r is None:
+        return
+    try:
+        await r.set(REDIS_PREFIX + uri, json.dumps(metadata), ex=int(ttl) if ttl else None)
+    except Exception as e:
+        print(f"⚠️ Could not write NFT metadata to Redis: {e}")
+
+
+async def _load(uri: str) -> Optional[dict]:
+    found, metadata = await _from_redis(uri)
+    immutable = ipfs_path(uri) is not None
+    if found:
+        _counters["redis_hits"] += 1
+        _remember(uri, metadata, float("inf") if immutable and metadata is not None else
+                  NFT_METADATA_TTL if metadata is not None else NFT_METADATA_NEGATIVE_TTL)
+        return metadata
+
+    async with _slots:
+        _counters["fetches"] += 1
+        try:
+            metadata = await _fetch(uri)
+        except Exception as e:
+            _counters["failures"] += 1
+            print(f"Error fetching metadata from {uri}: {e}")
+            metadata = None
+
+    if metadata is None:
+        ttl = NFT_METADATA_NEGATIVE_TTL
+    elif immutable:
+        ttl = None  # forever
+    else:
+        ttl = NFT_METADATA_TTL
+    _remember(uri, metadata, float("inf") if ttl is None else ttl)
+    await _to_redis(uri, metadata, ttl)
+    return metadata
+
+
+async def resolve(uri: str) -> Optional[dict]:
+    """Metadata JSON for `uri`, or None if it could not be fetched"""
+    entry = _cache.get(uri)
+    if entry is not None and entry[1] > time.monotonic():
+        _cache.move_to_end(uri)
+        _counters["hits"] += 1
+        if entry[0] is None:
+            _counters["negative_hits"] += 1
+        return entry[0]
+    _counters["misses"] += 1
+
+    pending = _loading.get(uri)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    task = _loading[uri] = asyncio.ensure_future(_load(uri))
+    task.add_done_callback(lambda _: _loading.pop(uri, None))
+    return await asyncio.shield(task)
+
+
+async def resolve_many(uris: List[str]) -> List[Optional[dict]]:
+    """resolve() for each URI concurrently, in order; at most NFT_METADATA_CONCURRENCY fetches at once"""
+    return list(await asyncio.gather(*(resolve(uri) for uri in uris)))
+
+
+def stats() -> dict:
+    lookups = _counters["hits"] + _counters["misses"]
+    return {
+        "cached": len(_cache),
+        "max_cached": NFT_METADATA_CACHE_MAX,
+        "concurrency": NFT_METADATA_CONCURRENCY,
+        "hit_rate": round(_counters["hits"] / lookups, 3) if lookups else None,
+        "gateways": {g: {"latency_ms": round(s["latency"] * 1000, 1), "wins": int(s["wins"]),
+                         "failures": int(s["failures"])} for g, s in _gateways.items()},
+        **_counters,
+    }
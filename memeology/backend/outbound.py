@@ -0,0 +1,148 @@
+"""
+One pooled httpx.AsyncClient for every outbound HTTP call the API makes
+(XUMM, Imgflip, NFT metadata gateways).
+
+The app's lifespan opens it at startup and closes it on shutdown, so
+keep-alive connections and their TLS sessions are reused across requests
+instead of paying a handshake per call.
+- HTTP_MAX_PER_HOST caps concurrent requests to any one host, inside the
+  overall pool limits (HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE); a module
+  with its own limit for a host (xrpl_rpc for the rippled node) sets it
+  with limit_host()
+- HTTP/2 is negotiated when the h2 package is installed (HTTP2=false to turn off)
+- HTTP_TIMEOUT / HTTP_CONNECT_TIMEOUT are the defaults; pass timeout= to override
+- per-host usage (requests, errors, in flight, waits for a slot, new TCP
+  connections and TLS handshakes, HTTP/2 share) is served at /admin/http
+
+Connections opened are counted from httpcore's "trace" request extension, so
+requests minus connections opened is the number of requests that reused a
+pooled connection.
+"""
+import asyncio
+import importlib.util
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP2 = os.getenv("HTTP2", "true").lower() == "true" and importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+_host_limits: Dict[str, int] = {}
+_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+
+async def start():
+    """Open the pool (called from the app's lifespan)"""
+    client()
+
+
+async def aclose():
+    """Close the pool and its connections (called from the app's lifespan)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def client() -> httpx.AsyncClient:
+    """The shared client, opened on first use outside the app (scripts, tests)"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+        )
+    return _client
+
+
+def limit_host(url: str, limit: int):
+    """Allow `limit` concurrent requests to url's host instead of HTTP_MAX_PER_HOST; set before its first request"""
+    host = urlsplit(url).netloc
+    if host not in _host_slots:
+        _host_limits[host] = limit
+
+
+def _tracer(stats: Dict[str, float]):
+    async def trace(event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            stats["connections_opened"] += 1
+        elif event == "connection.start_tls.complete":
+            stats["tls_handshakes"] += 1
+    return trace
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """client().request() behind the per-host limit, with usage counted"""
+    host = urlsplit(url).netloc
+    stats = _stats[host]
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = asyncio.Semaphore(_host_limits.get(host, HTTP_MAX_PER_HOST))
+    if slot.locked():
+        stats["waited_for_slot"] += 1
+
+    async with slot:
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        started = time.perf_counter()
+        try:
+            response = await client().request(method, url, extensions={"trace": _tracer(stats)}, **kwargs)
+        except httpx.HTTPError:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            stats["seconds"] += time.perf_counter() - started
+    stats["requests"] += 1
+    if response.http_version == "HTTP/2":
+        stats["http2_requests"] += 1
+    return response
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+def stats() -> Dict:
+    hosts = {}
+    for host, s in sorted(_stats.items()):
+        attempts = s["requests"] + s["errors"]
+        hosts[host] = {
+            "requests": int(s["requests"]),
+            "errors": int(s["errors"]),
+            "limit": _host_limits.get(host, HTTP_MAX_PER_HOST),
+            "in_flight": int(s["in_flight"]),
+            "max_in_flight": int(s["max_in_flight"]),
+            "waited_for_slot": int(s["waited_for_slot"]),
+            "connections_opened": int(s["connections_opened"]),
+            "tls_handshakes": int(s["tls_handshakes"]),
+            "reused": int(max(attempts - s["connections_opened"], 0)),
+            "http2_requests": int(s["http2_requests"]),
+            "mean_ms": round(s["seconds"] / attempts * 1000, 1) if attempts else 0.0,
+        }
+    return {
+        "open": _client is not None,
+        "http2": HTTP2,
+        "limits": {"max_connections": HTTP_MAX_CONNECTIONS, "max_keepalive": HTTP_MAX_KEEPALIVE,
+                   "max_per_host": HTTP_MAX_PER_HOST},
+        "timeouts": {"default": HTTP_TIMEOUT, "connect": HTTP_CONNECT_TIMEOUT},
+        "hosts": hosts,
+    }
@@ -0,0 +1,102 @@
+"""
+On-demand stack-sampling profiler for a running process.
+
+`sample(seconds)` reads the Python stack of every thread with
+sys._current_frames() at a fixed interval and returns the counts in
+collapsed-stack format ("thread;outer;...;inner count" per line), which
+flamegraph.pl, speedscope and inferno read directly. Nothing is installed or
+traced between samples, so the cost is one stack walk per thread per
+interval, and only while a profile is running.
+
+Only threads of the uvicorn process that serves the request are sampled.
+/admin/profile runs sample() in a worker thread, so the event loop keeps
+serving, and appears in the profile, while it runs.
+
+This backend deploys on its own (see DEPLOYMENT.md), so the module is its
+own. The Twitter bot's profiler.py writes the same collapsed format, so one
+flamegraph toolchain reads profiles from both.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MIN_INTERVAL_MS = 1.0
+
+# Leaf functions of threads parked waiting for work. Socket reads are not in here:
+# a thread blocked on Redis or rippled is exactly what a profile should show
+IDLE_FUNCTIONS = {"wait", "select", "poll", "accept", "serve_forever", "_worker"}
+
+_running = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this process"""
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    # Trim site-packages / project prefixes, keep enough to tell modules apart
+    for marker in ("site-packages" + os.sep, "lib" + os.sep + "python"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def sample(seconds: float, interval_ms: float = 10.0, include_idle: bool = False) -> Dict:
+    """Sample every other thread's stack for `seconds`. Raises ProfilerBusy if a profile is running"""
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    interval = max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        own_thread = threading.get_ident()
+        labels: Dict[object, str] = {}
+        stacks: Counter = Counter()
+        samples = idle = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while True:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if not include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                    idle += 1
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    parts.append(label)
+                    frame = frame.f_back
+                parts.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(parts))] += 1
+            samples += 1
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            time.sleep(min(interval, deadline - now))
+        return {
+            "seconds": round(time.perf_counter() - started, 3),
+            "interval_ms": interval * 1000,
+            "samples": samples,
+            "idle_skipped": idle,
+            "stacks": dict(stacks.most_common()),
+        }
+    finally:
+        _running.release()
+
+
+def collapsed(profile: Dict, limit: Optional[int] = None) -> str:
+    """Collapsed-stack text, most frequent stacks first"""
+    items = list(profile["stacks"].items())[:limit]
+    return "".join(f"{stack} {count}\n" for stack, count in items)
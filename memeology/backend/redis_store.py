@@ -0,0 +1,40 @@
+"""
+Optional shared Redis for the API's caches.
+
+Set REDIS_URL to share cached data between workers and across restarts;
+without it (or without the redis package) `client()` returns None and
+callers keep their data in process memory only.
+"""
+import os
+from typing import Optional
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+_client = None
+
+
+def client():
+    """The shared redis.asyncio client, or None when Redis is not configured"""
+    global _client
+    if _client is None and REDIS_URL:
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            print("⚠️ REDIS_URL is set but the redis package is not installed; caching in memory only")
+            return None
+        _client = aioredis.from_url(REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _client
+
+
+async def aclose():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def describe() -> Optional[str]:
+    """REDIS_URL without credentials, for admin endpoints"""
+    if not REDIS_URL:
+        return None
+    return REDIS_URL.rsplit("@", 1)[-1]
@@ -0,0 +1,256 @@
+"""
+Imgflip template catalog, cached with stale-while-revalidate.
+
+The catalog (api.imgflip.com/get_memes) is kept in memory and, when
+REDIS_URL is set, in Redis so workers and restarts share one copy instead of
+each calling Imgflip. A background task refreshes it every
+TEMPLATE_REFRESH_SECONDS; a request that finds it older than that is still
+answered from the cached copy and only triggers a refresh. If Imgflip is
+slow or down the last good catalog keeps being served for up to
+TEMPLATE_STALE_MAX_SECONDS. Only a cold start with nothing cached waits on
+Imgflip.
+
+Each tier's response body is serialized once per catalog version, with an
+ETag, so handlers answer with bytes (or a 304) and no per-request JSON work.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import outbound
+import redis_store
+
+IMGFLIP_URL = "https://api.imgflip.com/get_memes"
+TEMPLATE_REFRESH_SECONDS = float(os.getenv("TEMPLATE_REFRESH_SECONDS", "3600"))
+TEMPLATE_STALE_MAX_SECONDS = float(os.getenv("TEMPLATE_STALE_MAX_SECONDS", str(7 * 24 * 3600)))
+TEMPLATE_RETRY_SECONDS = float(os.getenv("TEMPLATE_RETRY_SECONDS", "60"))
+REDIS_KEY = "memeology:imgflip:catalog"
+TIERS = ("free", "waldocoin", "premium")
+
+# Browsers/CDNs may reuse a response for 5 minutes, then revalidate with If-None-Match
+CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600, stale-if-error=86400"
+
+
+class CatalogUnavailable(Exception):
+    """No catalog cached and Imgflip could not be reached"""
+
+
+def tier_payload(all_memes: List[dict], tier: str) -> dict:
+    """The /api/templates/imgflip response for one tier
+
+    Tiers:
+    - free: 50 templates, no fees
+    - waldocoin: 150 templates, small WLO fees (0.1 WLO per meme), NFT art integration
+    - premium: ALL 200+ templates, unlimited memes, no fees, $5/month (WLO/XRP/Credit), NFT art integration
+    """
+    total_count = len(all_memes)
+
+    if tier == "premium":
+        # Premium tier: ALL templates, unlimited, no fees
+        return {
+            "memes": all_memes,
+            "count": total_count,
+            "tier": "premium",
+            "features": {
+                "templates": "unlimited",
+                "memes_per_day": "unlimited",
+                "fee_per_meme": "none",
+                "ai_suggestions": "unlimited",
+                "custom_fonts": True,
+                "no_watermark": True,
+                "nft_art_integration": True
+            }
+        }
+    elif tier == "waldocoin":
+        # WALDOCOIN tier: 150 templates, small fees
+        return {
+            "memes": all_memes[:150],
+            "count": 150,
+            "tier": "waldocoin",
+            "features": {
+                "templates": 150,
+                "memes_per_day": "unlimited",
+                "fee_per_meme": "0.1 WLO",
+                "ai_suggestions": "50/day",
+                "custom_fonts": True,
+                "no_watermark": False,
+                "nft_art_integration": True
+            },
+            "upgrade_message": f"⬆️ Upgrade to Premium for {total_count - 150} more templates and no fees!"
+        }
+    else:
+        # Free tier: 50 templates, limited features
+        return {
+            "memes": all_memes[:50],
+            "count": 50,
+            "tier": "free",
+            "features": {
+                "templates": 50,
+                "memes_per_day": 10,
+                "fee_per_meme": "none",
+                "ai_suggestions": "5/day",
+                "custom_fonts": False,
+                "no_watermark": False,
+                "nft_art_integration": False
+            },
+            "upgrade_message": f"🪙 Hold WALDOCOIN for {150 - 50} more templates + NFT art OR 💎 Premium for unlimited!"
+        }
+
+
+class TierResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match check: weak comparison (CDNs add W/ to ETags they compress) and * matches"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return any(tag.strip().removeprefix("W/") == self.etag for tag in if_none_match.split(","))
+
+
+class TemplateCatalog:
+    def __init__(self):
+        self.memes: Optional[List[dict]] = None
+        self.fetched_at = 0.0
+        self.upstream_etag: Optional[str] = None
+        self.responses: Dict[str, TierResponse] = {}
+        self._refreshing: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.counters = {"imgflip_fetches": 0, "imgflip_not_modified": 0, "imgflip_failures": 0,
+                         "redis_loads": 0, "stale_served": 0}
+        self.last_error: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def _install(self, memes: List[dict], fetched_at: float, upstream_etag: Optional[str] = None):
+        self.memes = memes
+        self.fetched_at = fetched_at
+        self.upstream_etag = upstream_etag
+        self.responses = {
+            tier: TierResponse(json.dumps(tier_payload(memes, tier), ensure_ascii=False,
+                                          separators=(",", ":")).encode())
+            for tier in TIERS
+        }
+
+    async def response(self, tier: str) -> TierResponse:
+        """Pre-serialized response for `tier`; only waits on Imgflip when nothing is cached"""
+        if tier not in TIERS:
+            tier = "free"
+        if self.memes is None:
+            async with self._lock:
+                if self.memes is None and not await self._load_from_redis():
+                    await self._fetch()
+            if self.memes is None:
+                raise CatalogUnavailable(self.last_error or "Failed to fetch templates")
+        elif self.age > TEMPLATE_REFRESH_SECONDS:
+            if self.age > TEMPLATE_STALE_MAX_SECONDS:
+                # Too old to serve without trying once more
+                await self.refresh()
+                if self.age > TEMPLATE_STALE_MAX_SECONDS:
+                    raise CatalogUnavailable(self.last_error or "Template catalog expired")
+            else:
+                self.counters["stale_served"] += 1
+                self.refresh_soon()
+        return self.responses[tier]
+
+    def refresh_soon(self):
+        """Start a background refresh unless one is running"""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.get_running_loop().create_task(self.refresh())
+
+    async def refresh(self) -> bool:
+        async with self._lock:
+            # Another worker may have refreshed Redis already
+            if await self._load_from_redis(newer_only=True) and self.age < TEMPLATE_REFRESH_SECONDS:
+                return True
+            return await self._fetch()
+
+    async def _fetch(self) -> bool:
+        headers = {"If-None-Match": self.upstream_etag} if self.upstream_etag and self.memes else {}
+        try:
+            response = await outbound.get(IMGFLIP_URL, headers=headers)
+            if response.status_code == 304:
+                self.counters["imgflip_not_modified"] += 1
+                self.fetched_at = time.time()
+                await self._save_to_redis()
+                return True
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}")
+            data = response.json()
+            if not data.get("success"):
+                raise ValueError(data.get("error_message") or "unsuccessful response")
+            memes = data["data"]["memes"]
+        except Exception as e:
+            self.counters["imgflip_failures"] += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Imgflip template refresh failed ({self.last_error}); serving cached catalog")
+            return False
+        self.counters["imgflip_fetches"] += 1
+        self.last_error = None
+        self._install(memes, time.time(), response.headers.get("ETag"))
+        await self._save_to_redis()
+        return True
+
+    async def _load_from_redis(self, newer_only: bool = False) -> bool:
+        r = redis_store.client()
+        if r is None:
+            return False
+        try:
+            raw = await r.get(REDIS_KEY)
+            if not raw:
+                return False
+            cached = json.loads(raw)
+            if newer_only and cached["fetched_at"] <= self.fetched_at:
+                return False
+            self._install(cached["memes"], cached["fetched_at"], cached.get("etag"))
+            self.counters["redis_loads"] += 1
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not read template catalog from Redis: {e}")
+            return False
+
+    async def _save_to_redis(self):
+        r = redis_store.client()
+        if r is None or self.memes is None:
+            return
+        try:
+            await r.set(REDIS_KEY, json.dumps({"memes": self.memes, "fetched_at": self.fetched_at,
+                                               "etag": self.upstream_etag}),
+                        ex=int(TEMPLATE_STALE_MAX_SECONDS))
+        except Exception as e:
+            print(f"⚠️ Could not write template catalog to Redis: {e}")
+
+    async def run(self):
+        """Background refresher, started from the app's lifespan"""
+        while True:
+            if self.memes is None or self.age >= TEMPLATE_REFRESH_SECONDS:
+                ok = await self.refresh()
+                if not ok:
+                    await asyncio.sleep(TEMPLATE_RETRY_SECONDS)
+                    continue
+            await asyncio.sleep(max(TEMPLATE_REFRESH_SECONDS - self.age, 1))
+
+    def stats(self) -> dict:
+        return {
+            "templates": len(self.memes) if self.memes is not None else None,
+            "age_seconds": round(self.age, 1) if self.memes is not None else None,
+            "refresh_seconds": TEMPLATE_REFRESH_SECONDS,
+            "stale_max_seconds": TEMPLATE_STALE_MAX_SECONDS,
+            "redis": redis_store.describe(),
+            "etags": {tier: r.etag for tier, r in self.responses.items()},
+            "last_error": self.last_error,
+            **self.counters,
+        }
+
+
+catalog = TemplateCatalog()
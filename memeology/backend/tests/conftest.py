@@ -0,0 +1,10 @@
+"""
+Backend modules are imported from the directory above, as uvicorn does.
+
+  pip install pytest
+  python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
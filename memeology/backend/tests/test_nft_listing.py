@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from xrpl.models.response import Response, ResponseStatus
+
+import nft_listing
+import xrpl_rpc
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+
+
+@pytest.fixture
+def node(monkeypatch):
+    """xrpl_rpc.pages() answering with the queued responses (or raising queued exceptions)"""
+    state = {"replies": [], "closed": False}
+
+    async def pages(req, max_pages=50, timeout=None):
+        try:
+            for reply in state["replies"]:
+                if isinstance(reply, Exception):
+                    raise reply
+                yield reply
+        finally:
+            state["closed"] = True
+
+    monkeypatch.setattr(xrpl_rpc, "pages", pages)
+    return state
+
+
+def page(nfts, status=ResponseStatus.SUCCESS):
+    return Response(status=status, result={"account_nfts": nfts} if status == ResponseStatus.SUCCESS
+                    else {"error": "actNotFound"})
+
+
+@pytest.mark.parametrize("first", [xrpl_rpc.XRPLUnavailable("timed out"), page([], ResponseStatus.ERROR)])
+def test_failed_first_page_closes_the_pages(node, first):
+    node["replies"] = [first, page([{"NFTokenID": "1"}])]
+
+    with pytest.raises((xrpl_rpc.XRPLUnavailable, nft_listing.ListingError)):
+        asyncio.run(nft_listing.open_listing(WALLET))
+    assert node["closed"]
+
+
+def test_listing_stops_reading_pages_past_the_limit(node, monkeypatch):
+    async def resolve(uri):
+        return {"image": f"https://img/{uri}"}
+
+    monkeypatch.setattr(nft_listing.nft_metadata, "resolve", resolve)
+    nft = lambda n: {"NFTokenID": str(n), "URI": f"{n:02d}".encode().hex()}
+    node["replies"] = [page([nft(0), nft(1)]), page([nft(2), nft(3)]), page([nft(4)])]
+
+    async def run():
+        pages = await nft_listing.open_listing(WALLET)
+        return [event async for event in nft_listing.events(pages, offset=1, limit=2)]
+
+    events = asyncio.run(run())
+    assert sorted(e["index"] for e in events if e["type"] == "nft") == [1, 2]
+    assert events[-1]["type"] == "done" and events[-1]["next_offset"] == 3
+    assert node["closed"]
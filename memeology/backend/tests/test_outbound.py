@@ -0,0 +1,43 @@
+import asyncio
+
+import httpx
+import pytest
+
+import outbound
+import xrpl_rpc
+from xrpl.models.requests import ServerInfo
+
+
+@pytest.fixture
+def node(monkeypatch):
+    """A rippled stand-in that records how many calls it serves at once"""
+    seen = {"in_flight": 0, "max": 0}
+
+    async def handler(request):
+        seen["in_flight"] += 1
+        seen["max"] = max(seen["max"], seen["in_flight"])
+        await asyncio.sleep(0.02)
+        seen["in_flight"] -= 1
+        return httpx.Response(200, json={"result": {"status": "success", "info": {}}})
+
+    monkeypatch.setattr(outbound, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(outbound, "_host_slots", {})
+    return seen
+
+
+def test_rippled_host_is_not_capped_by_the_default_per_host_limit(node):
+    assert xrpl_rpc.XRPL_MAX_CONCURRENCY > outbound.HTTP_MAX_PER_HOST
+
+    async def run():
+        await asyncio.gather(*(xrpl_rpc.request(ServerInfo()) for _ in range(xrpl_rpc.XRPL_MAX_CONCURRENCY)))
+
+    asyncio.run(run())
+    assert node["max"] == xrpl_rpc.XRPL_MAX_CONCURRENCY
+
+
+def test_other_hosts_keep_the_default_limit(node):
+    async def run():
+        await asyncio.gather(*(outbound.get("https://gateway.example/meta.json") for _ in range(20)))
+
+    asyncio.run(run())
+    assert node["max"] == outbound.HTTP_MAX_PER_HOST
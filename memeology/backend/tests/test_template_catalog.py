@@ -0,0 +1,20 @@
+import pytest
+
+from template_catalog import TierResponse
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ('"other"', False),
+    ("{etag}", True),
+    ("W/{etag}", True),
+    ('"other", W/{etag}', True),
+    ("*", True),
+    (" * ", True),
+])
+def test_if_none_match_uses_weak_comparison(header, matches):
+    response = TierResponse(b'{"memes": []}')
+    header = header.format(etag=response.etag) if header else header
+
+    assert response.not_modified(header) is matches
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from wallet_cache import WalletCache
+
+ALICE = "rAlice111111111111111111111111"
+BOB = "rBob22222222222222222222222222"
+
+
+def payment(sender, receiver, ledger_index=100, validated=True):
+    return {"type": "transaction", "validated": validated, "ledger_index": ledger_index,
+            "transaction": {"TransactionType": "Payment", "Account": sender, "Destination": receiver},
+            "meta": {"TransactionResult": "tesSUCCESS"}}
+
+
+def test_entries_expire_after_their_ttl():
+    cache = WalletCache(ttl=60)
+    cache.put(ALICE, {"tier": "free"}, ttl=0.05)
+    cache.put(BOB, {"tier": "free"})
+
+    assert cache.get(ALICE) == {"tier": "free"}
+    time.sleep(0.06)
+    assert cache.get(ALICE) is None
+    assert cache.get(BOB) == {"tier": "free"}
+    assert cache.counters["expired"] == 1
+
+
+def test_transaction_invalidates_only_the_wallets_it_touches():
+    cache = WalletCache()
+    cache.put(ALICE, {"tier": "waldocoin"})
+    cache.put(BOB, {"tier": "free"})
+
+    cache.handle_message(payment(ALICE, "rSomeoneElse3333333333333333333", ledger_index=500))
+
+    assert cache.get(ALICE) is None
+    assert cache.get(BOB) == {"tier": "free"}
+    assert cache.counters["invalidated"] == 1
+    assert cache.changed_after(ALICE, 499) and not cache.changed_after(ALICE, 500)
+    assert not cache.changed_after(BOB, 0)
+
+
+def test_unvalidated_and_non_transaction_messages_are_ignored():
+    cache = WalletCache()
+    cache.put(ALICE, {"tier": "free"})
+
+    cache.handle_message(payment(ALICE, BOB, validated=False))
+    cache.handle_message({"type": "ledgerClosed", "ledger_index": 7, "Account": ALICE})
+
+    assert cache.get(ALICE) == {"tier": "free"}
+
+
+def test_least_recently_used_wallet_is_evicted():
+    cache = WalletCache(max_entries=2)
+    cache.put(ALICE, {"n": 1})
+    cache.put(BOB, {"n": 2})
+    cache.get(ALICE)
+    cache.put("rCarol333333333333333333333333", {"n": 3})
+
+    assert cache.get(BOB) is None
+    assert cache.get(ALICE) == {"n": 1}
+    assert cache.counters["evicted"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = WalletCache()
+    calls = []
+
+    async def loader(wallet):
+        calls.append(wallet)
+        await asyncio.sleep(0.01)
+        return {"wallet": wallet}, 30
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load(ALICE, loader) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert calls == [ALICE]
+    assert results == [{"wallet": ALICE}] * 10
+    assert cache.get(ALICE) == {"wallet": ALICE}
+
+
+def test_failed_or_uncacheable_loads_are_not_kept():
+    cache = WalletCache()
+
+    async def failing(wallet):
+        await asyncio.sleep(0)
+        raise RuntimeError("rippled unavailable")
+
+    async def uncacheable(wallet):
+        return {"wallet": wallet}, None
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_load(ALICE, failing) for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(e, RuntimeError) for e in results)
+        assert await cache.get_or_load(BOB, uncacheable) == {"wallet": BOB}
+
+    asyncio.run(run())
+    assert cache.get(ALICE) is None
+    assert cache.get(BOB) is None
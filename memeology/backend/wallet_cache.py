@@ -0,0 +1,246 @@
+"""
+Per-wallet tier cache (WLO balance, tier, premium status).
+
+create_meme -> check_user_tier -> get_wallet_balance used to send an
+AccountLines request to XRPL for every meme. The computed /api/user/tier
+result is now cached per wallet for WALLET_CACHE_TTL seconds, so repeat tier
+checks are dictionary lookups.
+
+Entries are also dropped early: a websocket connection to XRPL_WS_SERVER
+subscribes to the transaction stream of every cached wallet, and any
+validated transaction that touches a cached wallet (a WLO transfer, a trust
+line change) invalidates its entry. If the stream drops, every entry is
+dropped, because transactions may have been missed. Reconnects back off up
+to WALLET_WS_MAX_BACKOFF. With XRPL_WS_SERVER empty the cache relies on the
+TTL alone.
+
+- concurrent misses for one wallet share a single XRPL lookup
+- at most WALLET_CACHE_MAX wallets are kept (least recently used are evicted
+  and unsubscribed)
+- a transaction landing between a lookup and its subscription is only
+  covered by the TTL, which is why the TTL stays short
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+WALLET_CACHE_TTL = float(os.getenv("WALLET_CACHE_TTL", "60"))
+WALLET_CACHE_MAX = int(os.getenv("WALLET_CACHE_MAX", "10000"))
+XRPL_WS_SERVER = os.getenv("XRPL_WS_SERVER", "wss://s1.ripple.com")  # Mainnet; "" to disable
+WALLET_WS_MAX_BACKOFF = float(os.getenv("WALLET_WS_MAX_BACKOFF", "60"))
+SUBSCRIBE_BATCH = 500
+
+# A loader returns the state to cache and how long it may be cached for (None: don't cache)
+Loader = Callable[[str], Awaitable[Tuple[Dict[str, Any], Optional[float]]]]
+
+
+class WalletCache:
+    def __init__(self, ttl: float = WALLET_CACHE_TTL, max_entries: int = WALLET_CACHE_MAX):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._subscribed: Set[str] = set()
+        self._to_subscribe: Set[str] = set()
+        self._to_unsubscribe: Set[str] = set()
+        self._wake: Optional[asyncio.Event] = None
+        # wallet -> ledger of its last transaction seen on the stream
+        self._changed: "OrderedDict[str, int]" = OrderedDict()
+        self.connected = False
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidated": 0,
+                         "stream_transactions": 0, "stream_reconnects": 0, "stream_flushes": 0}
+
+    def get(self, wallet: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(wallet)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self.counters["expired"] += 1
+            self._drop(wallet)
+            return None
+        self._entries.move_to_end(wallet)
+        return state
+
+    def put(self, wallet: str, state: Dict[str, Any], ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[wallet] = (state, time.monotonic() + ttl)
+        self._entries.move_to_end(wallet)
+        if wallet not in self._subscribed:
+            self._to_subscribe.add(wallet)
+            self._to_unsubscribe.discard(wallet)
+            self._notify()
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self.counters["evicted"] += 1
+            self._drop(oldest)
+
+    def invalidate(self, wallet: str) -> bool:
+        """Forget `wallet`'s cached state; True if there was any"""
+        if wallet not in self._entries:
+            return False
+        self.counters["invalidated"] += 1
+        # Stay subscribed: the wallet is likely to be looked up again soon
+        del self._entries[wallet]
+        return True
+
+    def clear(self):
+        self._entries.clear()
+
+    def changed_after(self, wallet: str, ledger_index: int) -> bool:
+        """Whether the stream saw a transaction for `wallet` after `ledger_index`
+
+        Lets callers tell if a copy read at that ledger (the holder snapshot)
+        is already out of date. Only wallets this cache has held are tracked.
+        """
+        changed = self._changed.get(wallet)
+        return changed is not None and changed > ledger_index
+
+    async def get_or_load(self, wallet: str, loader: Loader) -> Dict[str, Any]:
+        """Cached state for `wallet`, calling `loader` once on a miss however many callers wait"""
+        state = self.get(wallet)
+        if state is not None:
+            self.counters["hits"] += 1
+            return state
+        self.counters["misses"] += 1
+        pending = self._loading.get(wallet)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[wallet] = future
+        try:
+            state, ttl = await loader(wallet)
+            if ttl is not None:
+                self.put(wallet, state, ttl)
+            future.set_result(state)
+            return state
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn about it never being retrieved
+            future.exception()
+            raise
+        finally:
+            del self._loading[wallet]
+
+    def _drop(self, wallet: str):
+        self._entries.pop(wallet, None)
+        self._to_subscribe.discard(wallet)
+        if wallet in self._subscribed:
+            self._to_unsubscribe.add(wallet)
+            self._notify()
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    # Transaction stream
+
+    def _affected(self, message: Dict[str, Any]) -> Set[str]:
+        """Cached wallets named anywhere in a transaction stream message"""
+        found: Set[str] = set()
+
+        def walk(node):
+            if isinstance(node, dict):
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+            elif isinstance(node, str) and (node in self._entries or node in self._subscribed):
+                found.add(node)
+        walk(message.get("transaction") or message.get("tx_json"))
+        walk(message.get("meta"))
+        return found
+
+    def handle_message(self, message: Dict[str, Any]):
+        if message.get("type") != "transaction" or not message.get("validated", True):
+            return
+        self.counters["stream_transactions"] += 1
+        ledger_index = message.get("ledger_index")
+        for wallet in self._affected(message):
+            self.invalidate(wallet)
+            if ledger_index is not None:
+                self._changed[wallet] = ledger_index
+                self._changed.move_to_end(wallet)
+                if len(self._changed) > self.max_entries:
+                    self._changed.popitem(last=False)
+
+    async def _send_changes(self, ws):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            for command, pending in (("unsubscribe", self._to_unsubscribe), ("subscribe", self._to_subscribe)):
+                while pending:
+                    batch = [pending.pop() for _ in range(min(len(pending), SUBSCRIBE_BATCH))]
+                    await ws.send(json.dumps({"command": command, "accounts": batch}))
+                    if command == "subscribe":
+                        self._subscribed.update(batch)
+                    else:
+                        self._subscribed.difference_update(batch)
+
+    async def _stream_once(self, url: str):
+        # websockets comes with xrpl-py
+        import websockets
+
+        async with websockets.connect(url, ping_interval=20, ping_timeout=20, close_timeout=2) as ws:
+            self.connected = True
+            self._to_subscribe.update(self._entries)
+            self._to_unsubscribe.clear()
+            self._subscribed.clear()
+            self._notify()
+            sender = asyncio.create_task(self._send_changes(ws))
+            try:
+                async for raw in ws:
+                    if sender.done():
+                        sender.result()
+                    self.handle_message(json.loads(raw))
+            finally:
+                sender.cancel()
+
+    async def run(self, url: str = XRPL_WS_SERVER):
+        """Keep the transaction subscription alive (started from the app's lifespan)"""
+        self._wake = asyncio.Event()
+        backoff = 1.0
+        while True:
+            started = time.monotonic()
+            try:
+                await self._stream_once(url)
+                error = "closed by server"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if self.connected:
+                # Anything may have changed while we weren't listening
+                self.connected = False
+                self.counters["stream_flushes"] += 1
+                self.clear()
+            self._subscribed.clear()
+            if time.monotonic() - started > 60:
+                backoff = 1.0
+            print(f"⚠️ XRPL transaction stream down ({error}); reconnecting in {backoff:.0f}s")
+            self.counters["stream_reconnects"] += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WALLET_WS_MAX_BACKOFF)
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+            "stream": XRPL_WS_SERVER or None,
+            "stream_connected": self.connected,
+            "subscribed": len(self._subscribed),
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else None,
+            **self.counters,
+        }
+
+
+cache = WalletCache()
@@ -0,0 +1,113 @@
+"""
+Async XRPL JSON-RPC over the shared outbound connection pool.
+
+xrpl-py's JsonRpcClient.request() is synchronous, so calling it from an
+async endpoint blocked the event loop for the whole round trip; its
+AsyncJsonRpcClient opens a new httpx client (and TLS handshake) per call.
+`request()` sends the same JSON-RPC body through outbound.py's pooled
+client instead and returns xrpl-py Response objects, so callers keep using
+is_successful() / result.
+
+- XRPL_TIMEOUT bounds each call (pass timeout= to override)
+- at most XRPL_MAX_CONCURRENCY calls are in flight; further callers wait up
+  to XRPL_QUEUE_TIMEOUT for a slot and then fail fast instead of piling up
+  behind a slow node. The node's host gets the same per-host limit in
+  outbound.py, so HTTP_MAX_PER_HOST does not cap it lower
+- timeouts, transport errors and a full queue raise XRPLUnavailable
+- `pages()` follows `marker` through paginated requests (AccountLines,
+  AccountNFTs, ...), holding every page to the ledger the first one was
+  read from
+"""
+import asyncio
+import dataclasses
+import os
+import time
+from json import JSONDecodeError
+from typing import AsyncIterator, Optional
+
+import httpx
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+
+import outbound
+
+XRPL_SERVER = os.getenv("XRPL_SERVER", "https://s1.ripple.com:51234")  # Mainnet
+XRPL_TIMEOUT = float(os.getenv("XRPL_TIMEOUT", "5"))
+XRPL_MAX_CONCURRENCY = int(os.getenv("XRPL_MAX_CONCURRENCY", "16"))
+XRPL_QUEUE_TIMEOUT = float(os.getenv("XRPL_QUEUE_TIMEOUT", "2"))
+
+_slots = asyncio.Semaphore(XRPL_MAX_CONCURRENCY)
+outbound.limit_host(XRPL_SERVER, XRPL_MAX_CONCURRENCY)
+_counters = {"requests": 0, "timeouts": 0, "errors": 0, "queue_full": 0, "in_flight": 0, "max_in_flight": 0}
+_queue_wait = {"count": 0, "seconds": 0.0}
+
+
+class XRPLUnavailable(Exception):
+    """The XRPL node timed out, failed, or too many calls were already waiting"""
+
+
+async def request(req: Request, timeout: Optional[float] = None, url: Optional[str] = None) -> Response:
+    """Send one XRPL request (AccountLines, Tx, ...) without blocking the event loop"""
+    waited = time.perf_counter()
+    try:
+        await asyncio.wait_for(_slots.acquire(), XRPL_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _counters["queue_full"] += 1
+        raise XRPLUnavailable(f"{XRPL_MAX_CONCURRENCY} XRPL requests already in flight")
+    _queue_wait["count"] += 1
+    _queue_wait["seconds"] += time.perf_counter() - waited
+
+    _counters["in_flight"] += 1
+    _counters["max_in_flight"] = max(_counters["max_in_flight"], _counters["in_flight"])
+    if url:
+        outbound.limit_host(url, XRPL_MAX_CONCURRENCY)
+    try:
+        response = await outbound.post(url or XRPL_SERVER, json=request_to_json_rpc(req),
+                                       timeout=timeout or XRPL_TIMEOUT)
+        _counters["requests"] += 1
+        return json_to_response(response.json())
+    except httpx.TimeoutException as e:
+        _counters["timeouts"] += 1
+        raise XRPLUnavailable(f"XRPL {req.method.value} timed out") from e
+    except (httpx.HTTPError, JSONDecodeError) as e:
+        _counters["errors"] += 1
+        raise XRPLUnavailable(f"XRPL {req.method.value} failed: {e}") from e
+    finally:
+        _counters["in_flight"] -= 1
+        _slots.release()
+
+
+async def pages(req: Request, max_pages: int = 50, timeout: Optional[float] = None) -> AsyncIterator[Response]:
+    """Successful pages of a paginated request, following `marker`
+
+    The first page's ledger_index is pinned on the rest, so a marker is never
+    read against a newer ledger. Ask for ledger_index="validated" to get
+    results that won't be rolled back. Stops at an unsuccessful page (which
+    is yielded so callers can see the error) or after `max_pages`. A caller
+    that stops early, or may raise mid-loop, should close it, e.g. with
+    contextlib.aclosing().
+    """
+    for _ in range(max_pages):
+        response = await request(req, timeout=timeout)
+        yield response
+        if not response.is_successful():
+            return
+        marker = response.result.get("marker")
+        if marker is None:
+            return
+        req = dataclasses.replace(req, marker=marker,
+                                  ledger_index=response.result.get("ledger_index", req.ledger_index))
+    raise XRPLUnavailable(f"XRPL {req.method.value} still paginating after {max_pages} pages")
+
+
+def stats() -> dict:
+    return {
+        "server": XRPL_SERVER,
+        "timeout": XRPL_TIMEOUT,
+        "max_concurrency": XRPL_MAX_CONCURRENCY,
+        "queue_timeout": XRPL_QUEUE_TIMEOUT,
+        "mean_queue_wait_ms": round(_queue_wait["seconds"] / _queue_wait["count"] * 1000, 2)
+        if _queue_wait["count"] else 0.0,
+        **_counters,
+    }
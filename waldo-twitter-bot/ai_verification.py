@@ -8,17 +8,18 @@ import os
 import json
 import hashlib
 import requests
-import redis
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+from redis_client import connect
+
 # Configuration
 GOOGLE_VISION_API_KEY = os.getenv("GOOGLE_VISION_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 TINEYE_API_KEY = os.getenv("TINEYE_API_KEY")
 REDIS_URL = os.getenv("REDIS_URL")
 
-r = redis.from_url(REDIS_URL) if REDIS_URL else None
+r = connect(REDIS_URL) if REDIS_URL else None
 
 class AIContentVerifier:
     def __init__(self):
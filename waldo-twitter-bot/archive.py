@@ -0,0 +1,232 @@
+"""
+Compressed cold archive for memes past the payout window.
+
+Expired, settled memes are moved out of their `meme:{id}` hashes into
+monthly segments: a msgpack map of tweet id -> hash fields, compressed with
+zstd. A month can have several segments, one per archive run.
+
+Segments live in Redis as plain string blobs by default:
+
+  archive:segments:{YYYY-MM}     list of segment keys for the month
+  archive:segment:{YYYY-MM}:{n}  compressed segment
+
+(the month is a literal hash tag, so a month's keys share a cluster slot)
+
+or as files under ARCHIVE_DIR when it is set:
+
+  {ARCHIVE_DIR}/{YYYY-MM}/{n}.msgpack.zst
+
+The month is taken from the meme's score in `memes:by_time`, which keeps
+archived ids, so a lookup by id is one ZSCORE plus the month's segments.
+Segments never change once written and decoded ones are cached in-process.
+
+Run `python archive_memes.py` to archive; reads fall back to the archive
+through `meme_index.fetch_memes`, and in the Node API through
+waldocoin-backend/utils/memeArchive.js (Redis-kept segments only). Anything that recomputes state from every
+meme (leaderboard rebuilds, reward_sim, meme_index.backfill) must also walk
+the segments, through `meme_index.archived_memes`, or archived memes drop
+out of its totals.
+"""
+import abc
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import msgpack
+import zstandard
+
+ZSTD_LEVEL = 10
+SEGMENT_CACHE_SIZE = int(os.getenv("ARCHIVE_SEGMENT_CACHE", 32))
+MONTH = re.compile(r"\d{4}-\d{2}")
+
+
+def month_of_score(score: float) -> str:
+    return datetime.fromtimestamp(score, tz=timezone.utc).strftime("%Y-%m")
+
+
+def encode_segment(memes: Dict[str, Dict[bytes, bytes]]) -> bytes:
+    payload = {
+        tweet_id: {k.decode(): v.decode() for k, v in data.items()}
+        for tweet_id, data in memes.items()
+    }
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(msgpack.packb(payload))
+
+
+def decode_segment(blob: bytes) -> Dict[str, Dict[bytes, bytes]]:
+    payload = msgpack.unpackb(zstandard.ZstdDecompressor().decompress(blob))
+    return {
+        tweet_id: {k.encode(): v.encode() for k, v in data.items()}
+        for tweet_id, data in payload.items()
+    }
+
+
+class SegmentStore(abc.ABC):
+    """Where segments are kept. Names are opaque strings, unique per segment"""
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, Dict[str, Dict[bytes, bytes]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def put(self, month: str, blob: bytes) -> str:
+        """Write a segment for the month and return its name"""
+
+    @abc.abstractmethod
+    def months(self) -> List[str]:
+        """Every month with at least one segment, oldest first"""
+
+    @abc.abstractmethod
+    def segments(self, months: Iterable[str]) -> Dict[str, List[str]]:
+        """Segment names per month, oldest first"""
+
+    @abc.abstractmethod
+    def _read(self, names: List[str]) -> List[Optional[bytes]]:
+        """Raw blobs in the order given, None for a segment that is gone"""
+
+    def load(self, names: List[str]) -> Dict[str, Dict[str, Dict[bytes, bytes]]]:
+        """Decoded segments by name, read in one go for the ones not cached"""
+        loaded = {}
+        with self._lock:
+            for name in names:
+                if name in self._cache:
+                    self._cache.move_to_end(name)
+                    loaded[name] = self._cache[name]
+        missing = [name for name in names if name not in loaded]
+        if missing:
+            for name, blob in zip(missing, self._read(missing)):
+                loaded[name] = decode_segment(blob) if blob else {}
+            with self._lock:
+                for name in missing:
+                    self._cache[name] = loaded[name]
+                while len(self._cache) > SEGMENT_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return loaded
+
+
+class RedisSegmentStore(SegmentStore):
+    def __init__(self, r):
+        super().__init__()
+        self.r = r
+
+    def put(self, month, blob):
+        name = f"archive:segment:{{{month}}}:{self.r.incr('archive:seq')}"
+        pipe = self.r.pipeline()
+        pipe.set(name, blob)
+        pipe.rpush(f"archive:segments:{{{month}}}", name)
+        pipe.execute()
+        return name
+
+    def months(self):
+        found = set()
+        for key in self.r.scan_iter(match="archive:segments:*", count=1000):
+            month = key.decode().rsplit(":", 1)[1].strip("{}")
+            if MONTH.fullmatch(month):
+                found.add(month)
+        return sorted(found)
+
+    def segments(self, months):
+        months = list(months)
+        pipe = self.r.pipeline(transaction=False)
+        for month in months:
+            pipe.lrange(f"archive:segments:{{{month}}}", 0, -1)
+        return {month: [n.decode() for n in names] for month, names in zip(months, pipe.execute())}
+
+    def _read(self, names):
+        pipe = self.r.pipeline(transaction=False)
+        for name in names:
+            pipe.get(name)
+        return pipe.execute()
+
+
+class DirSegmentStore(SegmentStore):
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = root
+
+    def put(self, month, blob):
+        directory = os.path.join(self.root, month)
+        os.makedirs(directory, exist_ok=True)
+        seq = len([f for f in os.listdir(directory) if f.endswith(".msgpack.zst")]) + 1
+        name = os.path.join(month, f"{seq:06d}.msgpack.zst")
+        # Write-then-rename so readers never see a partial segment
+        tmp = os.path.join(self.root, name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, os.path.join(self.root, name))
+        return name
+
+    def months(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if MONTH.fullmatch(d))
+
+    def segments(self, months):
+        found = {}
+        for month in months:
+            directory = os.path.join(self.root, month)
+            files = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+            found[month] = [os.path.join(month, f) for f in files if f.endswith(".msgpack.zst")]
+        return found
+
+    def _read(self, names):
+        blobs = []
+        for name in names:
+            try:
+                with open(os.path.join(self.root, name), "rb") as f:
+                    blobs.append(f.read())
+            except FileNotFoundError:
+                blobs.append(None)
+        return blobs
+
+
+_stores: Dict[int, SegmentStore] = {}
+
+
+def default_store(r) -> SegmentStore:
+    """ARCHIVE_DIR if set, otherwise blobs in the same Redis (one store per client)"""
+    store = _stores.get(id(r))
+    if store is None:
+        root = os.getenv("ARCHIVE_DIR")
+        store = _stores[id(r)] = DirSegmentStore(root) if root else RedisSegmentStore(r)
+    return store
+
+
+def load_archived(r, entries: List[Tuple[str, float]],
+                  store: Optional[SegmentStore] = None) -> Dict[str, Dict[bytes, bytes]]:
+    """Look up archived memes given (tweet id, index score) pairs"""
+    if not entries:
+        return {}
+    store = store or default_store(r)
+    by_month: Dict[str, List[str]] = {}
+    for tweet_id, score in entries:
+        by_month.setdefault(month_of_score(score), []).append(tweet_id)
+    segments = store.segments(by_month)
+    loaded = store.load([name for names in segments.values() for name in names])
+
+    found = {}
+    for month, ids in by_month.items():
+        # Newest segment first, in case a meme was archived twice after an interrupted run
+        for name in reversed(segments[month]):
+            for tweet_id in ids:
+                if tweet_id not in found and tweet_id in loaded[name]:
+                    found[tweet_id] = loaded[name][tweet_id]
+    return found
+
+
+def iter_archive(store: SegmentStore) -> Iterator[Tuple[str, Dict[bytes, bytes]]]:
+    """Every archived meme once, month by month; the newest copy if one was archived twice.
+
+    Segments are read one at a time and bypass the segment cache, so walking
+    the whole archive does not evict the segments the web app is using.
+    """
+    for month, names in store.segments(store.months()).items():
+        seen = set()
+        for name in reversed(names):
+            blob = store._read([name])[0]
+            for tweet_id, data in (decode_segment(blob) if blob else {}).items():
+                if tweet_id not in seen:
+                    seen.add(tweet_id)
+                    yield tweet_id, data
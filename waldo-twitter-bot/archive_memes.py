@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Move expired, settled memes from Redis into the compressed archive (archive.py)
+
+A meme is archived once it is older than the payout window and nothing can
+still change it:
+- not a stake that is unclaimed and not yet released
+- not minted and not being minted (mint records and marketplace listings
+  keep reading the hash)
+
+Its `meme:{id}` hash and legacy side keys are removed after the segment
+holding it has been written. `memes:by_time`, `wallet:memes:{wallet}` and
+`wallet:tweets:{wallet}` keep the id, so history reads (here and in the Node
+API, utils/memeArchive.js) still find it.
+
+Whole-keyspace passes read archived memes from their segments
+(meme_index.archived_memes): `python leaderboard.py` rebuilds keep their
+XP/WALDO/meme counts, reward_sim reports them but never rewrites them, and
+upgrade_db migrations leave them as archived.
+
+The oldest meme that had to stay hot is checkpointed in `archive:state`, so
+the next run starts there instead of at the beginning of the index.
+
+Archives written before `wallet:tweets` membership was kept can have it put
+back with --restore-wallet-tweets.
+
+Examples:
+  python archive_memes.py --dry-run
+  python archive_memes.py --days 30 --report
+  python archive_memes.py --restore-wallet-tweets
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from archive import SegmentStore, default_store, encode_segment, iter_archive, month_of_score
+from meme_index import MEME_INDEX_KEY
+from meme_store import legacy_keys, memory_report, print_memory_report, with_legacy_fields
+from redis_client import connect
+from redis_keys import wallet_key
+
+PAYOUT_WINDOW_DAYS = 30
+STATE_KEY = "archive:state"
+
+
+def is_settled(data: Dict[bytes, bytes], mint_pending: bool, now: float) -> bool:
+    if mint_pending or data.get(b"nft_minted") == b"true":
+        return False
+    if int(data.get(b"stake_selected", 0) or 0) and not int(data.get(b"claimed", 0) or 0):
+        release = data.get(b"stake_release", b"").decode()
+        if not release or datetime.fromisoformat(release).timestamp() > now:
+            return False
+    return True
+
+
+def archive_expired(r, store: SegmentStore, days: int = PAYOUT_WINDOW_DAYS, batch_size: int = 500,
+                    segment_size: int = 5000, dry_run: bool = False) -> Dict[str, int]:
+    now = time.time()
+    cutoff = now - days * 86400
+    resume_from = float(r.hget(STATE_KEY, "resume_from") or 0) if not dry_run else 0.0
+    oldest_hot = None
+    stats = {"scanned": 0, "archived": 0, "kept": 0, "segments": 0}
+    pending: Dict[str, List[Tuple[str, Dict[bytes, bytes]]]] = {}
+
+    def flush(month):
+        memes = pending.pop(month)
+        if dry_run:
+            stats["archived"] += len(memes)
+            return
+        store.put(month, encode_segment(dict(memes)))
+        stats["segments"] += 1
+        # Only drop the hot copies once their segment is durable
+        pipe = r.pipeline(transaction=False)
+        for tweet_id, _ in memes:
+            # One DEL per key: they hash to different cluster slots
+            for key in (f"meme:{tweet_id}", f"meme:nft_ready:{tweet_id}", *legacy_keys(tweet_id)):
+                pipe.delete(key)
+        pipe.execute()
+        stats["archived"] += len(memes)
+
+    offset = 0
+    while True:
+        rows = r.zrangebyscore(MEME_INDEX_KEY, resume_from, f"({cutoff}", start=offset, num=batch_size, withscores=True)
+        if not rows:
+            break
+        offset += len(rows)
+        ids = [tweet_id.decode() for tweet_id, _ in rows]
+
+        pipe = r.pipeline(transaction=False)
+        for tweet_id in ids:
+            pipe.hgetall(f"meme:{tweet_id}")
+            pipe.exists(f"meme:mint_pending:{tweet_id}")
+        results = pipe.execute()
+        hashes, mint_pending = results[0::2], results[1::2]
+
+        # Hashes that are already gone were archived by an earlier run
+        present = [(tweet_id, data) for tweet_id, data in zip(ids, hashes) if data]
+        pending_mints = {tweet_id for tweet_id, flag in zip(ids, mint_pending) if flag}
+        scores = dict((tweet_id.decode(), score) for tweet_id, score in rows)
+        for tweet_id, data in with_legacy_fields(r, present):
+            stats["scanned"] += 1
+            if not is_settled(data, tweet_id in pending_mints, now):
+                stats["kept"] += 1
+                oldest_hot = scores[tweet_id] if oldest_hot is None else min(oldest_hot, scores[tweet_id])
+                continue
+            month = month_of_score(scores[tweet_id])
+            pending.setdefault(month, []).append((tweet_id, data))
+            if len(pending[month]) >= segment_size:
+                flush(month)
+
+    for month in list(pending):
+        flush(month)
+
+    if not dry_run:
+        r.hset(STATE_KEY, mapping={
+            "resume_from": oldest_hot if oldest_hot is not None else cutoff,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            **stats
+        })
+    return stats
+
+
+def restore_wallet_tweets(r, store: SegmentStore, batch_size: int = 500) -> int:
+    """Put archived memes back in their `wallet:tweets` sets; returns how many were added"""
+    added = 0
+    pipe = r.pipeline(transaction=False)
+    queued = 0
+    for tweet_id, data in iter_archive(store):
+        if not data.get(b"wallet"):
+            continue
+        pipe.sadd(wallet_key("wallet:tweets", data[b"wallet"].decode()), tweet_id)
+        queued += 1
+        if queued >= batch_size:
+            added += sum(pipe.execute())
+            queued = 0
+    if queued:
+        added += sum(pipe.execute())
+    return added
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Archive expired, settled memes into compressed monthly segments")
+    ap.add_argument("--days", type=int, default=PAYOUT_WINDOW_DAYS, help="Age after which a meme can be archived")
+    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--segment-size", type=int, default=5000, help="Max memes per segment")
+    ap.add_argument("--dry-run", action="store_true", help="Only count what would be archived")
+    ap.add_argument("--report", action="store_true", help="Print Redis memory per key family before and after")
+    ap.add_argument("--restore-wallet-tweets", action="store_true",
+                    help="Only re-add archived memes to wallet:tweets (for archives written without it)")
+    return ap.parse_args()
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = parse_args()
+    r = connect()
+    if args.restore_wallet_tweets:
+        added = restore_wallet_tweets(r, default_store(r), args.batch_size)
+        print(f"✅ Restored {added} wallet:tweets membership(s)")
+        return
+    if args.report:
+        print_memory_report("Before", memory_report(r))
+
+    started = time.monotonic()
+    stats = archive_expired(r, default_store(r), args.days, args.batch_size, args.segment_size, args.dry_run)
+    label = "Would archive" if args.dry_run else "Archived"
+    print(f"✅ {label} {stats['archived']} meme(s) in {stats['segments']} segment(s), "
+          f"{stats['kept']} kept hot, {time.monotonic() - started:.1f}s")
+
+    if args.report and not args.dry_run:
+        print_memory_report("After", memory_report(r))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Offline micro-benchmarks for the ingestion and verification hot paths
+- Runs the real redis-py client against an in-process fakeredis server (or
+  a scratch Redis with --redis-url) and the recorded tweets in
+  fixtures/tweets.json; no network, Redis or Twitter credentials needed
+- Measures throughput, latency percentiles and allocations (tracemalloc) for
+  the scoring and verification helpers and the full `store_meme_tweet`
+- Counts Redis commands and round trips per stored tweet on redis-py's
+  connection, i.e. what would go over the wire, MULTI/EXEC included
+- Saves results as a baseline and flags regressions against it
+
+Examples:
+  python bench_ingest.py
+  python bench_ingest.py --save baseline.json
+  python bench_ingest.py --baseline baseline.json --fail-on-regression
+  python bench_ingest.py --only store_meme_tweet --iterations 5000
+  python bench_ingest.py --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tweets.json")
+
+
+# === Redis with command counting ===
+class CommandCounter:
+    """Commands and round trips as redis-py sends them, counted on the connection"""
+
+    def __init__(self):
+        self.commands: Counter = Counter()
+        self.round_trips = 0
+
+    def clear(self):
+        self.commands.clear()
+        self.round_trips = 0
+
+    def count(self, args):
+        name = args[0].decode() if isinstance(args[0], bytes) else str(args[0])
+        self.commands[name.lower()] += 1
+
+
+def counting_connection(base: type, counter: CommandCounter) -> type:
+    """`base` (a redis-py Connection class) counting into `counter`.
+
+    Every command, pipelined or not, is packed by send_command or
+    pack_commands, and every write to the socket is one round trip.
+    """
+
+    class CountingConnection(base):
+        def send_command(self, *args, **kwargs):
+            counter.count(args)
+            return super().send_command(*args, **kwargs)
+
+        def pack_commands(self, commands):
+            commands = list(commands)
+            for args in commands:
+                counter.count(args)
+            return super().pack_commands(commands)
+
+        def send_packed_command(self, command, check_health=True):
+            counter.round_trips += 1
+            return super().send_packed_command(command, check_health)
+
+    return CountingConnection
+
+
+def counting_client(url: Optional[str] = None):
+    """A redis-py client with a `counter`, for a real server at `url` or an in-process fakeredis one.
+
+    The URL must point at a scratch database: the benchmarks write to it.
+    """
+    counter = CommandCounter()
+    if url:
+        import redis
+
+        client = redis.Redis.from_url(url, connection_class=counting_connection(redis.Connection, counter))
+    else:
+        try:
+            import fakeredis
+        except ImportError:
+            sys.exit("❌ Install fakeredis (pip install fakeredis) or pass --redis-url with a scratch database")
+        client = fakeredis.FakeRedis(connection_class=counting_connection(fakeredis.FakeRedisConnection, counter))
+    client.counter = counter
+    return client
+
+
+# === Fixtures ===
+def load_fixtures(path: str = FIXTURES) -> Dict[str, list]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def seed_redis(r, fixtures: Dict[str, list]):
+    """Linked wallets, cached handles and profiles for every fixture author"""
+    for user in fixtures["users"]:
+        r.set(f"twitter_id:{user['id']}", user["username"])
+        r.set(f"twitter:{user['username'].lower()}", user["wallet"])
+        r.set(f"profile:{user['id']}", json.dumps(user["profile"]))
+    # Keep the daily limit out of the way so every iteration takes the full path
+    r.set("limits:meme_daily", 10 ** 9)
+    r.counter.clear()
+
+
+def tweet_stream(fixtures: Dict[str, list]):
+    """Recorded tweets, replayed forever with fresh ids and texts"""
+    n = 0
+    while True:
+        for tweet in fixtures["tweets"]:
+            n += 1
+            yield dict(tweet, id=f"{tweet['id']}{n:07d}", text=f"{tweet['text']} #{n}")
+
+
+# === Measurement ===
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(fn: Callable[[], Any], iterations: int, batch: int, alloc_samples: int = 200) -> Dict[str, float]:
+    """Time `fn` in batches (so timer overhead does not swamp tiny functions), then sample allocations"""
+    for _ in range(min(iterations // 10, 1000)):
+        fn()
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(max(iterations // batch, 1)):
+        t0 = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        samples.append((time.perf_counter() - t0) / batch)
+    elapsed = time.perf_counter() - started
+    calls = max(iterations // batch, 1) * batch
+
+    tracemalloc.start()
+    peaks, blocks = [], []
+    for _ in range(alloc_samples):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        snapshot_before = tracemalloc.take_snapshot() if not blocks else None
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        if snapshot_before is not None:
+            diff = tracemalloc.take_snapshot().compare_to(snapshot_before, "lineno")
+            blocks.append(sum(max(stat.count_diff, 0) for stat in diff))
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": round(calls / elapsed, 1),
+        "mean_us": round(sum(samples) / len(samples) * 1e6, 3),
+        "p50_us": round(percentile(samples, 50) * 1e6, 3),
+        "p99_us": round(percentile(samples, 99) * 1e6, 3),
+        "alloc_peak_bytes": int(sum(peaks) / len(peaks)),
+        "retained_blocks": blocks[0] if blocks else 0,
+    }
+
+
+# === Benchmarks ===
+def build_benchmarks(bot, r, fixtures: Dict[str, list]) -> Dict[str, tuple]:
+    """name -> (callable, batch size). Each callable cycles through the fixtures"""
+    # Imported after load_bot() has set the environment they read
+    from waldo_core import rewards, verification
+
+    tweets = fixtures["tweets"]
+    stream = tweet_stream(fixtures)
+
+    def cycle(fn):
+        state = {"i": 0}
+
+        def run():
+            item = tweets[state["i"] % len(tweets)]
+            state["i"] += 1
+            return fn(item)
+        return run
+
+    def originality():
+        # Fresh id + text each time, so the duplicate-text cache is exercised like in production
+        return asyncio.run(verification.check_originality_free(r, next(stream)))
+
+    return {
+        "calculate_xp": (cycle(lambda t: rewards.calculate_xp(
+            t["public_metrics"]["like_count"], t["public_metrics"]["retweet_count"])), 200),
+        "calculate_rewards": (cycle(lambda t: rewards.calculate_rewards(
+            t["public_metrics"]["like_count"], t["public_metrics"]["retweet_count"], "instant")), 200),
+        "analyze_content_free": (cycle(lambda t: verification.analyze_content_free(t["text"])), 50),
+        "calculate_spam_score_free": (cycle(lambda t: verification.calculate_spam_score_free(t["text"])), 50),
+        "analyze_twitter_profile_free": (cycle(lambda t: verification.analyze_twitter_profile_free(r, t)), 50),
+        "check_originality_free": (originality, 1),
+        "store_meme_tweet": (lambda: bot.store_meme_tweet(next(stream)), 1),
+    }
+
+
+def redis_profile(bot, r, fixtures: Dict[str, list], tweets: int = 200) -> Dict[str, Any]:
+    """Redis commands and round trips per stored tweet"""
+    stream = tweet_stream(fixtures)
+    r.counter.clear()
+    stored = sum(1 for _ in range(tweets) if bot.store_meme_tweet(next(stream)))
+    counter = r.counter
+    return {
+        "tweets": tweets,
+        "stored": stored,
+        "commands_per_tweet": round(sum(counter.commands.values()) / tweets, 2),
+        "round_trips_per_tweet": round(counter.round_trips / tweets, 2),
+        "by_command": {name: round(count / tweets, 2) for name, count in sorted(counter.commands.items())},
+    }
+
+
+def load_bot(ai: bool, redis_url: Optional[str] = None):
+    """Import main.py against a counting client: no Twitter or XRPL connections are made"""
+    os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")  # main.py's own client is never used
+    os.environ["AI_CONTENT_VERIFICATION_ENABLED"] = "true" if ai else "false"
+    os.environ["JOURNAL_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-ingest-"), "journal.sqlite3")
+    os.environ.setdefault("LOG_FILE", os.devnull)  # records are still queued and formatted
+    os.environ.setdefault("TRACE_FILE", "")  # spans are still recorded, just not written to traces.ndjson
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import main as bot
+
+    r = counting_client(redis_url)
+    bot.r = r
+    return bot, r
+
+
+# === Report ===
+def compare(result: dict, baseline: Optional[dict], threshold: float) -> List[str]:
+    """Names of benchmarks that got slower (or use more Redis commands) than the baseline allows"""
+    if not baseline:
+        return []
+    regressions = []
+    for name, stats in result["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous and stats["mean_us"] > previous["mean_us"] * (1 + threshold):
+            regressions.append(name)
+    previous = baseline.get("redis", {})
+    for metric in ("commands_per_tweet", "round_trips_per_tweet"):
+        if previous.get(metric) is not None and result["redis"][metric] > previous[metric]:
+            regressions.append(f"redis.{metric}")
+    return regressions
+
+
+def print_report(result: dict, baseline: Optional[dict], regressions: List[str]):
+    def delta(current, previous):
+        if not previous:
+            return ""
+        return f"  ({(current - previous) / previous * 100:+.1f}%)"
+
+    base = (baseline or {}).get("benchmarks", {})
+    print(f"\n📊 Ingestion micro-benchmarks (Python {result['python']}, AI checks {'on' if result['ai'] else 'off'})")
+    print(f"   {'benchmark':<30} {'ops/s':>12} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'peak B':>9} {'blocks':>7}")
+    for name, stats in result["benchmarks"].items():
+        flag = "  ⚠️ REGRESSION" if name in regressions else ""
+        print(f"   {name:<30} {stats['ops_per_sec']:>12,.0f} {stats['mean_us']:>10.2f} {stats['p50_us']:>10.2f} "
+              f"{stats['p99_us']:>10.2f} {stats['alloc_peak_bytes']:>9} {stats['retained_blocks']:>7}"
+              f"{delta(stats['mean_us'], base.get(name, {}).get('mean_us'))}{flag}")
+
+    redis_stats = result["redis"]
+    base_redis = (baseline or {}).get("redis", {})
+    print(f"\n🧮 Redis per stored tweet ({redis_stats['stored']}/{redis_stats['tweets']} stored): "
+          f"{redis_stats['commands_per_tweet']} commands"
+          f"{delta(redis_stats['commands_per_tweet'], base_redis.get('commands_per_tweet'))}, "
+          f"{redis_stats['round_trips_per_tweet']} round trips"
+          f"{delta(redis_stats['round_trips_per_tweet'], base_redis.get('round_trips_per_tweet'))}")
+    print("   " + ", ".join(f"{name}={count}" for name, count in redis_stats["by_command"].items()))
+    if regressions:
+        print(f"\n⚠️ Regressions vs baseline: {', '.join(regressions)}")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Offline micro-benchmarks for the WALDO bot ingestion hot paths")
+    ap.add_argument("--iterations", type=int, default=2000, help="Calls per benchmark")
+    ap.add_argument("--only", action="append", default=[], help="Run benchmarks matching this glob (repeatable)")
+    ap.add_argument("--no-ai", action="store_true", help="Run store_meme_tweet with AI verification disabled")
+    ap.add_argument("--redis-url", help="Scratch Redis to run against instead of in-process fakeredis")
+    ap.add_argument("--save", help="Write results as JSON to this path")
+    ap.add_argument("--baseline", help="Compare against results saved with --save")
+    ap.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown vs baseline (0.10 = 10%%)")
+    ap.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if anything regressed")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    fixtures = load_fixtures()
+    bot, r = load_bot(ai=not args.no_ai, redis_url=args.redis_url)
+    seed_redis(r, fixtures)
+
+    # The hot paths print on every tweet; keep that out of the timings
+    real_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        results = {}
+        for name, (fn, batch) in build_benchmarks(bot, r, fixtures).items():
+            if args.only and not any(fnmatch.fnmatch(name, pattern) for pattern in args.only):
+                continue
+            iterations = args.iterations if batch > 1 else max(args.iterations // 4, 50)
+            results[name] = measure(fn, iterations, batch)
+        redis_stats = redis_profile(bot, r, fixtures)
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    result = {"python": platform.python_version(), "ai": not args.no_ai,
+              "iterations": args.iterations, "benchmarks": results, "redis": redis_stats}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(result, baseline, args.threshold)
+    print_report(result, baseline, regressions)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Payout throughput benchmark for the WALDO bot
+- Starts a local fake rippled JSON-RPC server (configurable ledger close time,
+  per-call latency and error injection)
+- Drives either `send_waldo` directly or the `/payout` route with N concurrent claims
+- Reports throughput, latency percentiles and a per-phase breakdown
+  (autofill, sign, submit, validation) plus rippled RPC calls per payout
+
+The route mode seeds throwaway `meme:bench-*` hashes and needs REDIS_URL;
+they are deleted again when the run finishes.
+
+Examples:
+  # 200 payouts through send_waldo, 10 at a time, 1s ledgers
+  python bench_payout.py --claims 200 --concurrency 10
+
+  # Same through the Flask /payout route with 5% injected RPC errors
+  python bench_payout.py --mode route --claims 100 --error-rate 0.05
+
+  # Save a run and compare a later one against it
+  python bench_payout.py --save baseline.json
+  python bench_payout.py --baseline baseline.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from xrpl.clients import JsonRpcClient
+from xrpl.core.binarycodec import decode
+from xrpl.wallet import Wallet
+
+PHASES = ["autofill", "sign", "submit", "validation"]
+HASH_PREFIX_TX_ID = "54584E00"  # "TXN\0"
+
+
+# === Fake rippled ===
+class FakeRippled:
+    """In-memory ledger that answers the JSON-RPC calls xrpl-py makes for a Payment"""
+
+    def __init__(self, close_time: float = 1.0, rpc_latency: float = 0.0, error_rate: float = 0.0):
+        self.close_time = close_time
+        self.rpc_latency = rpc_latency
+        self.error_rate = error_rate
+        self.validated_ledger = 1000
+        self.next_sequence: Dict[str, int] = defaultdict(lambda: 1)
+        self.txs: Dict[str, dict] = {}
+        self.calls: Counter = Counter()
+        self.injected: Counter = Counter()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRippled":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, payload = fake.handle(json.loads(body or b"{}"))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json" if status == 200 else "text/plain")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._close_ledgers, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+
+    def _close_ledgers(self):
+        while not self._stop.wait(self.close_time):
+            with self.lock:
+                self.validated_ledger += 1
+
+    def handle(self, rpc: dict):
+        method = rpc.get("method", "")
+        params = (rpc.get("params") or [{}])[0]
+        with self.lock:
+            self.calls[method] += 1
+
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+        if self.error_rate and random.random() < self.error_rate:
+            if random.random() < 0.5:
+                with self.lock:
+                    self.injected["http_503"] += 1
+                return 503, b"Service Unavailable"
+            with self.lock:
+                self.injected["tooBusy"] += 1
+            return 200, self._result({"status": "error", "error": "tooBusy"})
+
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            return 200, self._result({"status": "error", "error": "unknownCmd"})
+        with self.lock:
+            result = handler(params)
+        result.setdefault("status", "success")
+        return 200, self._result(result)
+
+    @staticmethod
+    def _result(result: dict) -> bytes:
+        return json.dumps({"result": result}).encode()
+
+    def _rpc_server_info(self, params):
+        return {"info": {"build_version": "2.2.0", "complete_ledgers": f"1-{self.validated_ledger}"}}
+
+    def _rpc_ledger(self, params):
+        return {"ledger_index": self.validated_ledger, "ledger_hash": "0" * 64, "validated": True}
+
+    def _rpc_fee(self, params):
+        return {
+            "current_ledger_size": "10",
+            "current_queue_size": "0",
+            "drops": {"base_fee": "10", "median_fee": "5000", "minimum_fee": "10", "open_ledger_fee": "10"},
+            "expected_ledger_size": "1000",
+            "ledger_current_index": self.validated_ledger + 1,
+            "levels": {"median_level": "128000", "minimum_level": "256",
+                       "open_ledger_level": "256", "reference_level": "256"},
+            "max_queue_size": "2000",
+        }
+
+    def _rpc_account_info(self, params):
+        account = params["account"]
+        return {
+            "account_data": {"Account": account, "Balance": "100000000000", "Flags": 0,
+                             "LedgerEntryType": "AccountRoot", "OwnerCount": 1,
+                             "Sequence": self.next_sequence[account]},
+            "ledger_current_index": self.validated_ledger + 1,
+            "validated": False,
+        }
+
+    def _rpc_submit(self, params):
+        blob = params["tx_blob"]
+        tx = decode(blob)
+        tx_hash = hashlib.sha512(bytes.fromhex(HASH_PREFIX_TX_ID + blob)).hexdigest()[:64].upper()
+        expected = self.next_sequence[tx["Account"]]
+
+        # Same rule rippled applies to a single account: sequences must be used in order
+        if tx["Sequence"] < expected:
+            engine_result = "tefPAST_SEQ"
+        elif tx["Sequence"] > expected:
+            engine_result = "terPRE_SEQ"
+        else:
+            engine_result = "tesSUCCESS"
+            self.next_sequence[tx["Account"]] = expected + 1
+            self.txs[tx_hash] = {"ledger": self.validated_ledger + 1, "tx": tx}
+
+        return {
+            "accepted": engine_result == "tesSUCCESS",
+            "applied": engine_result == "tesSUCCESS",
+            "engine_result": engine_result,
+            "engine_result_code": 0 if engine_result == "tesSUCCESS" else -1,
+            "engine_result_message": engine_result,
+            "tx_blob": blob,
+            "tx_json": dict(tx, hash=tx_hash),
+        }
+
+    def _rpc_tx(self, params):
+        tx_hash = params["transaction"]
+        entry = self.txs.get(tx_hash)
+        if not entry:
+            return {"status": "error", "error": "txnNotFound"}
+        validated = self.validated_ledger >= entry["ledger"]
+        result = dict(entry["tx"], hash=tx_hash, ledger_index=entry["ledger"], validated=validated)
+        if validated:
+            result["meta"] = {"TransactionResult": "tesSUCCESS"}
+        return result
+
+
+# === Measurement ===
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def phase_breakdown(timings: Dict[str, float]) -> Dict[str, float]:
+    return {phase: timings.get(phase, 0.0) for phase in PHASES}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.phases: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def ok(self, latency: float, phases: Optional[Dict[str, float]]):
+        with self.lock:
+            self.latencies.append(latency)
+            for name, value in (phases or {}).items():
+                self.phases[name].append(value)
+
+    def fail(self, error: str):
+        with self.lock:
+            self.errors[error[:80]] += 1
+
+
+def prepare_env(fake: FakeRippled) -> Wallet:
+    """Point main.py at the fake node before it is imported"""
+    distributor = Wallet.create()
+    os.environ["LIVE_MODE"] = "true"
+    os.environ["XRPL_NODE"] = fake.url
+    os.environ["DISTRIBUTOR_SECRET"] = distributor.seed
+    os.environ["WALDO_ISSUER"] = Wallet.create().classic_address
+    os.environ.setdefault("X_ADMIN_KEY", uuid.uuid4().hex)
+    return distributor
+
+
+async def drive_send_waldo(main, fake: FakeRippled, claims: int, concurrency: int, rec: Recorder):
+    destination = Wallet.create().classic_address
+    gate = asyncio.Semaphore(concurrency)
+
+    async def claim():
+        async with gate:
+            client = JsonRpcClient(fake.url)
+            timings: Dict[str, float] = {}
+            started = time.perf_counter()
+            try:
+                await main.send_waldo(destination, 1.0, client=client, timings=timings)
+            except Exception as e:
+                rec.fail(f"{type(e).__name__}: {e}")
+                return
+            rec.ok(time.perf_counter() - started, phase_breakdown(timings))
+
+    await asyncio.gather(*(claim() for _ in range(claims)))
+
+
+def drive_route(main, fake: FakeRippled, claims: int, concurrency: int, rec: Recorder):
+    destination = Wallet.create().classic_address
+    run_id = uuid.uuid4().hex[:8]
+    tweet_ids = [f"bench-{run_id}-{i}" for i in range(claims)]
+    created_at = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+
+    pipe = main.r.pipeline(transaction=False)
+    for tweet_id in tweet_ids:
+        pipe.hset(f"meme:{tweet_id}", mapping={
+            "wallet": destination, "waldo": 1.0, "created_at": created_at,
+            "reward_type": "instant", "claimed": 0,
+        })
+    pipe.execute()
+
+    # Wrap send_waldo so the route's calls report their phases too
+    original = main.send_waldo
+    phases_by_thread = threading.local()
+
+    async def timed_send_waldo(wallet, amount, timings=None, **kwargs):
+        timings = {} if timings is None else timings
+        kwargs.setdefault("client", JsonRpcClient(fake.url))
+        result = await original(wallet, amount, timings=timings, **kwargs)
+        phases_by_thread.value = phase_breakdown(timings)
+        return result
+
+    main.send_waldo = timed_send_waldo
+    main.limiter.enabled = False
+    headers = {"X-Admin-Key": os.environ["X_ADMIN_KEY"]}
+
+    def claim(tweet_id):
+        phases_by_thread.value = None
+        started = time.perf_counter()
+        res = main.app.test_client().post(f"/payout/instant/{tweet_id}", headers=headers)
+        if res.status_code == 200:
+            rec.ok(time.perf_counter() - started, phases_by_thread.value)
+        else:
+            rec.fail(f"HTTP {res.status_code}: {(res.get_json() or {}).get('error', '')}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(claim, tweet_ids))
+    finally:
+        main.send_waldo = original
+        main.r.delete(*[f"meme:{tweet_id}" for tweet_id in tweet_ids])
+
+
+# === Report ===
+def summarize(args, rec: Recorder, fake: FakeRippled, elapsed: float) -> dict:
+    done = len(rec.latencies)
+    return {
+        "mode": args.mode,
+        "claims": args.claims,
+        "concurrency": args.concurrency,
+        "close_time": args.close_time,
+        "rpc_latency_ms": args.rpc_latency_ms,
+        "error_rate": args.error_rate,
+        "succeeded": done,
+        "failed": sum(rec.errors.values()),
+        "elapsed_s": round(elapsed, 3),
+        "payouts_per_min": round(done / elapsed * 60, 1) if elapsed else 0.0,
+        "latency_ms": {p: round(percentile(rec.latencies, q) * 1000, 1)
+                       for p, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))},
+        "phases_ms": {name: {"mean": round(sum(v) / len(v) * 1000, 1),
+                             "p50": round(percentile(v, 50) * 1000, 1),
+                             "p99": round(percentile(v, 99) * 1000, 1)}
+                      for name in PHASES if (v := rec.phases.get(name))},
+        "rpc_calls_per_payout": {m: round(c / max(args.claims, 1), 2) for m, c in sorted(fake.calls.items())},
+        "injected_errors": dict(fake.injected),
+        "errors": dict(rec.errors.most_common(10)),
+    }
+
+
+def print_report(result: dict, baseline: Optional[dict]):
+    def delta(current, previous):
+        if not previous:
+            return ""
+        return f"  ({(current - previous) / previous * 100:+.1f}% vs baseline)"
+
+    base = baseline or {}
+    print(f"\n📊 Payout benchmark ({result['mode']}): {result['claims']} claims, "
+          f"concurrency {result['concurrency']}, ledger close {result['close_time']}s, "
+          f"error rate {result['error_rate']:.0%}")
+    print(f"✅ Succeeded: {result['succeeded']}  ❌ Failed: {result['failed']}  ⏱️ {result['elapsed_s']}s")
+    print(f"🚀 Throughput: {result['payouts_per_min']} payouts/min"
+          f"{delta(result['payouts_per_min'], base.get('payouts_per_min'))}")
+    for name, value in result["latency_ms"].items():
+        print(f"   latency {name}: {value} ms{delta(value, base.get('latency_ms', {}).get(name))}")
+    if result["phases_ms"]:
+        print("🔬 Per-phase (ms):")
+        for name, stats in result["phases_ms"].items():
+            previous = base.get("phases_ms", {}).get(name, {}).get("mean")
+            print(f"   {name:<11} mean {stats['mean']:>9}  p50 {stats['p50']:>9}  p99 {stats['p99']:>9}"
+                  f"{delta(stats['mean'], previous)}")
+    print(f"📡 rippled calls per payout: {result['rpc_calls_per_payout']}")
+    if result["injected_errors"]:
+        print(f"💉 Injected errors: {result['injected_errors']}")
+    for error, count in result["errors"].items():
+        print(f"   {count}x {error}")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Benchmark WALDO payouts against a local fake rippled")
+    ap.add_argument("--mode", choices=["send_waldo", "route"], default="send_waldo")
+    ap.add_argument("--claims", type=int, default=100, help="Number of payouts to run")
+    ap.add_argument("--concurrency", type=int, default=10, help="Claims in flight at once")
+    ap.add_argument("--close-time", type=float, default=1.0, help="Seconds between validated ledgers")
+    ap.add_argument("--rpc-latency-ms", type=float, default=0.0, help="Delay added to every rippled call")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of rippled calls that fail")
+    ap.add_argument("--seed", type=int, help="Random seed for error injection")
+    ap.add_argument("--save", help="Write results as JSON to this path")
+    ap.add_argument("--baseline", help="Compare against results saved with --save")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    fake = FakeRippled(args.close_time, args.rpc_latency_ms / 1000, args.error_rate).start()
+    prepare_env(fake)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import main as bot
+
+    rec = Recorder()
+    started = time.perf_counter()
+    try:
+        if args.mode == "route":
+            drive_route(bot, fake, args.claims, args.concurrency, rec)
+        else:
+            asyncio.run(drive_send_waldo(bot, fake, args.claims, args.concurrency, rec))
+    finally:
+        elapsed = time.perf_counter() - started
+        fake.stop()
+
+    result = summarize(args, rec, fake, elapsed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
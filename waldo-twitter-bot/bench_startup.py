@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the bot's entry points
+- Imports each entry point in a fresh interpreter, N times, and reports the
+  median wall time (interpreter start included)
+- Lists the heavy third-party packages each entry point loads, so
+  `import waldo_core` and `import waldo_core.ingest` can be seen to load none
+- `--top` lists the slowest imports of one entry point (python -X importtime)
+- Saves results as a baseline and compares later runs against it
+
+Nothing connects: REDIS_URL points at an unused port, since clients connect lazily.
+
+Examples:
+  python bench_startup.py
+  python bench_startup.py --save startup.json
+  python bench_startup.py --baseline startup.json
+  python bench_startup.py --top scan_user
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> statement that loads everything the entry point needs before doing I/O
+ENTRY_POINTS = {
+    "python": "pass",
+    "main (web app)": "import main",
+    "scan_user": "import scan_user",
+    "view_db": "import view_db",
+    "upgrade_db": "import upgrade_db",
+    "archive_memes": "import archive_memes",
+    "leaderboard": "import leaderboard",
+    "reward_sim": "import reward_sim",
+    "poster": "import poster",
+    "waldo_core": "import waldo_core",
+    "waldo_core.ingest": "import waldo_core.ingest",
+}
+
+# Third-party packages that dominate import time; only entry points that use them should load them
+HEAVY_MODULES = ("flask", "numpy", "prometheus_client", "redis", "requests", "msgpack", "zstandard", "xrpl")
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+    env["JOURNAL_PATH"] = os.path.join(tempfile.gettempdir(), "bench-startup-journal.sqlite3")
+    return env
+
+
+def time_import(statement: str, runs: int) -> Optional[float]:
+    """Median seconds for `python -c statement`, None if it fails"""
+    env = child_env()
+    # One untimed run so the bytecode cache is warm, as it is in production
+    if subprocess.run([sys.executable, "-c", statement], cwd=HERE, env=env, capture_output=True).returncode:
+        return None
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=HERE, env=env, capture_output=True)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def heavy_imports(statement: str) -> List[str]:
+    """HEAVY_MODULES that `statement` leaves in sys.modules"""
+    check = f"{statement}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    res = subprocess.run([sys.executable, "-c", check], cwd=HERE, env=child_env(), capture_output=True, text=True)
+    return res.stdout.split()
+
+
+def top_imports(statement: str, limit: int) -> List[tuple]:
+    """(cumulative µs, module) for the slowest top-level imports of `statement`"""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=HERE, env=child_env(),
+                         capture_output=True, text=True)
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # The entry point and what it imports directly, not their dependencies
+        if depth <= 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Measure cold-start time of the bot's entry points")
+    ap.add_argument("--runs", type=int, default=7, help="Timed runs per entry point")
+    ap.add_argument("--only", action="append", default=[], help="Entry point to measure (repeatable)")
+    ap.add_argument("--top", metavar="ENTRY_POINT", help="List the slowest imports of one entry point")
+    ap.add_argument("--save", help="Write results as JSON to this path")
+    ap.add_argument("--baseline", help="Compare against results saved with --save")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.top:
+        print(f"🐢 Slowest imports of {args.top}:")
+        for cumulative, name in top_imports(ENTRY_POINTS[args.top], 15):
+            print(f"   {cumulative / 1000:>8.1f} ms  {name}")
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"⏱️ Cold start, median of {args.runs} runs:")
+    for name, statement in ENTRY_POINTS.items():
+        if args.only and name not in args.only:
+            continue
+        seconds = time_import(statement, args.runs)
+        if seconds is None:
+            print(f"   {name:<18} ❌ import failed")
+            continue
+        results[name] = round(seconds * 1000, 1)
+        previous = baseline.get(name)
+        delta = f"  ({(results[name] - previous) / previous * 100:+.1f}% vs {previous} ms)" if previous else ""
+        heavy = ", ".join(heavy_imports(statement)) or "-"
+        print(f"   {name:<18} {results[name]:>8.1f} ms  loads: {heavy}{delta}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
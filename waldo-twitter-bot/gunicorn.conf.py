@@ -0,0 +1,19 @@
+# Gunicorn settings for multi-worker runs (picked up from the working directory).
+# prometheus_client needs PROMETHEUS_MULTIPROC_DIR set before workers import it,
+# so /metrics can aggregate every worker (see metrics.py).
+import os
+import shutil
+
+PROMETHEUS_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/waldo-prometheus")
+
+
+def on_starting(server):
+    # Files left by a previous run would be summed into the new one
+    shutil.rmtree(PROMETHEUS_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,150 @@
+"""
+Write-behind journal for ingestion while Redis is slow or unavailable.
+
+When a Redis call times out or the connection drops during ingestion, the
+work is appended to a local SQLite journal (JOURNAL_PATH) instead of being
+lost with the poll cycle. A background replayer applies journaled entries in
+order once Redis answers again.
+
+Entries have a kind (which handler replays them), an idempotency key (a
+second append with the same key is ignored) and a JSON payload. Handlers
+must be idempotent: an entry whose write reached Redis just before the
+error is replayed anyway.
+
+The journal is bounded by JOURNAL_MAX_ENTRIES; appends beyond that are
+dropped and counted. Entries that keep failing for reasons other than Redis
+being down are parked as dead after JOURNAL_MAX_ATTEMPTS.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+
+import logs
+
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "journal.sqlite3")
+JOURNAL_MAX_ENTRIES = int(os.getenv("JOURNAL_MAX_ENTRIES", 50000))
+JOURNAL_MAX_ATTEMPTS = int(os.getenv("JOURNAL_MAX_ATTEMPTS", 5))
+
+# Errors that mean "Redis is unavailable right now", as opposed to a bad entry
+REDIS_DOWN = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+log = logs.get_logger("journal")
+
+
+class Journal:
+    def __init__(self, path: str = JOURNAL_PATH, max_entries: int = JOURNAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                dead INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.counters = {"appended": 0, "dropped": 0, "replayed": 0, "failed": 0}
+        self.last_replay_at: Optional[float] = None
+
+    def append(self, kind: str, key: str, payload: Dict[str, Any]) -> bool:
+        """Journal one entry; False if the journal is full"""
+        with self.lock:
+            depth = self.db.execute("SELECT COUNT(*) FROM entries WHERE dead = 0").fetchone()[0]
+            if depth >= self.max_entries:
+                self.counters["dropped"] += 1
+                return False
+            cur = self.db.execute(
+                "INSERT OR IGNORE INTO entries (kind, key, payload, created_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(payload), time.time())
+            )
+            self.counters["appended"] += cur.rowcount
+        return True
+
+    def pending(self, limit: int = 50) -> List[tuple]:
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, kind, key, payload FROM entries WHERE dead = 0 ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+
+    def ack(self, entry_id: int):
+        with self.lock:
+            self.db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            self.counters["replayed"] += 1
+            self.last_replay_at = time.time()
+
+    def fail(self, entry_id: int, error: str):
+        with self.lock:
+            self.db.execute(
+                "UPDATE entries SET attempts = attempts + 1, last_error = ?, dead = (attempts + 1 >= ?) WHERE id = ?",
+                (error[:500], JOURNAL_MAX_ATTEMPTS, entry_id)
+            )
+            self.counters["failed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Depth and lag (age of the oldest pending entry, seconds) plus counters"""
+        with self.lock:
+            depth, oldest = self.db.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM entries WHERE dead = 0"
+            ).fetchone()
+            dead = self.db.execute("SELECT COUNT(*) FROM entries WHERE dead = 1").fetchone()[0]
+            return {
+                "depth": depth,
+                "dead": dead,
+                "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+                "max_entries": self.max_entries,
+                "last_replay_at": self.last_replay_at,
+                **self.counters
+            }
+
+
+def replay_once(journal: Journal, handlers: Dict[str, Callable[[Dict[str, Any]], Any]], batch_size: int = 50) -> int:
+    """Apply up to one batch in order. Stops at the first Redis error so order is kept"""
+    done = 0
+    for entry_id, kind, key, payload in journal.pending(batch_size):
+        try:
+            handlers[kind](json.loads(payload))
+        except REDIS_DOWN:
+            raise
+        except Exception as e:
+            log.error("journal_replay_failed", stage="journal", key=key, kind=kind, error=str(e))
+            journal.fail(entry_id, str(e))
+            continue
+        journal.ack(entry_id)
+        done += 1
+    return done
+
+
+def run_replayer(journal: Journal, r, handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+                 idle: float = 1.0, max_backoff: float = 30.0):
+    """Replay forever; meant for a daemon thread"""
+    backoff = idle
+    while True:
+        try:
+            if not journal.stats()["depth"]:
+                time.sleep(idle)
+                continue
+            r.ping()
+            replayed = replay_once(journal, handlers)
+            if replayed:
+                log.info("journal_replayed", stage="journal", replayed=replayed, depth=journal.stats()["depth"])
+            else:
+                time.sleep(idle)
+            backoff = idle
+        except REDIS_DOWN:
+            backoff = min(backoff * 2, max_backoff)
+            time.sleep(backoff)
+        except Exception as e:
+            log.error("journal_replayer_error", stage="journal", error=str(e), exc_info=True)
+            time.sleep(backoff)
@@ -0,0 +1,177 @@
+"""
+Sorted-set leaderboards, maintained as memes are stored.
+
+  leaderboard:{board}           all-time scores per wallet
+  leaderboard:{board}:{YYYY-MM} monthly partition (by the meme's created_at)
+
+Boards: xp (XP earned), waldo (WALDO earned), memes (memes accepted).
+`store_meme_tweet` calls `record_meme` inside its own pipeline, so the
+leaderboards change in the same MULTI/EXEC as the meme itself. Top-N and
+"my rank" are ZREVRANGE / ZREVRANK, O(log N). reward_sim.py --write moves
+the boards by each re-tiered meme's delta through `adjust_meme`.
+
+Run this file to rebuild every board from the stored memes, hot hashes and
+the cold archive (archive.py) alike:
+  python leaderboard.py
+"""
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from meme_index import archived_memes, is_meme_key, meme_score
+from redis_client import connect, is_cluster
+
+BOARDS = ("xp", "waldo", "memes")
+MONTH = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+BOARD_KEY = re.compile(rf"leaderboard:({'|'.join(BOARDS)})(:{MONTH.pattern})?")
+
+
+def valid_month(month: Optional[str]) -> bool:
+    """None (all-time) or a YYYY-MM month"""
+    return month is None or bool(MONTH.fullmatch(month))
+
+
+def board_key(board: str, month: Optional[str] = None) -> str:
+    if not valid_month(month):
+        raise ValueError(f"Month must be YYYY-MM, got {month!r}")
+    return f"leaderboard:{board}:{month}" if month else f"leaderboard:{board}"
+
+
+def month_of(created_at) -> str:
+    return datetime.fromtimestamp(meme_score(created_at), tz=timezone.utc).strftime("%Y-%m")
+
+
+def record_meme(pipe, wallet: str, xp: int, waldo: float, created_at):
+    """Queue the leaderboard updates for one accepted meme"""
+    month = month_of(created_at)
+    for scope in (None, month):
+        pipe.zincrby(board_key("xp", scope), xp, wallet)
+        pipe.zincrby(board_key("waldo", scope), waldo, wallet)
+        pipe.zincrby(board_key("memes", scope), 1, wallet)
+
+
+def adjust_meme(pipe, wallet: str, xp_delta: float, waldo_delta: float, created_at):
+    """Queue the leaderboard changes for a stored meme whose XP/WALDO were recomputed"""
+    month = month_of(created_at)
+    for scope in (None, month):
+        if xp_delta:
+            pipe.zincrby(board_key("xp", scope), xp_delta, wallet)
+        if waldo_delta:
+            pipe.zincrby(board_key("waldo", scope), waldo_delta, wallet)
+
+
+def top(r, board: str, limit: int = 10, month: Optional[str] = None) -> List[Dict[str, Any]]:
+    rows = r.zrevrange(board_key(board, month), 0, limit - 1, withscores=True)
+    return [{"rank": i + 1, "wallet": wallet.decode(), "score": score} for i, (wallet, score) in enumerate(rows)]
+
+
+def rank(r, board: str, wallet: str, month: Optional[str] = None) -> Dict[str, Any]:
+    pipe = r.pipeline(transaction=False)
+    pipe.zrevrank(board_key(board, month), wallet)
+    pipe.zscore(board_key(board, month), wallet)
+    pipe.zcard(board_key(board, month))
+    position, score, total = pipe.execute()
+    return {
+        "wallet": wallet,
+        "rank": position + 1 if position is not None else None,
+        "score": score or 0,
+        "total": total
+    }
+
+
+# === Short-TTL response cache (per process) ===
+_cache: Dict[Any, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def cached(key, ttl: float, compute: Callable[[], Any]) -> Any:
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+    value = compute()
+    with _cache_lock:
+        _cache[key] = (now + ttl, value)
+        if len(_cache) > 1000:
+            for stale in [k for k, (expires, _) in _cache.items() if expires <= now]:
+                del _cache[stale]
+    return value
+
+
+def rebuild(r, batch_size: int = 1000) -> int:
+    """Recompute every board from the meme hashes and the archive into temp keys, then swap them in.
+
+    Archived memes have no hash left, so they are read from their segments;
+    without them every archived meme's XP, WALDO and count would vanish from
+    the boards. Boards the rebuild did not write (a month whose memes are all
+    gone) are deleted. Memes stored while the rebuild runs can be missed, so
+    run it with polling paused.
+    """
+    scores: Dict[str, Dict[str, float]] = {}
+    counted = 0
+    batch = []
+
+    def add(wallet, xp, waldo, created_at):
+        nonlocal counted
+        if not wallet or not created_at:
+            return
+        wallet = wallet.decode()
+        for scope in (None, month_of(created_at)):
+            for board, value in (("xp", float(xp or 0)), ("waldo", float(waldo or 0)), ("memes", 1.0)):
+                entry = scores.setdefault(board_key(board, scope), {})
+                entry[wallet] = entry.get(wallet, 0.0) + value
+        counted += 1
+
+    def flush():
+        pipe = r.pipeline(transaction=False)
+        for key in batch:
+            pipe.hmget(key, "wallet", "xp", "waldo", "created_at")
+        for row in pipe.execute():
+            add(*row)
+        batch.clear()
+
+    for key in r.scan_iter(match="meme:*", count=batch_size):
+        if is_meme_key(key):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    hot = counted
+    for _, data in archived_memes(r, batch_size):
+        add(data.get(b"wallet"), data.get(b"xp"), data.get(b"waldo"), data.get(b"created_at"))
+
+    # "{key}:rebuild" hashes to the same cluster slot as key, so RENAME works there too
+    for key, members in scores.items():
+        items = list(members.items())
+        pipe = r.pipeline(transaction=False)
+        pipe.delete(f"{{{key}}}:rebuild")
+        for start in range(0, len(items), 10000):
+            pipe.zadd(f"{{{key}}}:rebuild", dict(items[start:start + 10000]))
+        pipe.execute()
+    pipe = r.pipeline(transaction=not is_cluster(r))
+    for key in scores:
+        pipe.rename(f"{{{key}}}:rebuild", key)
+    pipe.execute()
+
+    stale = [key for key in r.scan_iter(match="leaderboard:*", count=batch_size)
+             if BOARD_KEY.fullmatch(key.decode()) and key.decode() not in scores]
+    if stale:
+        # One DEL per key: they hash to different cluster slots
+        pipe = r.pipeline(transaction=False)
+        for key in stale:
+            pipe.delete(key)
+        pipe.execute()
+    print(f"✅ Rebuilt {len(scores)} leaderboard(s) from {counted} meme(s) ({counted - hot} archived), "
+          f"removed {len(stale)} stale")
+    return counted
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    rebuild(connect())
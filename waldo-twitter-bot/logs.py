@@ -0,0 +1,176 @@
+"""
+Structured, non-blocking logging for the ingestion path.
+
+`get_logger(name)` returns an EventLogger; each call logs one event with
+fields, written as one JSON object per line:
+
+    log.info("meme_stored", tweet_id=tweet["id"], wallet=wallet, stage="store", tier=3)
+    {"ts": "2025-01-01T00:00:00.123Z", "level": "info", "logger": "waldo.ingest",
+     "event": "meme_stored", "tweet_id": "...", "wallet": "...", "stage": "store",
+     "tier": 3, "trace_id": "..."}
+
+The calling thread only builds the record and puts it on a bounded queue; a
+QueueListener thread formats and writes it, so a slow stdout or log shipper
+never adds latency to a tweet. With the queue full, records are dropped and
+counted (waldo_log_records_dropped_total) rather than blocking. Inside a
+trace (tracing.py) records carry its trace_id.
+
+High-volume events can be sampled: LOG_SAMPLE="daily_count=0.05,ai_verified=0.1"
+keeps that fraction of each event; kept records carry "sample_rate".
+Warnings and errors are never sampled.
+
+Settings: LOG_LEVEL (info), LOG_FORMAT (json, or text for reading at a
+terminal), LOG_FILE (stdout when empty), LOG_QUEUE_SIZE (10000), LOG_SAMPLE.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+
+import tracing
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_FILE = os.getenv("LOG_FILE", "")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Per-tweet events that are only useful in aggregate; LOG_SAMPLE overrides
+DEFAULT_SAMPLE_RATES = {"daily_count": 0.1, "ai_verified": 0.1}
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE", ""))
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+                  .replace("+00:00", "Z"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{k}={v}" for k, v in getattr(record, "fields", {}).items())
+        line = f"{datetime.fromtimestamp(record.created).strftime('%H:%M:%S')} {record.levelname:<7} " \
+               f"{record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Enqueue without formatting and without ever blocking; starts the writer thread on first use"""
+
+    def __init__(self, q: queue.Queue, listener: QueueListener):
+        super().__init__(q)
+        self.listener = listener
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; records are not shared, so no copy is needed
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if not self._started:
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            import metrics
+            metrics.LOG_RECORDS_DROPPED.inc()
+
+    def _start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self.listener.start()
+            atexit.register(self.listener.stop)  # flush what is queued on a clean exit
+            self._started = True
+
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure():
+    """Route the "waldo" logger tree through the queue. Idempotent; the writer thread starts on the first record"""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        output = logging.FileHandler(LOG_FILE, delay=True) if LOG_FILE else logging.StreamHandler(sys.stdout)
+        output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JSONFormatter())
+        q: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        root = logging.getLogger("waldo")
+        root.addHandler(_DroppingQueueHandler(q, QueueListener(q, output)))
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        _configured = True
+
+
+class EventLogger:
+    """`log.info(event, **fields)`; levels and sampling are checked before anything is built"""
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+
+    def _log(self, level: int, event: str, fields: Dict[str, Any], exc_info=None):
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING:
+            rate = SAMPLE_RATES.get(event)
+            if rate is not None and rate < 1:
+                if random.random() >= rate:
+                    import metrics
+                    metrics.LOG_RECORDS_SAMPLED_OUT.labels(event).inc()
+                    return
+                fields["sample_rate"] = rate
+        trace_id = tracing.current_trace_id()
+        if trace_id:
+            fields["trace_id"] = trace_id
+        if exc_info is True:
+            exc_info = sys.exc_info()
+        # makeRecord + handle rather than logger.log(): skips the caller lookup, which walks the stack
+        self.logger.handle(self.logger.makeRecord(self.logger.name, level, "", 0, event, (), exc_info,
+                                                  extra={"fields": fields}))
+
+    def debug(self, event: str, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, exc_info=None, **fields):
+        self._log(logging.ERROR, event, fields, exc_info)
+
+
+def get_logger(name: str) -> EventLogger:
+    configure()
+    return EventLogger(logging.getLogger(f"waldo.{name}"))
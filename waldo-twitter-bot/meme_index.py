@@ -0,0 +1,300 @@
+"""
+Time-ordered index of stored memes.
+
+`memes:by_time` is a sorted set of tweet ids scored by `created_at` (epoch
+seconds), kept up to date by `store_meme_tweet`. "Latest N" and time-range
+lookups are one ZRANGE plus one pipelined HGETALL round trip instead of
+KEYS + a HGETALL per key.
+
+Archived memes (see archive.py) keep their index entries, and reads here
+fall back to the archive for ids whose hash is gone. Full passes over the
+memes SCAN `meme:*` for the hot ones and add `archived_memes()` for the rest.
+
+`wallet:memes:{wallet}` is the same index per wallet, backing the
+`/wallet/<address>/memes` dashboard. `wallet:version:{wallet}` is bumped
+whenever one of the wallet's memes changes and drives its ETag.
+
+Run this file once to backfill both indexes from existing `meme:{id}` hashes:
+  python meme_index.py
+"""
+import math
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from archive import default_store, iter_archive, load_archived
+from meme_store import with_legacy_fields
+from redis_keys import wallet_key
+
+MEME_INDEX_KEY = "memes:by_time"
+
+# Fields returned by the wallet dashboard
+DASHBOARD_FIELDS = (
+    "handle", "text", "likes", "retweets", "created_at", "tier", "waldo", "xp",
+    "reward_type", "claimed", "stake_selected", "stake_release",
+    "nft_minted", "ai_verified", "ai_confidence",
+)
+
+Timestamp = Union[str, datetime, float, int]
+
+
+def meme_score(created_at: Timestamp) -> float:
+    """Convert a Twitter `created_at` (ISO string, datetime or epoch) to an index score"""
+    if isinstance(created_at, (int, float)):
+        return float(created_at)
+    if isinstance(created_at, bytes):
+        created_at = created_at.decode()
+    if isinstance(created_at, str):
+        # Python < 3.11 fromisoformat() does not accept the "Z" suffix Twitter uses
+        created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.timestamp()
+
+
+def is_meme_key(key: Union[bytes, str]) -> bool:
+    """True for `meme:{id}` hashes, False for side keys like `meme:xp:{id}`"""
+    if isinstance(key, bytes):
+        key = key.decode()
+    parts = key.split(":")
+    return len(parts) == 2 and parts[0] == "meme" and parts[1] != ""
+
+
+def wallet_index_key(wallet: str) -> str:
+    return wallet_key("wallet:memes", wallet)
+
+
+def wallet_version_key(wallet: str) -> str:
+    return wallet_key("wallet:version", wallet)
+
+
+def index_meme(client, tweet_id: str, created_at: Timestamp, wallet: Optional[str] = None, wallet_client=None):
+    """Add a meme to the time index, and its wallet's index if given (client or pipeline).
+
+    `wallet_client` takes the wallet's write when it goes through a separate
+    per-wallet pipeline (see redis_client.wallet_pipelines).
+    """
+    score = meme_score(created_at)
+    client.zadd(MEME_INDEX_KEY, {str(tweet_id): score})
+    if wallet:
+        (wallet_client or client).zadd(wallet_index_key(wallet), {str(tweet_id): score})
+
+
+def fetch_memes(r, tweet_ids: Iterable[Union[bytes, str]]) -> List[Tuple[str, Dict[bytes, bytes]]]:
+    """HGETALL a batch of memes in one pipelined round trip, skipping missing hashes"""
+    ids = [t.decode() if isinstance(t, bytes) else str(t) for t in tweet_ids]
+    if not ids:
+        return []
+    pipe = r.pipeline(transaction=False)
+    for tweet_id in ids:
+        pipe.hgetall(f"meme:{tweet_id}")
+    rows = dict(zip(ids, pipe.execute()))
+
+    # Anything missing may have been moved to the cold archive
+    missing = [tweet_id for tweet_id in ids if not rows[tweet_id]]
+    if missing:
+        pipe = r.pipeline(transaction=False)
+        for tweet_id in missing:
+            pipe.zscore(MEME_INDEX_KEY, tweet_id)
+        entries = [(tweet_id, score) for tweet_id, score in zip(missing, pipe.execute()) if score is not None]
+        rows.update(load_archived(r, entries))
+
+    memes = [(tweet_id, rows[tweet_id]) for tweet_id in ids if rows[tweet_id]]
+    return with_legacy_fields(r, memes)
+
+
+def archived_memes(r, batch_size: int = 500, store=None) -> Iterator[Tuple[str, Dict[bytes, bytes]]]:
+    """Every archived meme that has no `meme:{id}` hash, for passes that also SCAN the hot ones.
+
+    A meme whose hash is still there (an archive run interrupted between
+    writing its segment and deleting the hash) is left to the SCAN, so
+    nothing is counted twice.
+    """
+    batch = []
+
+    def flush():
+        pipe = r.pipeline(transaction=False)
+        for tweet_id, _ in batch:
+            pipe.exists(f"meme:{tweet_id}")
+        hot = pipe.execute()
+        rows = [row for row, exists in zip(batch, hot) if not exists]
+        batch.clear()
+        return rows
+
+    for row in iter_archive(store or default_store(r)):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield from flush()
+    if batch:
+        yield from flush()
+
+
+def get_meme(r, tweet_id: Union[bytes, str]) -> Dict[bytes, bytes]:
+    """One meme from Redis or the archive, {} if unknown"""
+    memes = fetch_memes(r, [tweet_id])
+    return memes[0][1] if memes else {}
+
+
+def latest_memes(r, limit: int = 50, offset: int = 0) -> List[Tuple[str, Dict[bytes, bytes]]]:
+    """Newest memes first"""
+    ids = r.zrevrange(MEME_INDEX_KEY, offset, offset + limit - 1)
+    return fetch_memes(r, ids)
+
+
+def memes_between(r, since: Optional[Timestamp] = None, until: Optional[Timestamp] = None,
+                  limit: Optional[int] = None, newest_first: bool = True) -> List[Tuple[str, Dict[bytes, bytes]]]:
+    """Memes created in [since, until]; open-ended when either bound is None"""
+    low = meme_score(since) if since is not None else "-inf"
+    high = meme_score(until) if until is not None else "+inf"
+    paging = {"start": 0, "num": limit} if limit else {}
+    if newest_first:
+        ids = r.zrevrangebyscore(MEME_INDEX_KEY, high, low, **paging)
+    else:
+        ids = r.zrangebyscore(MEME_INDEX_KEY, low, high, **paging)
+    return fetch_memes(r, ids)
+
+
+def _encode_cursor(score: float, skip: int) -> str:
+    return f"{score!r}:{skip}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Raises ValueError for anything _encode_cursor could not have produced"""
+    score, skip = cursor.rsplit(":", 1)
+    score, skip = float(score), int(skip)
+    if not math.isfinite(score) or skip < 0:
+        raise ValueError(f"invalid cursor {cursor!r}")
+    return score, skip
+
+
+def wallet_memes_page(r, wallet: str, limit: int = 20, cursor: Optional[str] = None,
+                      if_none_match: Optional[Callable[[str], bool]] = None) -> Dict:
+    """One page of a wallet's memes, newest first.
+
+    The cursor is "<score>:<n>": continue at `score`, skipping the `n` memes
+    with exactly that score already returned, so pages stay stable while new
+    memes arrive. A cursor with a non-finite score or a negative skip raises
+    ValueError.
+
+    Round trips: the version and ids come back in the first, and the page of
+    hashes in the second. If `if_none_match(etag)` is true, the page stops
+    after the first and the result has `not_modified` set. A cold page can
+    take up to three more:
+    - archived memes on the page need one for their month's segment list,
+      and one more for any of those segments that are not cached yet
+    - memes still on legacy side keys need one more, for a pipelined GET
+    A single Lua script cannot replace these, because the meme hashes sit in
+    other cluster slots than the wallet's keys.
+    """
+    high, skip = _decode_cursor(cursor) if cursor else ("+inf", 0)
+
+    pipe = r.pipeline(transaction=False)
+    pipe.get(wallet_version_key(wallet))
+    pipe.zrevrangebyscore(wallet_index_key(wallet), high, "-inf", start=skip, num=limit + 1, withscores=True)
+    version, rows = pipe.execute()
+    version = int(version or 0)
+
+    etag = f"{wallet}-{version}-{cursor or ''}-{limit}"
+    result = {"wallet": wallet, "version": version, "etag": etag}
+    if if_none_match and if_none_match(etag):
+        return dict(result, not_modified=True)
+
+    page, more = rows[:limit], len(rows) > limit
+    next_cursor = None
+    if more and page:
+        last_score = page[-1][1]
+        same = sum(1 for _, score in page if score == last_score)
+        next_cursor = _encode_cursor(last_score, same + (skip if last_score == high else 0))
+
+    ids = [tweet_id.decode() for tweet_id, _ in page]
+    pipe = r.pipeline(transaction=False)
+    for tweet_id in ids:
+        pipe.hmget(f"meme:{tweet_id}", *DASHBOARD_FIELDS)
+    rows = {}
+    for tweet_id, values in zip(ids, pipe.execute()):
+        data = {field.encode(): value for field, value in zip(DASHBOARD_FIELDS, values) if value is not None}
+        if data:
+            rows[tweet_id] = data
+    archived = load_archived(r, [(tweet_id.decode(), score) for tweet_id, score in page
+                                 if tweet_id.decode() not in rows])
+    for tweet_id, data in archived.items():
+        rows[tweet_id] = {k: v for k, v in data.items() if k.decode() in DASHBOARD_FIELDS}
+    memes = [(tweet_id, rows[tweet_id]) for tweet_id in ids if tweet_id in rows]
+
+    result["memes"] = [
+        dict({"tweet_id": tweet_id}, **{k.decode(): v.decode() for k, v in data.items()})
+        for tweet_id, data in with_legacy_fields(r, memes)
+    ]
+    result["next_cursor"] = next_cursor
+    return result
+
+
+def backfill(r, batch_size: int = 500) -> int:
+    """One-time SCAN over `meme:*` to index memes stored before the index existed.
+
+    Archived memes are indexed from their segments as well; ZADD makes
+    re-indexing ones the index already has harmless.
+    """
+    indexed = 0
+    skipped = 0
+    batch = []
+
+    def flush():
+        nonlocal indexed, skipped
+        pipe = r.pipeline(transaction=False)
+        for key in batch:
+            pipe.hmget(key, "created_at", "wallet")
+        rows = pipe.execute(raise_on_error=False)
+
+        pipe = r.pipeline(transaction=False)
+        for key, row in zip(batch, rows):
+            if isinstance(row, Exception) or not row[0]:
+                skipped += 1
+                continue
+            created_at, wallet = row
+            try:
+                index_meme(pipe, key.decode().split(":", 1)[1], created_at, wallet and wallet.decode())
+                indexed += 1
+            except ValueError:
+                print(f"⚠️ Bad created_at on {key.decode()}: {created_at!r}")
+                skipped += 1
+        pipe.execute()
+        batch.clear()
+
+    for key in r.scan_iter(match="meme:*", count=batch_size):
+        if not is_meme_key(key):
+            continue
+        batch.append(key)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    archived = 0
+    pipe = r.pipeline(transaction=False)
+    for tweet_id, data in archived_memes(r, batch_size):
+        if not data.get(b"created_at"):
+            skipped += 1
+            continue
+        try:
+            index_meme(pipe, tweet_id, data[b"created_at"], data.get(b"wallet", b"").decode() or None)
+        except ValueError:
+            print(f"⚠️ Bad created_at on archived meme {tweet_id}: {data[b'created_at']!r}")
+            skipped += 1
+            continue
+        archived += 1
+        if len(pipe) >= batch_size:
+            pipe.execute()
+    pipe.execute()
+    indexed += archived
+
+    print(f"✅ Indexed {indexed} meme(s) ({archived} archived) into {MEME_INDEX_KEY} and wallet:memes:* "
+          f"({skipped} skipped)")
+    return indexed
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from redis_client import connect
+
+    load_dotenv()
+    backfill(connect())
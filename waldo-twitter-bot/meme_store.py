@@ -0,0 +1,116 @@
+"""
+Meme hash layout and the compatibility read path for legacy side keys.
+
+Older versions of `store_meme_tweet` wrote five standalone string keys next
+to each `meme:{id}` hash. Those values now live in the hash itself:
+
+  meme:xp:{id}            -> meme:{id} xp
+  meme:waldo:{id}         -> meme:{id} waldo
+  meme:nft_minted:{id}    -> meme:{id} nft_minted
+  meme:ai_verified:{id}   -> meme:{id} ai_verified
+  meme:ai_confidence:{id} -> meme:{id} ai_confidence
+
+`nft_minted` is written for every meme, so a hash without it predates the
+change and is topped up from its legacy keys on read. The backend keeps
+writing `meme:nft_minted:{id}` as the mint record (JSON with the tx hash);
+only the "false" placeholder is redundant.
+
+`upgrade_db.py --migration collapse_side_keys` moves existing data over and
+deletes the redundant keys.
+"""
+from typing import Dict, List, Tuple, Union
+
+SIDE_FIELDS = ("xp", "waldo", "nft_minted", "ai_verified", "ai_confidence")
+
+
+def legacy_key(field: str, tweet_id: Union[bytes, str]) -> str:
+    if isinstance(tweet_id, bytes):
+        tweet_id = tweet_id.decode()
+    return f"meme:{field}:{tweet_id}"
+
+
+def legacy_keys(tweet_id: Union[bytes, str]) -> List[str]:
+    return [legacy_key(field, tweet_id) for field in SIDE_FIELDS]
+
+
+def merge_legacy(data: Dict[bytes, bytes], legacy_values: List[bytes]) -> Dict[bytes, bytes]:
+    """Fill fields missing from a meme hash with the values of its legacy keys"""
+    merged = dict(data)
+    for field, value in zip(SIDE_FIELDS, legacy_values):
+        if value is None:
+            continue
+        if field == "nft_minted" and value != b"false":
+            merged[b"nft_minted"] = b"true"
+        else:
+            merged.setdefault(field.encode(), value)
+    merged.setdefault(b"nft_minted", b"false")
+    return merged
+
+
+def with_legacy_fields(r, memes: List[Tuple[str, Dict[bytes, bytes]]]) -> List[Tuple[str, Dict[bytes, bytes]]]:
+    """Top up pre-migration memes from their legacy keys in one extra pipelined round trip"""
+    stale = [i for i, (_, data) in enumerate(memes) if data and b"nft_minted" not in data]
+    if not stale:
+        return memes
+    # GETs rather than MGET: the legacy keys of one meme sit in different cluster slots
+    pipe = r.pipeline(transaction=False)
+    for i in stale:
+        for key in legacy_keys(memes[i][0]):
+            pipe.get(key)
+    values = pipe.execute()
+    memes = list(memes)
+    width = len(SIDE_FIELDS)
+    for n, i in enumerate(stale):
+        tweet_id, data = memes[i]
+        memes[i] = (tweet_id, merge_legacy(data, values[n * width:(n + 1) * width]))
+    return memes
+
+
+def read_meme(r, tweet_id: Union[bytes, str]) -> Dict[bytes, bytes]:
+    """HGETALL a meme, falling back to legacy side keys for fields it does not have yet"""
+    if isinstance(tweet_id, bytes):
+        tweet_id = tweet_id.decode()
+    data = r.hgetall(f"meme:{tweet_id}")
+    if not data:
+        return {}
+    return with_legacy_fields(r, [(tweet_id, data)])[0][1]
+
+
+def key_family(key: Union[bytes, str]) -> str:
+    """`meme:123` -> "meme", `meme:xp:123` -> "meme:xp", `wallet:tweets:r...` -> "wallet:tweets" """
+    if isinstance(key, bytes):
+        key = key.decode()
+    parts = key.split(":")
+    return ":".join(parts[:-1]) if len(parts) > 1 else key
+
+
+def memory_report(r, match: str = "meme:*", batch_size: int = 1000) -> Dict[str, Dict[str, int]]:
+    """MEMORY USAGE summed per key family across everything matching `match`"""
+    report: Dict[str, Dict[str, int]] = {}
+    batch = []
+
+    def flush():
+        pipe = r.pipeline(transaction=False)
+        for key in batch:
+            pipe.memory_usage(key)
+        for key, used in zip(batch, pipe.execute(raise_on_error=False)):
+            family = report.setdefault(key_family(key), {"keys": 0, "bytes": 0})
+            family["keys"] += 1
+            family["bytes"] += used if isinstance(used, int) else 0
+        batch.clear()
+
+    for key in r.scan_iter(match=match, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
+
+
+def print_memory_report(label: str, report: Dict[str, Dict[str, int]]):
+    total_keys = sum(f["keys"] for f in report.values())
+    total_bytes = sum(f["bytes"] for f in report.values())
+    print(f"🧠 {label}: {total_keys} keys, {total_bytes / 1024 / 1024:.2f} MiB")
+    for family, stats in sorted(report.items(), key=lambda item: -item[1]["bytes"]):
+        print(f"   {family:<22} {stats['keys']:>9} keys  {stats['bytes'] / 1024:>12.1f} KiB")
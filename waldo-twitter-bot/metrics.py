@@ -0,0 +1,117 @@
+"""
+Prometheus metrics for the bot, served at /metrics.
+
+Under gunicorn with several workers each worker has its own counters;
+gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR before the workers start so
+prometheus_client keeps them in shared files and /metrics aggregates all
+workers. Run as `python main.py` the process-local registry is used.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# === Polling ===
+POLLS = Counter("waldo_polls_total", "Twitter poll cycles", ["result"])
+POLL_DURATION = Histogram("waldo_poll_duration_seconds", "Duration of a poll cycle",
+                          buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300))
+TWEETS_FETCHED = Counter("waldo_tweets_fetched_total", "Tweets returned by the search")
+TWEETS_ACCEPTED = Counter("waldo_tweets_accepted_total", "Tweets stored as memes")
+TWEETS_REJECTED = Counter("waldo_tweets_rejected_total", "Tweets not stored, by reason", ["reason"])
+
+# === Twitter API ===
+TWITTER_REQUESTS = Counter("waldo_twitter_api_requests_total", "Twitter API calls", ["endpoint", "status"])
+TWITTER_RATE_LIMITED = Counter("waldo_twitter_api_rate_limited_total", "Twitter API 429 responses", ["endpoint"])
+TWITTER_DURATION = Histogram("waldo_twitter_api_duration_seconds", "Twitter API call latency", ["endpoint"])
+
+# === Redis / verification / payouts ===
+REDIS_ROUND_TRIPS = Histogram("waldo_redis_round_trips_per_tweet", "Redis round trips to process one tweet",
+                              buckets=(1, 2, 3, 4, 6, 8, 10, 15, 20, 30, 50))
+VERIFICATION_CHECK_DURATION = Histogram("waldo_verification_check_duration_seconds",
+                                        "Duration of each content verification check", ["check"])
+AI_CONFIDENCE = Histogram("waldo_ai_confidence", "AI verification confidence score",
+                          buckets=(10, 20, 30, 40, 50, 60, 70, 80, 90, 100))
+PAYOUTS = Counter("waldo_payouts_total", "Payout requests", ["reward_type", "result"])
+PAYOUT_PHASE_DURATION = Histogram("waldo_payout_phase_duration_seconds",
+                                  "XRPL payout phases (autofill, sign, submit, validation)", ["phase"],
+                                  buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 6, 8, 12, 20, 30))
+
+# === Journal (journal.py) ===
+JOURNAL_DEPTH = Gauge("waldo_journal_depth", "Journaled writes waiting for replay", multiprocess_mode="max")
+JOURNAL_LAG = Gauge("waldo_journal_lag_seconds", "Age of the oldest journaled write", multiprocess_mode="max")
+
+# === Holder snapshot (waldo_core/holders.py) ===
+HOLDER_SNAPSHOTS = Counter("waldo_holder_snapshots_total", "Holder snapshot runs", ["result"])
+HOLDER_SNAPSHOT_DURATION = Histogram("waldo_holder_snapshot_duration_seconds", "Duration of a holder snapshot",
+                                     buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600))
+HOLDERS = Gauge("waldo_holders", "WALDO holders in the last snapshot", multiprocess_mode="max")
+
+
+# === Logging (logs.py) ===
+LOG_RECORDS_DROPPED = Counter("waldo_log_records_dropped_total", "Log records dropped because the log queue was full")
+LOG_RECORDS_SAMPLED_OUT = Counter("waldo_log_records_sampled_out_total", "Log records skipped by sampling", ["event"])
+
+
+def render() -> bytes:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+# === Redis round-trip counting ===
+_local = threading.local()
+
+
+class RoundTrips:
+    def __init__(self):
+        self.count = 0
+
+
+def instrument_redis(r):
+    """Count round trips made through `r` (commands and pipeline executes) for `redis_round_trips`"""
+    execute_command, pipeline = r.execute_command, r.pipeline
+
+    def counted_execute_command(*args, **kwargs):
+        _count()
+        return execute_command(*args, **kwargs)
+
+    def counted_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        pipe_execute = pipe.execute
+
+        def counted_execute(*a, **kw):
+            if len(pipe):
+                _count()
+            return pipe_execute(*a, **kw)
+
+        pipe.execute = counted_execute
+        return pipe
+
+    r.execute_command = counted_execute_command
+    r.pipeline = counted_pipeline
+    return r
+
+
+def _count():
+    trips = getattr(_local, "trips", None)
+    if trips is not None:
+        trips.count += 1
+
+
+@contextmanager
+def redis_round_trips():
+    """Count round trips on instrumented clients in this thread"""
+    outer = getattr(_local, "trips", None)
+    _local.trips = trips = RoundTrips()
+    try:
+        yield trips
+    finally:
+        _local.trips = outer
+        if outer is not None:
+            outer.count += trips.count
@@ -0,0 +1,202 @@
+"""
+Resumable, batched Redis migrations.
+
+A migration SCANs its key pattern in chunks, reads each chunk with one
+pipeline, works out per-key changes and writes them back with a second
+pipeline. Chunks are processed by a pool of workers, the SCAN cursor is
+checkpointed in `migration:{name}` once every chunk before it has been
+written, and the whole run can be throttled to a target ops/sec.
+
+Transforms must be idempotent: after a crash the chunks that were in flight
+are processed again on resume.
+
+Migrations only see keys that SCAN finds. Memes in the cold archive
+(archive.py) have no `meme:{id}` hash and are not migrated: they were
+settled before being archived, their legacy side keys were folded in, and
+segments are never rewritten. `run_migration` says when an archive exists.
+
+Subclass `Migration` and pass it to `run_migration`; see upgrade_db.py.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from archive import default_store
+from meme_index import is_meme_key
+
+
+class Migration:
+    """One migration over a key pattern. Override `transform` (and the other hooks as needed)"""
+
+    name = "base"
+    match = "meme:*"
+
+    def wants(self, key: bytes) -> bool:
+        """Filter SCAN results; by default only `meme:{id}` hashes"""
+        return is_meme_key(key)
+
+    def read(self, pipe, key: bytes):
+        """Queue the read commands for one key"""
+        pipe.hgetall(key)
+
+    def transform(self, key: bytes, values: List[Any]) -> Optional[Dict[str, Any]]:
+        """Return the changes for this key, or None if it is already up to date"""
+        raise NotImplementedError
+
+    def write(self, pipe, key: bytes, changes: Dict[str, Any]):
+        """Queue the write commands for one key"""
+        pipe.hset(key, mapping=changes)
+
+    def describe(self, key: bytes, values: List[Any], changes: Dict[str, Any]) -> str:
+        """One-line diff shown in dry-run mode"""
+        current = values[0] if values and isinstance(values[0], dict) else {}
+        parts = []
+        for field, new in changes.items():
+            old = current.get(field.encode() if isinstance(field, str) else field)
+            old = old.decode() if isinstance(old, bytes) else old
+            parts.append(f"{field}: {old!r} -> {new!r}")
+        return f"{key.decode()}  " + ", ".join(parts)
+
+
+class Throttle:
+    """Blocking token bucket shared by all workers"""
+
+    def __init__(self, ops_per_sec: Optional[float]):
+        self.rate = ops_per_sec
+        self.tokens = float(ops_per_sec or 0)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, ops: int):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= ops or self.tokens >= self.rate:
+                    self.tokens -= ops
+                    return
+                wait = (ops - self.tokens) / self.rate
+            time.sleep(min(wait, 1.0))
+
+
+def checkpoint_key(name: str) -> str:
+    return f"migration:{name}"
+
+
+def migration_status(r, name: str) -> Dict[str, str]:
+    return {k.decode(): v.decode() for k, v in r.hgetall(checkpoint_key(name)).items()}
+
+
+def _process_chunk(r, migration: Migration, keys: List[bytes], dry_run: bool, throttle: Throttle) -> Dict[str, int]:
+    pipe = r.pipeline(transaction=False)
+    spans = []
+    for key in keys:
+        start = len(pipe)
+        migration.read(pipe, key)
+        spans.append((key, start, len(pipe)))
+    throttle.acquire(len(pipe))
+    results = pipe.execute(raise_on_error=False)
+
+    writes = r.pipeline(transaction=False)
+    stats = {"scanned": len(keys), "changed": 0, "errors": 0}
+    for key, start, end in spans:
+        values = results[start:end]
+        if any(isinstance(v, Exception) for v in values):
+            print(f"❌ Error reading {key.decode()}: {next(v for v in values if isinstance(v, Exception))}")
+            stats["errors"] += 1
+            continue
+        try:
+            changes = migration.transform(key, values)
+        except Exception as e:
+            print(f"❌ Error on {key.decode()}: {e}")
+            stats["errors"] += 1
+            continue
+        if not changes:
+            continue
+        stats["changed"] += 1
+        if dry_run:
+            print(f"🔍 {migration.describe(key, values, changes)}")
+        else:
+            migration.write(writes, key, changes)
+
+    if len(writes):
+        throttle.acquire(len(writes))
+        writes.execute()
+    return stats
+
+
+def run_migration(r, migration: Migration, workers: int = 4, batch_size: int = 500,
+                  dry_run: bool = False, ops_per_sec: Optional[float] = None, reset: bool = False) -> Dict[str, int]:
+    """Run (or resume) a migration and return its totals"""
+    state_key = checkpoint_key(migration.name)
+    state = migration_status(r, migration.name)
+
+    if reset:
+        r.delete(state_key)
+        state = {}
+    if state.get("status") == "done" and not dry_run:
+        print(f"✅ Migration {migration.name} already complete ({state.get('changed', 0)} changed). Use reset to run again.")
+        return {k: int(state.get(k, 0)) for k in ("scanned", "changed", "errors")}
+
+    # Dry runs never touch the checkpoint, so they always start from the beginning
+    cursor = 0 if dry_run else int(state.get("cursor", 0))
+    totals = {k: 0 if dry_run else int(state.get(k, 0)) for k in ("scanned", "changed", "errors")}
+    if migration.match == Migration.match:
+        store = default_store(r)
+        segments = sum(len(names) for names in store.segments(store.months()).values())
+        if segments:
+            print(f"ℹ️ Memes in the {segments} archive segment(s) have no hash and are left as archived")
+    if cursor:
+        print(f"↩️ Resuming {migration.name} from cursor {cursor} ({totals['scanned']} keys already scanned)")
+
+    throttle = Throttle(ops_per_sec)
+    in_flight = deque()
+    started = time.monotonic()
+
+    def save(next_cursor, status="running"):
+        if dry_run:
+            return
+        r.hset(state_key, mapping={
+            "cursor": next_cursor,
+            "status": status,
+            **totals,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        })
+
+    def settle(block):
+        # Only advance the checkpoint past chunks that are fully written, in SCAN order
+        while in_flight and (block or in_flight[0][0].done()):
+            future, next_cursor = in_flight.popleft()
+            for k, v in future.result().items():
+                totals[k] += v
+            save(next_cursor)
+            block = block and len(in_flight) > workers * 2
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            throttle.acquire(1)
+            cursor, keys = r.scan(cursor=cursor, match=migration.match, count=batch_size)
+            keys = [k for k in keys if migration.wants(k)]
+            if keys:
+                in_flight.append((pool.submit(_process_chunk, r, migration, keys, dry_run, throttle), cursor))
+            elif not dry_run and not in_flight:
+                save(cursor)
+            settle(block=len(in_flight) > workers * 2)
+            if cursor == 0:
+                break
+        while in_flight:
+            settle(block=True)
+
+    save(0, status="done")
+    elapsed = time.monotonic() - started
+    label = "Dry run" if dry_run else "Migration"
+    print(f"✅ {label} {migration.name} finished in {elapsed:.1f}s: "
+          f"{totals['scanned']} scanned, {totals['changed']} {'would change' if dry_run else 'changed'}, "
+          f"{totals['errors']} errors")
+    return totals
@@ -29,10 +29,12 @@ import time
 import tempfile
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import requests
-import tweepy
+
+if TYPE_CHECKING:
+    import tweepy
 
 logging.basicConfig(
     level=logging.INFO,
@@ -50,7 +52,10 @@ def ensure_hashtag(text: Optional[str]) -> str:
     return base.strip()
 
 
-def get_api() -> tweepy.API:
+def get_api() -> "tweepy.API":
+    # tweepy is slow to import; only posting needs it
+    import tweepy
+
     api_key = os.getenv("TWITTER_API_KEY")
     api_secret = os.getenv("TWITTER_API_SECRET")
     access_token = os.getenv("TWITTER_ACCESS_TOKEN")
@@ -84,7 +89,7 @@ def _download_to_temp(url: str) -> str:
     return tmp_path
 
 
-def post_once(api: tweepy.API, image_path: Optional[str], url: Optional[str], text: Optional[str]) -> Optional[int]:
+def post_once(api: "tweepy.API", image_path: Optional[str], url: Optional[str], text: Optional[str]) -> Optional[int]:
     caption = ensure_hashtag(text)
 
     # Resolve image path
@@ -126,7 +131,7 @@ def pick_random_image_from_dir(dir_path: str) -> Optional[str]:
     return random.choice(candidates)
 
 
-def run_interval_mode(api: tweepy.API, dir_path: str, every_min: int, text: Optional[str]):
+def run_interval_mode(api: "tweepy.API", dir_path: str, every_min: int, text: Optional[str]):
     logger.info(f"⏱️ Interval mode: dir={dir_path}, every={every_min} min")
     while True:
         try:
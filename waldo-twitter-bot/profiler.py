@@ -0,0 +1,148 @@
+"""
+On-demand stack-sampling profiler for a running process.
+
+`sample(seconds)` reads the Python stack of every thread with
+sys._current_frames() at a fixed interval and returns the counts in
+collapsed-stack format ("thread;outer;...;inner count" per line), which
+flamegraph.pl, speedscope and inferno read directly. Nothing is installed or
+traced between samples, so the cost is one stack walk per thread per
+interval, and only while a profile is running.
+
+`start(seconds)` runs the same sampling in a background thread and returns
+at once; `last()` reports it while it runs and returns it when done. A sync
+worker (the bot's Flask app under gunicorn) should use this for anything
+longer than a few seconds instead of holding a request open. `last()` is
+per process, so pass `publish` to copy each status change somewhere every
+worker can read (main.py keeps it in Redis).
+
+Only threads of the process that serves the request are sampled: under
+gunicorn with several workers, each request profiles one worker.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MIN_INTERVAL_MS = 1.0
+
+# Leaf functions of threads parked waiting for work. Socket reads are not in here:
+# a thread blocked on Redis or rippled is exactly what a profile should show
+IDLE_FUNCTIONS = {"wait", "select", "poll", "accept", "serve_forever", "_worker"}
+
+_running = threading.Lock()
+_background: Dict = {}
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this process"""
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    # Trim site-packages / project prefixes, keep enough to tell modules apart
+    for marker in ("site-packages" + os.sep, "lib" + os.sep + "python"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def sample(seconds: float, interval_ms: float = 10.0, include_idle: bool = False) -> Dict:
+    """Sample every other thread's stack for `seconds`. Raises ProfilerBusy if a profile is running"""
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        return _sample(seconds, interval_ms, include_idle)
+    finally:
+        _running.release()
+
+
+def start(seconds: float, interval_ms: float = 10.0, include_idle: bool = False,
+          publish: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """sample() in a background thread; returns last() at once. Raises ProfilerBusy if a profile is running
+
+    `publish(status)` is called with last() when the profile starts and again
+    when it ends, in that order.
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy()
+    _background.clear()
+    _background.update({"running": True, "started_at": time.time(), "pid": os.getpid()})
+
+    def run():
+        try:
+            _background["profile"] = _sample(seconds, interval_ms, include_idle)
+        except Exception as e:
+            _background["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            _background["running"] = False
+            _running.release()
+        if publish:
+            publish(last())
+
+    try:
+        if publish:
+            publish(last())
+        threading.Thread(target=run, name="profiler", daemon=True).start()
+    except BaseException:
+        _background["running"] = False
+        _running.release()
+        raise
+    return last()
+
+
+def last() -> Optional[Dict]:
+    """The latest start()ed profile: running, started_at, and profile (or error) once done; None if none ran"""
+    return dict(_background) if _background else None
+
+
+def _sample(seconds: float, interval_ms: float, include_idle: bool) -> Dict:
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    interval = max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000
+    own_thread = threading.get_ident()
+    labels: Dict[object, str] = {}
+    stacks: Counter = Counter()
+    samples = idle = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            if not include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                idle += 1
+                continue
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                parts.append(label)
+                frame = frame.f_back
+            parts.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(parts))] += 1
+        samples += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        time.sleep(min(interval, deadline - now))
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "interval_ms": interval * 1000,
+        "samples": samples,
+        "idle_skipped": idle,
+        "stacks": dict(stacks.most_common()),
+    }
+
+
+def collapsed(profile: Dict, limit: Optional[int] = None) -> str:
+    """Collapsed-stack text, most frequent stacks first"""
+    items = list(profile["stacks"].items())[:limit]
+    return "".join(f"{stack} {count}\n" for stack, count in items)
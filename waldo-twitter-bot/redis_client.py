@@ -0,0 +1,66 @@
+"""
+Redis client construction for a single node or a Redis Cluster.
+
+Set REDIS_CLUSTER=1 to connect to REDIS_URL as a cluster. Cluster mode needs
+REDIS_KEY_LAYOUT=tagged (see redis_keys.py), otherwise per-wallet
+transactions and MGETs would span slots.
+
+Socket timeouts (REDIS_SOCKET_TIMEOUT, seconds) make a stalled Redis raise
+instead of blocking ingestion, so the write can be journaled (journal.py).
+"""
+import os
+from typing import List, Optional, Tuple
+
+import redis
+
+import redis_keys
+
+
+def cluster_enabled() -> bool:
+    return os.getenv("REDIS_CLUSTER", "").lower() in ("1", "true", "yes")
+
+
+def connect(url: Optional[str] = None):
+    url = url or os.getenv("REDIS_URL")
+    timeout = float(os.getenv("REDIS_SOCKET_TIMEOUT", 5))
+    timeouts = {"socket_timeout": timeout, "socket_connect_timeout": timeout}
+    if not cluster_enabled():
+        return redis.from_url(url, **timeouts)
+    if not redis_keys.tagged():
+        raise RuntimeError("REDIS_CLUSTER needs REDIS_KEY_LAYOUT=tagged")
+    if not hasattr(redis.cluster, "TransactionStrategy"):
+        raise RuntimeError("REDIS_CLUSTER needs a redis-py version with cluster transaction support")
+    return redis.cluster.RedisCluster.from_url(url, **timeouts)
+
+
+def is_cluster(r) -> bool:
+    return isinstance(r, redis.cluster.RedisCluster)
+
+
+def limiter_storage_uri(url: Optional[str] = None) -> Optional[str]:
+    """Flask-Limiter storage URI for the same Redis"""
+    url = url or os.getenv("REDIS_URL")
+    if url and cluster_enabled():
+        return url.replace("redis://", "redis+cluster://", 1)
+    return url
+
+
+def wallet_pipelines(r) -> Tuple:
+    """(shared, wallet) pipelines for a write touching global keys and one wallet's keys.
+
+    On a single node they are the same MULTI pipeline, so the whole write is
+    atomic. On a cluster the wallet pipeline is a MULTI over that wallet's
+    slot and the shared one is a plain pipeline over the global keys.
+    """
+    if is_cluster(r):
+        return r.pipeline(transaction=False), r.pipeline(transaction=True)
+    pipe = r.pipeline()
+    return pipe, pipe
+
+
+def execute_pipelines(shared, wallet) -> List:
+    """Run the pipelines from `wallet_pipelines`, returning the wallet pipeline's results"""
+    if shared is wallet:
+        return wallet.execute()
+    shared.execute()
+    return wallet.execute()
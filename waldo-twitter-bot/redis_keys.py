@@ -0,0 +1,70 @@
+"""
+Per-wallet key names, with Redis Cluster hash tags.
+
+With REDIS_KEY_LAYOUT=tagged the wallet address in each per-wallet key is
+wrapped in braces, so Redis Cluster hashes only the address and all of a
+wallet's keys land in one slot:
+
+  legacy                              tagged
+  wallet:xp:{wallet}                  wallet:xp:{rAbc...}   (literal braces)
+  ai_violation:{wallet}:{tweet_id}    ai_violation:{rAbc...}:{tweet_id}
+  meme_count:{handle}:{day}           meme_count:{rAbc...}:{handle}:{day}
+
+MULTI/EXEC, MGET and pipelines over one wallet's keys then keep working on a
+cluster. Global keys (meme hashes, memes:by_time, leaderboards) are not
+tagged; see redis_client.wallet_pipelines for writes that span both.
+
+The default is the legacy layout. Move existing keys over with
+`python upgrade_db.py --migration tag_wallet_keys` before switching. The
+Node backend shares these keys and names them through
+waldocoin-backend/utils/redisKeys.js, which reads the same
+REDIS_KEY_LAYOUT, so set it for both services at the same time.
+"""
+import os
+import re
+from typing import Optional, Union
+
+# Families whose last segment is the wallet
+WALLET_FAMILIES = (
+    "user", "holder", "wallet:xp", "wallet:tweets", "wallet:memes", "wallet:version",
+    "banned", "blacklist", "ai_violations", "daily_limit_reduction", "requires_verification",
+)
+# Families with the wallet followed by more segments
+WALLET_PREFIX_FAMILIES = ("ai_violation", "rate_limit")
+
+XRPL_ADDRESS = re.compile(r"r[1-9A-HJ-NP-Za-km-z]{24,34}")
+
+
+def tagged() -> bool:
+    return os.getenv("REDIS_KEY_LAYOUT", "legacy") == "tagged"
+
+
+def wallet_key(family: str, wallet: str, *parts) -> str:
+    """`wallet_key("wallet:xp", w)`, `wallet_key("ai_violation", w, tweet_id)`"""
+    tag = f"{{{wallet}}}" if tagged() else wallet
+    return ":".join([family, tag, *(str(p) for p in parts)])
+
+
+def meme_count_key(handle: str, wallet: str, day: str) -> str:
+    """Daily meme counter. Keyed by handle, so the tagged form adds the wallet"""
+    if tagged():
+        return f"meme_count:{{{wallet}}}:{handle}:{day}"
+    return f"meme_count:{handle}:{day}"
+
+
+def tag_legacy_key(key: Union[bytes, str]) -> Optional[str]:
+    """Tagged name for a legacy per-wallet key, None if it is not one"""
+    if isinstance(key, bytes):
+        key = key.decode()
+    if "{" in key:
+        return None
+    for family in WALLET_FAMILIES + WALLET_PREFIX_FAMILIES:
+        if not key.startswith(family + ":"):
+            continue
+        wallet, *rest = key[len(family) + 1:].split(":")
+        if not XRPL_ADDRESS.fullmatch(wallet):
+            continue
+        if bool(rest) != (family in WALLET_PREFIX_FAMILIES):
+            continue
+        return ":".join([family, f"{{{wallet}}}", *rest])
+    return None
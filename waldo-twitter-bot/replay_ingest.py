@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Record-and-replay load harness for tweet ingestion
+- `record` captures raw search/recent, users and tweets lookup responses to
+  NDJSON (needs TWITTER_BEARER_TOKEN; nothing is written to Redis)
+- `run` serves a recording from a local fake Twitter API, fanned out to any
+  number of tweets over cloned accounts with fraud patterns mixed in, and
+  drives the real `fetch_and_store` path through it. Reports tweets/sec,
+  per-tweet latency and writes one verdict per tweet
+- `diff` compares the verdict files of two runs, e.g. before and after a change
+
+The synthetic stream is deterministic for a given recording, --seed and
+--fraud-rate, so two runs of different code versions see the same tweets.
+
+`run` stores memes in the Redis at REDIS_URL: point it at an empty scratch
+database, or pass --memory to use an in-process fakeredis server (see
+bench_ingest.counting_client).
+Accounts post under the usual daily meme limit; pass --daily-limit to lift it
+when pushing many tweets through few --authors.
+
+Examples:
+  python replay_ingest.py record --pages 10 --out recording.ndjson
+
+  # 100k tweets, 10% fraud, as fast as possible, in memory
+  python replay_ingest.py run --recording recording.ndjson --tweets 100000 --fraud-rate 0.1 \\
+      --speed 0 --memory --daily-limit 1000000 --verdicts before.ndjson
+
+  # Recorded Twitter latency, offline fixtures
+  python replay_ingest.py run --recording fixtures/tweets.json --tweets 2000 --memory
+
+  python replay_ingest.py diff before.ndjson after.ndjson
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Same search the bot runs (main.QUERY / main.TWEET_FIELDS)
+QUERY = "(#WaldoMeme OR #waldomeme OR #Waldomeme OR #WALDOMEME) -is:retweet"
+TWEET_FIELDS = "author_id,public_metrics,created_at"
+USER_FIELDS = "created_at,public_metrics,profile_image_url"
+
+PATTERNS = ("duplicate_text", "spam", "scam_text", "engagement_farm", "bot_account")
+XRPL_ALPHABET = "rpshnaf39wBUDNEGHJKLM4PQRST7VWXYZ2bcdeCg65jkm8oFqi1tuvAxyz"
+
+
+# === Record ===
+def chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def record(args):
+    import requests
+
+    token = os.getenv("TWITTER_BEARER_TOKEN")
+    if not token:
+        sys.exit("❌ TWITTER_BEARER_TOKEN is not set")
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Bearer {token}", "User-Agent": "WaldoBot"})
+    api = args.api.rstrip("/")
+    counts: Counter = Counter()
+
+    with open(args.out, "w") as out:
+        def get(kind: str, path: str, params: dict):
+            started = time.perf_counter()
+            res = session.get(f"{api}{path}", params=params, timeout=30)
+            latency_ms = (time.perf_counter() - started) * 1000
+            try:
+                body = res.json()
+            except ValueError:
+                body = res.text
+            out.write(json.dumps({
+                "kind": kind, "path": path, "params": params, "status": res.status_code,
+                "latency_ms": round(latency_ms, 1), "recorded_at": time.time(), "body": body,
+            }) + "\n")
+            counts[kind] += 1
+            if res.status_code != 200:
+                print(f"⚠️ {kind} returned HTTP {res.status_code}")
+            return res.status_code, body
+
+        tweet_ids, author_ids = [], set()
+        next_token = None
+        for _ in range(args.pages):
+            params = {"query": QUERY, "tweet.fields": TWEET_FIELDS, "max_results": args.max_results}
+            if next_token:
+                params["next_token"] = next_token
+            status, body = get("search", "/2/tweets/search/recent", params)
+            if status != 200:
+                break
+            for tweet in body.get("data", []):
+                tweet_ids.append(tweet["id"])
+                author_ids.add(tweet["author_id"])
+            next_token = body.get("meta", {}).get("next_token")
+            if not next_token:
+                break
+
+        for batch in chunks(sorted(author_ids), 100):
+            get("users", "/2/users", {"ids": ",".join(batch), "user.fields": USER_FIELDS})
+        for batch in chunks(tweet_ids, 100):
+            get("tweets", "/2/tweets", {"ids": ",".join(batch), "tweet.fields": TWEET_FIELDS})
+
+    print(f"✅ Recorded {len(tweet_ids)} tweet(s) from {len(author_ids)} author(s) to {args.out} "
+          f"({dict(counts)} responses)")
+
+
+# === Recording ===
+class Recording:
+    def __init__(self):
+        self.tweets: Dict[str, dict] = OrderedDict()
+        self.users: Dict[str, dict] = OrderedDict()
+        self.latency_ms: Dict[str, List[float]] = defaultdict(list)
+
+
+def load_recording(path: str) -> Recording:
+    """NDJSON from `record`, or the bench_ingest fixture format (.json)"""
+    rec = Recording()
+    with open(path) as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            for user in data["users"]:
+                rec.users[user["id"]] = dict(user["profile"], id=user["id"], wallet=user.get("wallet"))
+            for tweet in data["tweets"]:
+                rec.tweets[tweet["id"]] = tweet
+            return rec
+
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            rec.latency_ms[entry["kind"]].append(entry["latency_ms"])
+            if entry["status"] != 200 or not isinstance(entry["body"], dict):
+                continue
+            data = entry["body"].get("data") or []
+            if isinstance(data, dict):
+                data = [data]
+            # Later lookups carry fresher metrics, so they replace earlier copies
+            target = rec.users if entry["kind"] == "users" else rec.tweets
+            for item in data:
+                target[item["id"]] = dict(target.get(item["id"], {}), **item)
+    if not rec.tweets:
+        sys.exit(f"❌ No tweets in {path}")
+    return rec
+
+
+# === Synthetic workload ===
+def synthetic_wallet(seed: str) -> str:
+    digest = hashlib.sha256(seed.encode()).digest()
+    return "r" + "".join(XRPL_ALPHABET[b % len(XRPL_ALPHABET)] for b in digest[:30])
+
+
+def twitter_time(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class Workload:
+    """Recorded tweets fanned out to `total` tweets over `authors` cloned accounts.
+
+    A `fraud_rate` share of tweets follow one of PATTERNS. Generation is
+    sequential from `seed`, so the same arguments always give the same stream.
+    """
+
+    def __init__(self, rec: Recording, total: int, authors: int, fraud_rate: float, seed: int):
+        self.total = total
+        self.fraud_rate = fraud_rate
+        self.rng = random.Random(seed)
+        self.id_base = 1_900_000_000_000_000_000 + seed * 10 ** 12
+        self.served = 0
+        self.lock = threading.Lock()
+        self.base_tweets = list(rec.tweets.values())
+        self.patterns: Dict[str, str] = {}
+        self.recent_texts: deque = deque(maxlen=1000)
+        self.recent_tweets: "OrderedDict[str, dict]" = OrderedDict()
+
+        originals = [self._account(user) for user in rec.users.values()]
+        known = {user["id"] for user in originals}
+        # Authors that were not looked up still need a handle
+        for tweet in self.base_tweets:
+            if tweet["author_id"] not in known:
+                known.add(tweet["author_id"])
+                originals.append(self._account({"id": tweet["author_id"],
+                                                "username": f"author_{tweet['author_id'][-4:]}"}))
+        self.authors = list(originals)
+        for k in range(len(originals), authors):
+            base = originals[k % len(originals)]
+            user_id = f"{base['id']}{k:06d}"
+            self.authors.append(self._account(dict(base, id=user_id, username=f"{base['username'][:9]}_{k:x}",
+                                                   wallet=None)))
+        now = datetime.now(timezone.utc)
+        self.bots = [self._account({
+            "id": f"{self.id_base + 10 ** 11 + k}",
+            "username": f"user{self.rng.randrange(10 ** 7, 10 ** 8)}",
+            "created_at": twitter_time(now - timedelta(days=self.rng.randrange(1, 20))),
+            "public_metrics": {"followers_count": self.rng.randrange(0, 10),
+                               "following_count": self.rng.randrange(800, 3000), "tweet_count": 12},
+            "profile_image_url": "https://abs.twimg.com/sticky/default_profile_images/default_profile_normal.png",
+        }) for k in range(max(authors // 20, 1))]
+        self.users = {user["id"]: user for user in self.authors + self.bots}
+
+    @staticmethod
+    def _account(user: dict) -> dict:
+        return dict(user, wallet=user.get("wallet") or synthetic_wallet(user["id"]))
+
+    @property
+    def exhausted(self) -> bool:
+        return self.served >= self.total
+
+    def take(self, count: int) -> List[dict]:
+        with self.lock:
+            count = min(count, self.total - self.served)
+            tweets = [self._next() for _ in range(count)]
+        return tweets
+
+    def _next(self) -> dict:
+        n = self.served
+        self.served += 1
+        rng = self.rng
+        base = self.base_tweets[n % len(self.base_tweets)]
+        pattern = rng.choice(PATTERNS) if rng.random() < self.fraud_rate else None
+        author = rng.choice(self.bots) if pattern == "bot_account" else rng.choice(self.authors)
+        public_metrics = dict(base.get("public_metrics", {"like_count": 0, "retweet_count": 0}))
+        text = f"{base['text']} #{n}"
+
+        if pattern == "duplicate_text" and self.recent_texts:
+            text = rng.choice(self.recent_texts)
+        elif pattern == "spam":
+            text = f"FREE WALDO AIRDROP!!!!!!!! CLAIM NOWWWW!!!!!!!! zzzz {n}!!!!"
+        elif pattern == "scam_text":
+            text = f"{base['text']} not a scam, free $WLO giveaway #{n}"
+        elif pattern == "engagement_farm":
+            public_metrics.update(like_count=rng.randrange(2, 6) * 10000, retweet_count=10)
+        self.recent_texts.append(text)
+
+        tweet = {
+            "id": str(self.id_base + n),
+            "author_id": author["id"],
+            "text": text,
+            "created_at": twitter_time(datetime.now(timezone.utc)),
+            "public_metrics": public_metrics,
+        }
+        if pattern:
+            self.patterns[tweet["id"]] = pattern
+        self.recent_tweets[tweet["id"]] = tweet
+        if len(self.recent_tweets) > 10000:
+            self.recent_tweets.popitem(last=False)
+        return tweet
+
+
+# === Fake Twitter API ===
+class FakeTwitter:
+    """Serves the workload on the Twitter v2 paths the bot and `record` use"""
+
+    def __init__(self, workload: Workload, latency_ms: Dict[str, List[float]], speed: float = 1.0):
+        self.workload = workload
+        self.latency_ms = latency_ms
+        self.speed = speed
+        self.rng = random.Random(0)
+        self.calls: Counter = Counter()
+        self.lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTwitter":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                status, payload = fake.handle(parsed.path, {k: v[0] for k, v in parse_qs(parsed.query).items()})
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+    def _delay(self, kind: str):
+        samples = self.latency_ms.get(kind)
+        if self.speed and samples:
+            with self.lock:
+                latency = self.rng.choice(samples)
+            time.sleep(latency / 1000 / self.speed)
+
+    @staticmethod
+    def _user(user: dict) -> dict:
+        return {k: user[k] for k in ("id", "username", "created_at", "public_metrics", "profile_image_url")
+                if k in user}
+
+    def handle(self, path: str, params: Dict[str, str]):
+        parts = path.strip("/").split("/")
+        kind = {"recent": "search", "users": "users", "tweets": "tweets"}.get(parts[-1], parts[1] if len(parts) > 1 else "")
+        with self.lock:
+            self.calls[kind] += 1
+        self._delay(kind)
+
+        if path == "/2/tweets/search/recent":
+            tweets = self.workload.take(int(params.get("max_results", 10)))
+            meta = {"result_count": len(tweets)}
+            if tweets:
+                meta.update(newest_id=tweets[-1]["id"], oldest_id=tweets[0]["id"])
+            return 200, ({"data": tweets, "meta": meta} if tweets else {"meta": meta})
+
+        if len(parts) == 3 and parts[:2] == ["2", "users"]:
+            user = self.workload.users.get(parts[2])
+            if not user:
+                return 200, {"errors": [{"resource_id": parts[2], "title": "Not Found Error"}]}
+            return 200, {"data": self._user(user)}
+
+        if path in ("/2/users", "/2/tweets"):
+            ids = params.get("ids", "").split(",")
+            source = self.workload.users if path == "/2/users" else self.workload.recent_tweets
+            found = [source[i] for i in ids if i in source]
+            return 200, {"data": [self._user(u) for u in found] if path == "/2/users" else found}
+
+        return 404, {"title": "Not Found", "detail": path}
+
+
+# === Run ===
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed_accounts(r, workload: Workload, daily_limit: Optional[int]):
+    """Link a wallet to every account and cache its profile, as scan_user.py / the backend would"""
+    pipe = r.pipeline(transaction=False)
+    for user in workload.users.values():
+        pipe.set(f"twitter:{user['username'].lower()}", user["wallet"])
+        if "created_at" in user:
+            pipe.set(f"profile:{user['id']}", json.dumps(FakeTwitter._user(user)))
+        if len(pipe) >= 1000:
+            pipe.execute()
+    if daily_limit:
+        pipe.set("limits:meme_daily", daily_limit)
+    pipe.execute()
+
+
+def rejected_counts(metrics) -> Dict[str, float]:
+    return {sample.labels["reason"]: sample.value
+            for metric in metrics.TWEETS_REJECTED.collect() for sample in metric.samples
+            if sample.name.endswith("_total")}
+
+
+def run(args):
+    rec = load_recording(args.recording)
+    workload = Workload(rec, args.tweets, args.authors, args.fraud_rate, args.seed)
+    fake = FakeTwitter(workload, rec.latency_ms, args.speed).start()
+
+    # Point main.py at the fake API before it is imported
+    os.environ["TWITTER_API_URL"] = fake.url
+    os.environ.setdefault("TWITTER_BEARER_TOKEN", "replay")
+    os.environ["AI_CONTENT_VERIFICATION_ENABLED"] = "false" if args.no_ai else "true"
+    os.environ["JOURNAL_PATH"] = os.path.join(tempfile.mkdtemp(prefix="replay-ingest-"), "journal.sqlite3")
+    os.environ.setdefault("TRACE_FILE", "")  # traces are still recorded, just not written out
+    os.environ.setdefault("LOG_FILE", os.devnull)
+    if args.memory:
+        os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")  # never connected to
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import main as bot
+    from meme_index import MEME_INDEX_KEY
+    from waldo_core import verification
+
+    if args.memory:
+        from bench_ingest import counting_client
+        bot.r = counting_client()
+    elif bot.r.zscore(MEME_INDEX_KEY, str(workload.id_base)) is not None:
+        sys.exit("❌ This stream was already ingested into REDIS_URL; use an empty database or another --seed")
+    seed_accounts(bot.r, workload, args.daily_limit)
+
+    latencies: List[float] = []
+    outcomes: Dict[str, Counter] = defaultdict(Counter)
+    ai_results: Dict[str, dict] = {}
+    verdicts = open(args.verdicts, "w") if args.verdicts else None
+    ingest_tweet, verify_content_with_ai = bot.ingest_tweet, verification.verify_content_with_ai
+
+    async def recording_verify(r, tweet):
+        result = await verify_content_with_ai(r, tweet)
+        ai_results[tweet["id"]] = result
+        return result
+
+    def timed_ingest(tweet):
+        before = rejected_counts(bot.metrics)
+        started = time.perf_counter()
+        stored = ingest_tweet(tweet)
+        latencies.append(time.perf_counter() - started)
+        if stored:
+            verdict = "accepted"
+        else:
+            after = rejected_counts(bot.metrics)
+            verdict = next((reason for reason, count in after.items() if count > before.get(reason, 0)), "rejected")
+        pattern = workload.patterns.pop(tweet["id"], "clean")
+        outcomes[pattern][verdict] += 1
+        ai = ai_results.pop(tweet["id"], None)
+        if verdicts:
+            verdicts.write(json.dumps({
+                "id": tweet["id"], "pattern": pattern, "verdict": verdict,
+                "ai_verified": ai.get("ai_verified") if ai else None,
+                "confidence": round(ai.get("confidence", 0), 1) if ai else None,
+            }) + "\n")
+        return stored
+
+    bot.ingest_tweet, verification.verify_content_with_ai = timed_ingest, recording_verify
+    # The ingestion path prints on every tweet; keep that out of the timings
+    real_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    polls = 0
+    started = last_progress = time.perf_counter()
+    try:
+        while not workload.exhausted:
+            bot.fetch_and_store()
+            polls += 1
+            if time.perf_counter() - last_progress > 10:
+                last_progress = time.perf_counter()
+                print(f"⏳ {len(latencies)}/{args.tweets} tweets, "
+                      f"{len(latencies) / (last_progress - started):.0f}/s", file=sys.stderr)
+    finally:
+        elapsed = time.perf_counter() - started
+        sys.stdout.close()
+        sys.stdout = real_stdout
+        bot.ingest_tweet, verification.verify_content_with_ai = ingest_tweet, verify_content_with_ai
+        if verdicts:
+            verdicts.close()
+        fake.stop()
+
+    result = {
+        "recording": args.recording,
+        "tweets": len(latencies),
+        "authors": len(workload.authors),
+        "fraud_rate": args.fraud_rate,
+        "speed": args.speed,
+        "seed": args.seed,
+        "polls": polls,
+        "elapsed_s": round(elapsed, 3),
+        "tweets_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {p: round(percentile(latencies, q) * 1000, 3)
+                       for p, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))},
+        "twitter_calls": dict(fake.calls),
+        "verdicts": {pattern: dict(counts) for pattern, counts in sorted(outcomes.items())},
+    }
+    print_run(result)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+    if args.verdicts:
+        print(f"📝 Verdicts written to {args.verdicts}")
+
+
+def print_run(result: dict):
+    print(f"\n📊 Replayed {result['tweets']} tweets over {result['authors']} authors in {result['polls']} polls "
+          f"(fraud {result['fraud_rate']:.0%}, speed {result['speed']}x)")
+    print(f"🚀 Throughput: {result['tweets_per_sec']} tweets/s  ⏱️ {result['elapsed_s']}s")
+    print("   per-tweet latency: " + ", ".join(f"{name} {value} ms" for name, value in result["latency_ms"].items()))
+    print(f"📡 Twitter calls: {result['twitter_calls']}")
+    print("🔎 Verdicts by pattern:")
+    for pattern, counts in result["verdicts"].items():
+        total = sum(counts.values())
+        breakdown = ", ".join(f"{verdict} {count / total:.0%}" for verdict, count in
+                              sorted(counts.items(), key=lambda item: -item[1]))
+        print(f"   {pattern:<16} {total:>9}  {breakdown}")
+
+
+# === Diff ===
+def load_verdicts(path: str) -> Dict[str, dict]:
+    with open(path) as f:
+        return {v["id"]: v for v in map(json.loads, f) if v}
+
+
+def diff(args):
+    old, new = load_verdicts(args.old), load_verdicts(args.new)
+    common = old.keys() & new.keys()
+    if not common:
+        sys.exit("❌ The two runs share no tweets; were they made with the same recording and --seed?")
+
+    changed = Counter()
+    by_pattern = Counter()
+    examples: Dict[tuple, List[str]] = defaultdict(list)
+    drift = []
+    for tweet_id in common:
+        before, after = old[tweet_id], new[tweet_id]
+        if before["confidence"] is not None and after["confidence"] is not None:
+            drift.append(after["confidence"] - before["confidence"])
+        if before["verdict"] != after["verdict"]:
+            transition = (before["verdict"], after["verdict"])
+            changed[transition] += 1
+            by_pattern[after["pattern"]] += 1
+            if len(examples[transition]) < 3:
+                examples[transition].append(tweet_id)
+
+    total_changed = sum(changed.values())
+    print(f"\n🔀 {total_changed} of {len(common)} verdicts changed ({total_changed / len(common):.2%})")
+    if len(old) != len(new) or len(common) != len(old):
+        print(f"   ⚠️ Only in old: {len(old.keys() - common)}, only in new: {len(new.keys() - common)}")
+    for (before, after), count in changed.most_common():
+        print(f"   {before} → {after}: {count}  e.g. {', '.join(examples[(before, after)])}")
+    if by_pattern:
+        print("   by pattern: " + ", ".join(f"{p} {c}" for p, c in by_pattern.most_common()))
+    if drift:
+        moved = sum(1 for d in drift if d)
+        print(f"📈 AI confidence: mean change {sum(drift) / len(drift):+.2f}, {moved} tweet(s) moved")
+    if total_changed and args.fail_on_diff:
+        sys.exit(1)
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Record Twitter responses and replay them through WALDO ingestion")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Capture search, users and tweets responses to NDJSON")
+    rec.add_argument("--out", default="recording.ndjson")
+    rec.add_argument("--pages", type=int, default=5, help="Search pages to follow")
+    rec.add_argument("--max-results", type=int, default=100, help="Tweets per search page (10-100)")
+    rec.add_argument("--api", default=os.getenv("TWITTER_API_URL", "https://api.twitter.com"))
+
+    run_p = sub.add_parser("run", help="Drive fetch_and_store from a fake Twitter API serving a recording")
+    run_p.add_argument("--recording", required=True, help="NDJSON from `record`, or fixtures/tweets.json")
+    run_p.add_argument("--tweets", type=int, default=10000, help="Tweets to serve in total")
+    run_p.add_argument("--authors", type=int, default=1000, help="Accounts the tweets are spread over")
+    run_p.add_argument("--fraud-rate", type=float, default=0.05, help="Share of tweets following a fraud pattern")
+    run_p.add_argument("--speed", type=float, default=1.0,
+                       help="Replay speed vs recorded Twitter latency (2 = twice as fast, 0 = no delay)")
+    run_p.add_argument("--seed", type=int, default=1, help="Seed for the synthetic stream")
+    run_p.add_argument("--daily-limit", type=int, help="Set limits:meme_daily for the run")
+    run_p.add_argument("--memory", action="store_true", help="Use an in-process fakeredis server")
+    run_p.add_argument("--no-ai", action="store_true", help="Run with AI verification disabled")
+    run_p.add_argument("--verdicts", help="Write one NDJSON verdict per tweet to this path")
+    run_p.add_argument("--save", help="Write the summary as JSON to this path")
+
+    diff_p = sub.add_parser("diff", help="Compare the verdicts of two runs")
+    diff_p.add_argument("old")
+    diff_p.add_argument("new")
+    diff_p.add_argument("--fail-on-diff", action="store_true", help="Exit 1 if any verdict changed")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    {"record": record, "run": run, "diff": diff}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Bulk reward recomputation and tier what-if simulator
+- Loads likes/retweets for every meme into NumPy arrays (SCAN + pipelined HMGET,
+  plus the memes in the cold archive, see archive.py)
+- Computes tier, WALDO reward and XP for all of them with vectorized comparisons,
+  using the same rules as calculate_rewards / calculate_xp in waldo_core/rewards.py
+- Reports total WALDO liability per tier under the current and any proposed tier tables
+- Optionally writes the current-table results back in pipelined batches
+  (claimed and archived memes are left alone: archived memes are settled
+  and their segments never change, and so are memes whose tier, WALDO and
+  XP already match). Each changed meme's XP/WALDO delta is applied to
+  wallet:xp and to the all-time and monthly leaderboards in the same
+  pipeline, so the boards stay in step with the memes
+
+A tier table is a JSON list like TIERS in waldo_core/rewards.py, checked in
+list order, first match wins:
+  [{"tier": 5, "likes": 1000, "retweets": 100, "base": 50}, ...]
+
+Examples:
+  # Liability under the current table
+  python reward_sim.py
+
+  # Compare two proposals against it, without touching Redis data
+  python reward_sim.py --tiers proposal_a.json --tiers proposal_b.json
+
+  # Model 5M synthetic memes instead of reading Redis
+  python reward_sim.py --synthetic 5000000 --tiers proposal_a.json
+
+  # Re-tier the stored memes in place
+  python reward_sim.py --write
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+import leaderboard
+from meme_index import archived_memes, is_meme_key, wallet_version_key
+from redis_client import connect
+from redis_keys import wallet_key
+from waldo_core.rewards import (INSTANT_MULTIPLIER, STAKE_MULTIPLIER, TIERS, XP_CAP, XP_LIKES_PER_POINT,
+                                 XP_RETWEETS_PER_POINT)
+
+DEFAULT_TIERS = TIERS
+
+
+class Engagement(NamedTuple):
+    ids: List[str]
+    likes: np.ndarray
+    retweets: np.ndarray
+    instant: np.ndarray
+    claimed: np.ndarray
+    tier: np.ndarray
+    xp: np.ndarray
+    waldo: np.ndarray
+    wallets: List[str]
+    created: List[Optional[bytes]]
+    archived: np.ndarray
+
+
+class Rewards(NamedTuple):
+    tier: np.ndarray
+    waldo: np.ndarray
+    xp: np.ndarray
+
+
+def load_engagement(r, batch_size: int = 1000) -> Engagement:
+    """Read every meme's engagement into arrays, archived ones included"""
+    fields = ("likes", "retweets", "reward_type", "claimed", "xp", "wallet", "waldo", "created_at", "tier")
+    ids, rows, batch = [], [], []
+
+    def flush():
+        pipe = r.pipeline(transaction=False)
+        for key in batch:
+            pipe.hmget(key, *fields)
+        for key, row in zip(batch, pipe.execute()):
+            ids.append(key.decode().split(":", 1)[1])
+            rows.append(row)
+        batch.clear()
+
+    for key in r.scan_iter(match="meme:*", count=batch_size):
+        if is_meme_key(key):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    hot = len(rows)
+    for tweet_id, data in archived_memes(r, batch_size):
+        ids.append(tweet_id)
+        rows.append([data.get(field.encode()) for field in fields])
+
+    return Engagement(
+        ids=ids,
+        likes=np.fromiter((int(row[0] or 0) for row in rows), dtype=np.int64, count=len(rows)),
+        retweets=np.fromiter((int(row[1] or 0) for row in rows), dtype=np.int64, count=len(rows)),
+        # Same default as upgrade_db: a meme without reward_type is treated as stake
+        instant=np.fromiter((row[2] == b"instant" for row in rows), dtype=bool, count=len(rows)),
+        claimed=np.fromiter((int(row[3] or 0) != 0 for row in rows), dtype=bool, count=len(rows)),
+        # -1 for a meme that was never tiered, so write_back always writes it
+        tier=np.fromiter((int(row[8] if row[8] is not None else -1) for row in rows), dtype=np.int64, count=len(rows)),
+        xp=np.fromiter((int(row[4] or 0) for row in rows), dtype=np.int64, count=len(rows)),
+        waldo=np.fromiter((float(row[6] or 0) for row in rows), dtype=np.float64, count=len(rows)),
+        wallets=[(row[5] or b"").decode() for row in rows],
+        created=[row[7] for row in rows],
+        archived=np.arange(len(rows)) >= hot,
+    )
+
+
+def synthetic_engagement(n: int, seed: int = 0) -> Engagement:
+    """Heavy-tailed fake engagement for modeling without production data"""
+    rng = np.random.default_rng(seed)
+    likes = rng.lognormal(mean=3.0, sigma=1.6, size=n).astype(np.int64)
+    retweets = (likes * rng.uniform(0.02, 0.3, size=n)).astype(np.int64)
+    return Engagement(
+        ids=[], likes=likes, retweets=retweets,
+        instant=rng.random(n) < 0.8, claimed=np.zeros(n, dtype=bool),
+        tier=np.full(n, -1, dtype=np.int64), xp=np.zeros(n, dtype=np.int64), waldo=np.zeros(n), wallets=[], created=[],
+        archived=np.zeros(n, dtype=bool),
+    )
+
+
+def compute_rewards(likes: np.ndarray, retweets: np.ndarray, instant: np.ndarray,
+                    tiers: Optional[List[Dict]] = None) -> Rewards:
+    """Vectorized calculate_rewards + calculate_xp"""
+    tiers = tiers or DEFAULT_TIERS
+    # First matching tier in list order wins, exactly like the loop in calculate_rewards
+    conditions = [(likes >= t["likes"]) & (retweets >= t["retweets"]) for t in tiers]
+    tier = np.select(conditions, [t["tier"] for t in tiers], default=0).astype(np.int64)
+
+    # Per-tier reward lookup, rounded with Python's round() so values match the scalar code
+    size = max(t["tier"] for t in tiers) + 1
+    instant_reward = np.zeros(size)
+    stake_reward = np.zeros(size)
+    for t in tiers:
+        instant_reward[t["tier"]] = round(t["base"] * INSTANT_MULTIPLIER, 2)
+        stake_reward[t["tier"]] = round(t["base"] * STAKE_MULTIPLIER, 2)
+    waldo = np.where(instant, instant_reward[tier], stake_reward[tier])
+
+    xp = np.minimum(likes // XP_LIKES_PER_POINT + retweets // XP_RETWEETS_PER_POINT, XP_CAP)
+    return Rewards(tier=tier, waldo=waldo, xp=xp)
+
+
+def liability_by_tier(rewards: Rewards) -> Dict[int, Dict[str, float]]:
+    size = int(rewards.tier.max(initial=0)) + 1
+    counts = np.bincount(rewards.tier, minlength=size)
+    totals = np.bincount(rewards.tier, weights=rewards.waldo, minlength=size)
+    return {t: {"memes": int(counts[t]), "waldo": round(float(totals[t]), 2)} for t in range(size) if counts[t]}
+
+
+def write_back(r, data: Engagement, rewards: Rewards, batch_size: int = 1000) -> int:
+    """HSET tier/waldo/xp on every unclaimed hot meme whose values changed.
+
+    wallet:xp and the xp/waldo leaderboards (all-time and the meme's month)
+    move by the meme's deltas in the same pipeline. Memes without a wallet
+    or created_at are not on the boards, as in leaderboard.rebuild. Memes
+    already holding these values are skipped, so their wallet:version (and
+    the caches keyed on it) stays put.
+    """
+    changed = ((rewards.tier != data.tier) | (rewards.xp != data.xp)
+               | (np.round(rewards.waldo, 2) != np.round(data.waldo, 2)))
+    pending = np.flatnonzero(~data.claimed & ~data.archived & changed)
+    written = 0
+    for start in range(0, len(pending), batch_size):
+        pipe = r.pipeline(transaction=False)
+        for i in pending[start:start + batch_size]:
+            pipe.hset(f"meme:{data.ids[i]}", mapping={
+                "tier": int(rewards.tier[i]),
+                "waldo": float(rewards.waldo[i]),
+                "xp": int(rewards.xp[i])
+            })
+            wallet = data.wallets[i]
+            delta = int(rewards.xp[i] - data.xp[i])
+            waldo_delta = round(float(rewards.waldo[i] - data.waldo[i]), 2)
+            if delta and wallet:
+                pipe.incrby(wallet_key("wallet:xp", wallet), delta)
+            if wallet and data.created[i] and (delta or waldo_delta):
+                leaderboard.adjust_meme(pipe, wallet, delta, waldo_delta, data.created[i])
+            if wallet:
+                pipe.incr(wallet_version_key(wallet))
+            written += 1
+        pipe.execute()
+    return written
+
+
+def print_liability(label: str, liability: Dict[int, Dict[str, float]], baseline: Optional[Dict] = None):
+    total = sum(row["waldo"] for row in liability.values())
+    print(f"\n💰 {label}: {total:,.2f} WALDO total")
+    tiers = set(liability) | set(baseline or {})
+    for tier in sorted(tiers, reverse=True):
+        row = liability.get(tier, {"memes": 0, "waldo": 0.0})
+        line = f"   tier {tier}: {row['memes']:>10,} memes  {row['waldo']:>16,.2f} WALDO"
+        if baseline is not None:
+            previous = baseline.get(tier, {}).get("waldo", 0.0)
+            line += f"  ({row['waldo'] - previous:+,.2f})"
+        print(line)
+    if baseline is not None:
+        base_total = sum(row["waldo"] for row in baseline.values())
+        print(f"   Δ total: {total - base_total:+,.2f} WALDO")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Bulk WALDO reward recomputation and tier what-if simulator")
+    ap.add_argument("--tiers", action="append", default=[], help="JSON file with an alternative tier table")
+    ap.add_argument("--synthetic", type=int, help="Use N synthetic memes instead of Redis")
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--write", action="store_true", help="Write current-table results back to Redis")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    r = None
+    started = time.perf_counter()
+    if args.synthetic:
+        data = synthetic_engagement(args.synthetic)
+    else:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        r = connect()
+        data = load_engagement(r, args.batch_size)
+    loaded = time.perf_counter()
+    print(f"📥 Loaded {len(data.likes):,} memes ({int(data.archived.sum()):,} archived) "
+          f"in {loaded - started:.2f}s")
+
+    current = compute_rewards(data.likes, data.retweets, data.instant)
+    baseline = liability_by_tier(current)
+    print(f"⚡ Computed rewards in {(time.perf_counter() - loaded) * 1000:.1f} ms")
+    print_liability("Current tier table", baseline)
+
+    for path in args.tiers:
+        with open(path) as f:
+            tiers = json.load(f)
+        proposal = compute_rewards(data.likes, data.retweets, data.instant, tiers)
+        print_liability(f"Proposal {path}", liability_by_tier(proposal), baseline)
+
+    if args.write:
+        if r is None:
+            print("❌ --write needs Redis data, not --synthetic")
+            return
+        written = write_back(r, data, current, args.batch_size)
+        print(f"\n✅ Wrote tier/waldo/xp for {written:,} changed unclaimed meme(s) and moved wallet:xp and the "
+              f"xp/waldo leaderboards by the same deltas; archived memes were left as they are")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,16 @@
 # scan_user.py
-import os
 import requests
-import redis
-from dotenv import load_dotenv
+from redis_client import connect
+from waldo_core.config import HEADERS, TWITTER_API_URL
+from waldo_core.ingest import store_meme_tweet
 
-load_dotenv()
-r = redis.from_url(os.getenv("REDIS_URL"))
-BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
-
-HEADERS = {
-    "Authorization": f"Bearer {BEARER_TOKEN}",
-    "User-Agent": "WaldoBot"
-}
+r = connect()
 
 def scan_user(twitter_handle):
     try:
         print(f"🔍 Scanning tweets from @{twitter_handle}")
         # Get user ID first
-        url_user = f"https://api.twitter.com/2/users/by/username/{twitter_handle}"
+        url_user = f"{TWITTER_API_URL}/2/users/by/username/{twitter_handle}"
         res = requests.get(url_user, headers=HEADERS)
         if res.status_code != 200:
             print("❌ Error getting user ID")
@@ -26,20 +19,18 @@ def scan_user(twitter_handle):
         user_id = res.json()["data"]["id"]
 
         # Then fetch recent tweets
-        tweet_url = f"https://api.twitter.com/2/users/{user_id}/tweets?max_results=20&tweet.fields=public_metrics,created_at"
+        tweet_url = f"{TWITTER_API_URL}/2/users/{user_id}/tweets?max_results=20&tweet.fields=public_metrics,created_at"
         res = requests.get(tweet_url, headers=HEADERS)
         if res.status_code != 200:
             print("❌ Error fetching tweets")
             return 0
 
-        from main import store_meme_tweet  # or wherever store_meme_tweet is defined
-
         tweets = res.json().get("data", [])
         count = 0
         for t in tweets:
             if "#waldomeme" in t["text"].lower():
                 t["author_id"] = user_id
-                stored = store_meme_tweet(t)
+                stored = store_meme_tweet(r, t)
                 if stored:
                     count += 1
 
@@ -0,0 +1,34 @@
+"""
+Shared fixtures: an in-process Redis (fakeredis) per test, and an
+environment in which importing the bot's modules connects to nothing and
+writes no trace or log files.
+
+  pip install -r requirements-dev.txt
+  python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")  # clients connect lazily; never used
+os.environ["TRACE_FILE"] = ""
+os.environ["LOG_FILE"] = os.devnull
+os.environ.setdefault("JOURNAL_PATH", os.path.join(tempfile.mkdtemp(prefix="waldo-tests-"), "journal.sqlite3"))
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def r(monkeypatch):
+    """Empty Redis, legacy key layout, archive segments kept in Redis"""
+    import archive
+
+    monkeypatch.delenv("REDIS_KEY_LAYOUT", raising=False)
+    monkeypatch.delenv("ARCHIVE_DIR", raising=False)
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    yield client
+    # default_store() caches stores by id(client), and ids are reused
+    archive._stores.clear()
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from archive import DirSegmentStore, default_store, iter_archive, load_archived
+from archive_memes import STATE_KEY, archive_expired, restore_wallet_tweets
+from meme_index import MEME_INDEX_KEY, get_meme, index_meme, latest_memes
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+DAY = 86400
+
+
+def add_meme(r, tweet_id, age_days, **fields):
+    created_at = time.time() - age_days * DAY
+    data = {"handle": "waldo", "text": f"meme {tweet_id} ✨", "created_at": created_at, "wallet": WALLET,
+            "xp": 3, "waldo": 25, "claimed": 1, "stake_selected": 0, "nft_minted": "false", **fields}
+    r.hset(f"meme:{tweet_id}", mapping=data)
+    r.sadd(f"wallet:tweets:{WALLET}", tweet_id)
+    index_meme(r, tweet_id, created_at, WALLET)
+    return r.hgetall(f"meme:{tweet_id}")
+
+
+@pytest.fixture(params=["redis", "dir"])
+def store(request, r, tmp_path, monkeypatch):
+    if request.param == "dir":
+        monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path))
+    store = default_store(r)
+    assert isinstance(store, DirSegmentStore) == (request.param == "dir")
+    return store
+
+
+def test_archived_memes_read_back_unchanged(r, store):
+    old = {f"old{n}": add_meme(r, f"old{n}", 60 + n) for n in range(5)}
+    minted = add_meme(r, "minted", 60, nft_minted="true")
+    recent = add_meme(r, "recent", 2)
+
+    stats = archive_expired(r, store, segment_size=2)
+
+    assert stats["archived"] == 5 and stats["kept"] == 1
+    for tweet_id, data in old.items():
+        assert not r.exists(f"meme:{tweet_id}")
+        assert r.sismember(f"wallet:tweets:{WALLET}", tweet_id)
+        assert r.zscore(MEME_INDEX_KEY, tweet_id) is not None
+        assert get_meme(r, tweet_id) == data
+    assert r.hgetall("meme:minted") == minted
+    assert r.hgetall("meme:recent") == recent
+
+    entries = [(tweet_id, r.zscore(MEME_INDEX_KEY, tweet_id)) for tweet_id in old]
+    assert load_archived(r, entries, store) == old
+    assert [tweet_id for tweet_id, _ in latest_memes(r, 10)] == ["recent", "minted", *old]
+
+
+def test_rerun_archives_nothing_twice(r, store):
+    for n in range(4):
+        add_meme(r, f"old{n}", 45)
+    archive_expired(r, store)
+
+    assert archive_expired(r, store)["archived"] == 0
+    assert sorted(tweet_id for tweet_id, _ in iter_archive(store)) == [f"old{n}" for n in range(4)]
+
+
+def test_newest_copy_wins_when_a_meme_is_archived_twice(r, store):
+    add_meme(r, "twice", 40, xp=1)
+    archive_expired(r, store)
+    # A run interrupted after writing its segment leaves the hash, and no state to resume from
+    add_meme(r, "twice", 40, xp=2)
+    r.delete(STATE_KEY)
+    archive_expired(r, store)
+
+    assert get_meme(r, "twice")[b"xp"] == b"2"
+    assert [data[b"xp"] for tweet_id, data in iter_archive(store)] == [b"2"]
+
+
+def test_wallet_tweets_membership_can_be_restored(r, store):
+    for n in range(3):
+        add_meme(r, f"old{n}", 45)
+    archive_expired(r, store)
+    # Archives written before membership was kept dropped it
+    r.delete(f"wallet:tweets:{WALLET}")
+
+    assert restore_wallet_tweets(r, store, batch_size=2) == 3
+    assert r.smembers(f"wallet:tweets:{WALLET}") == {b"old0", b"old1", b"old2"}
+    assert restore_wallet_tweets(r, store) == 0
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("xrpl")
+
+import bench_payout
+
+
+@pytest.fixture
+def fake():
+    fake = bench_payout.FakeRippled(close_time=0.05).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def bot(r, fake, monkeypatch):
+    """main.py paying out through the fake node, whenever it was first imported"""
+    distributor = bench_payout.prepare_env(fake)
+    import main
+    from waldo_core import payouts
+
+    monkeypatch.setattr(main, "r", r)
+    monkeypatch.setattr(main, "LIVE_MODE", True)
+    monkeypatch.setattr(payouts, "DISTRIBUTOR_SECRET", distributor.seed)
+    monkeypatch.setattr(payouts, "WALDO_ISSUER", bench_payout.Wallet.create().classic_address)
+    monkeypatch.setattr(payouts, "XRPL_NODE", fake.url)
+    monkeypatch.setattr(payouts, "VALIDATION_POLL_SECONDS", 0.05)
+    return main
+
+
+# One claim in flight: concurrent claims share the distributor's sequence, and
+# the fake node rejects the loser of each race just as rippled would
+
+def test_route_mode_pays_every_claim(bot, fake):
+    rec = bench_payout.Recorder()
+    bench_payout.drive_route(bot, fake, claims=3, concurrency=1, rec=rec)
+
+    assert not rec.errors
+    assert len(rec.latencies) == 3
+    assert set(rec.phases) == set(bench_payout.PHASES)
+    assert all(v > 0 for v in rec.phases["submit"] + rec.phases["validation"])
+    assert fake.calls["submit"] == 3
+
+
+def test_send_waldo_mode_reports_each_phase(bot, fake):
+    import asyncio
+
+    rec = bench_payout.Recorder()
+    asyncio.run(bench_payout.drive_send_waldo(bot, fake, claims=2, concurrency=1, rec=rec))
+
+    assert not rec.errors
+    assert set(rec.phases) == set(bench_payout.PHASES)
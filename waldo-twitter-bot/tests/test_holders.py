@@ -0,0 +1,57 @@
+from waldo_core.holders import BALANCES_KEY, META_KEY, balance, write_snapshot
+
+WHALE = "rWhaLe1111111111111111111111111"
+MINNOW = "rMinnow222222222222222222222222"
+SELLER = "rSeLLer333333333333333333333333"
+
+
+def test_snapshot_writes_balances_and_tiers(r):
+    meta = write_snapshot(r, {WHALE: 75000.5, MINNOW: 1200.0}, ledger_index=90000000)
+
+    assert meta["holders"] == 2 and meta["dropped"] == 0 and meta["version"] == 1
+    assert r.hgetall(f"holder:{WHALE}") == {b"waldoBalance": b"75000", b"memeTier": b"VIP",
+                                            b"memeologyTier": b"waldocoin", b"snapshot": b"1"}
+    assert r.hget(f"holder:{MINNOW}", "memeTier") == b"Standard"
+    assert r.zscore(BALANCES_KEY, WHALE) == 75000.5
+    assert r.hget(META_KEY, "ledger_index") == b"90000000"
+    assert not r.exists(f"{BALANCES_KEY}:next")
+
+
+def test_dropped_holders_are_removed(r):
+    write_snapshot(r, {WHALE: 75000, MINNOW: 1200, SELLER: 20000}, ledger_index=1)
+    meta = write_snapshot(r, {WHALE: 15000, MINNOW: 1200}, ledger_index=2, batch_size=1)
+
+    assert meta["dropped"] == 1
+    assert not r.exists(f"holder:{SELLER}")
+    assert balance(r, SELLER) == 0.0
+    assert r.zscore(BALANCES_KEY, SELLER) is None
+    assert r.hget(f"holder:{WHALE}", "memeTier") == b"Premium"
+    assert r.hget(f"holder:{WHALE}", "snapshot") == b"2"
+    assert balance(r, WHALE) == 15000.0
+
+
+def test_last_holder_selling_out_empties_the_snapshot(r):
+    write_snapshot(r, {SELLER: 500}, ledger_index=1)
+    meta = write_snapshot(r, {}, ledger_index=2)
+
+    assert meta["holders"] == 0 and meta["dropped"] == 1
+    assert not r.exists(BALANCES_KEY) and not r.exists(f"holder:{SELLER}")
+
+
+def test_user_hashes_are_left_alone(r):
+    r.hset(f"user:{WHALE}", mapping={"twitterHandle": "whale", "xp": 40})
+    write_snapshot(r, {WHALE: 75000}, ledger_index=1)
+    write_snapshot(r, {}, ledger_index=2)
+
+    assert r.hgetall(f"user:{WHALE}") == {b"twitterHandle": b"whale", b"xp": b"40"}
+    assert r.keys("user:*") == [f"user:{WHALE}".encode()]
+
+
+def test_tagged_layout_keeps_each_holder_in_its_wallet_slot(r, monkeypatch):
+    monkeypatch.setenv("REDIS_KEY_LAYOUT", "tagged")
+    write_snapshot(r, {WHALE: 75000, SELLER: 10}, ledger_index=1)
+    write_snapshot(r, {WHALE: 75000}, ledger_index=2)
+
+    assert r.exists(f"holder:{{{WHALE}}}") and not r.exists(f"holder:{WHALE}")
+    assert not r.exists(f"holder:{{{SELLER}}}")
+    assert balance(r, WHALE) == 75000.0
@@ -0,0 +1,35 @@
+import pytest
+
+import leaderboard
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+
+
+def add_meme(r, tweet_id, created_at, xp=3, waldo=25.0):
+    r.hset(f"meme:{tweet_id}", mapping={"wallet": WALLET, "xp": xp, "waldo": waldo, "created_at": created_at})
+    pipe = r.pipeline()
+    leaderboard.record_meme(pipe, WALLET, xp, waldo, created_at)
+    pipe.execute()
+
+
+def test_rebuild_matches_incremental_boards_and_drops_stale_ones(r):
+    add_meme(r, "1", "2026-09-15T12:00:00+00:00")
+    add_meme(r, "2", "2026-10-01T12:00:00+00:00", xp=5)
+    incremental = {key: r.zrange(key, 0, -1, withscores=True) for key in r.scan_iter("leaderboard:*")}
+    # A month whose only meme was deleted since its board was written
+    add_meme(r, "3", "2026-08-01T12:00:00+00:00")
+    r.delete("meme:3")
+
+    assert leaderboard.rebuild(r) == 2
+
+    rebuilt = {key: r.zrange(key, 0, -1, withscores=True) for key in r.scan_iter("leaderboard:*")}
+    assert rebuilt == incremental
+    assert not r.exists("leaderboard:xp:2026-08")
+    assert leaderboard.top(r, "xp", month="2026-10") == [{"rank": 1, "wallet": WALLET, "score": 5.0}]
+
+
+@pytest.mark.parametrize("month", ["2026-13", "2026-1", "*", "2026-10:extra", ""])
+def test_months_must_be_yyyy_mm(r, month):
+    assert not leaderboard.valid_month(month)
+    with pytest.raises(ValueError):
+        leaderboard.top(r, "xp", month=month)
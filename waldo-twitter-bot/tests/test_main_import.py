@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_main_creates_no_journal(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != "JOURNAL_PATH"}
+    env["PYTHONPATH"] = BOT_DIR
+    subprocess.run([sys.executable, "-c", "import main"], cwd=tmp_path, env=env, check=True)
+
+    assert not list(tmp_path.glob("journal.sqlite3*"))
@@ -0,0 +1,74 @@
+import pytest
+
+from meme_index import index_meme, wallet_memes_page, wallet_version_key
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+
+
+def add_meme(r, tweet_id, created_at):
+    r.hset(f"meme:{tweet_id}", mapping={"handle": "waldo", "text": f"meme {tweet_id}", "created_at": created_at,
+                                        "xp": 1, "waldo": 10, "nft_minted": "false"})
+    index_meme(r, tweet_id, created_at, WALLET)
+
+
+def seed(r):
+    """12 memes, newest first: 4 single ones, then 5 posted in the same second, then 3 more"""
+    times = [1000, 990, 980, 970] + [900] * 5 + [800, 790, 780]
+    for n, created_at in enumerate(times):
+        add_meme(r, f"t{n:02d}", created_at)
+    return times
+
+
+def all_pages(r, limit, cursor=None):
+    ids = []
+    while True:
+        page = wallet_memes_page(r, WALLET, limit=limit, cursor=cursor)
+        ids += [m["tweet_id"] for m in page["memes"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 5, 12, 50])
+def test_pages_cover_every_meme_once_across_equal_scores(r, limit):
+    times = seed(r)
+    ids = all_pages(r, limit)
+
+    assert sorted(ids) == sorted(f"t{n:02d}" for n in range(len(times)))
+    scores = [float(r.zscore(f"wallet:memes:{WALLET}", tweet_id)) for tweet_id in ids]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_cursor_is_stable_while_new_memes_arrive(r):
+    seed(r)
+    first = wallet_memes_page(r, WALLET, limit=6)
+    before = [m["tweet_id"] for m in first["memes"]]
+
+    # Newer memes land above the cursor, so later pages are unaffected
+    add_meme(r, "new1", 2000)
+    add_meme(r, "new2", 1500)
+
+    rest = all_pages(r, 3, first["next_cursor"])
+
+    assert not set(before) & set(rest)
+    assert "new1" not in rest and "new2" not in rest
+    assert sorted(before + rest) == [f"t{n:02d}" for n in range(12)]
+
+
+def test_etag_follows_the_wallet_version(r):
+    seed(r)
+    page = wallet_memes_page(r, WALLET, limit=5)
+
+    cached = wallet_memes_page(r, WALLET, limit=5, if_none_match=lambda etag: etag == page["etag"])
+    assert cached["not_modified"] and "memes" not in cached
+
+    r.incr(wallet_version_key(WALLET))
+    changed = wallet_memes_page(r, WALLET, limit=5, if_none_match=lambda etag: etag == page["etag"])
+    assert changed["etag"] != page["etag"] and len(changed["memes"]) == 5
+
+
+@pytest.mark.parametrize("cursor", ["nan:0", "inf:0", "-inf:0", "900.0:-1", "900.0", "abc:1", "900.0:x"])
+def test_rejects_cursors_it_could_not_have_issued(r, cursor):
+    seed(r)
+    with pytest.raises(ValueError):
+        wallet_memes_page(r, WALLET, cursor=cursor)
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+KEY = "test-admin-key"
+
+
+@pytest.fixture
+def client(r, monkeypatch):
+    import main
+
+    monkeypatch.setenv("X_ADMIN_KEY", KEY)
+    monkeypatch.setattr(main, "r", r)
+    return main.app.test_client()
+
+
+def test_background_profile_is_served_by_any_worker(client, monkeypatch):
+    import profiler
+
+    headers = {"X-Admin-Key": KEY}
+    res = client.get("/admin/profile?background=true&seconds=0.2&interval_ms=5", headers=headers)
+    assert res.status_code == 202 and res.get_json()["running"]
+
+    deadline = time.monotonic() + 5
+    while (res := client.get("/admin/profile/last?format=json", headers=headers)).status_code == 202:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert res.status_code == 200 and res.get_json()["samples"] > 0
+
+    # Another worker has no background profile in memory, only the copy in Redis
+    monkeypatch.setattr(profiler, "_background", {})
+    res = client.get("/admin/profile/last", headers=headers)
+    assert res.status_code == 200 and res.content_type.startswith("text/plain")
+
+
+def test_no_background_profile_is_a_404(client):
+    assert client.get("/admin/profile/last", headers={"X-Admin-Key": KEY}).status_code == 404
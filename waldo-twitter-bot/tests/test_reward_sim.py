@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import reward_sim
+from waldo_core import rewards
+
+WALLET = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+
+
+def scalar(likes, retweets, instant):
+    tier, waldo = rewards.calculate_rewards(likes, retweets, "instant" if instant else "stake")
+    return tier, waldo, rewards.calculate_xp(likes, retweets)
+
+
+@pytest.mark.parametrize("tiers", [
+    rewards.TIERS,
+    # Not sorted by tier number: the first match in list order still wins
+    [rewards.TIERS[2], rewards.TIERS[0], rewards.TIERS[4], rewards.TIERS[1], rewards.TIERS[3]],
+])
+def test_vectorized_rewards_match_the_scalar_rules(tiers, monkeypatch):
+    monkeypatch.setattr(rewards, "TIERS", tiers)
+    rng = np.random.default_rng(1)
+    likes = np.concatenate([rng.integers(0, 1500, 2000), [0, 25, 50, 100, 500, 1000]])
+    retweets = np.concatenate([rng.integers(0, 150, 2000), [0, 0, 5, 10, 50, 100]])
+    instant = np.arange(len(likes)) % 2 == 0
+
+    result = reward_sim.compute_rewards(likes, retweets, instant, tiers)
+
+    for i in range(len(likes)):
+        expected = scalar(int(likes[i]), int(retweets[i]), bool(instant[i]))
+        assert (int(result.tier[i]), float(result.waldo[i]), int(result.xp[i])) == expected
+
+
+def add_meme(r, tweet_id, likes, retweets, **fields):
+    tier, waldo, xp = scalar(likes, retweets, True)
+    r.hset(f"meme:{tweet_id}", mapping={
+        "likes": likes, "retweets": retweets, "reward_type": "instant", "claimed": 0, "wallet": WALLET,
+        "created_at": "2026-10-01T12:00:00+00:00", "tier": tier, "waldo": waldo, "xp": xp, **fields})
+
+
+def test_write_back_skips_memes_that_did_not_change(r):
+    add_meme(r, "1", 120, 12)
+    add_meme(r, "2", 600, 60)
+    add_meme(r, "3", 30, 1, tier=0, waldo=0.0, xp=0)  # stale: should be tier 1, xp 1
+    data = reward_sim.load_engagement(r)
+
+    assert reward_sim.write_back(r, data, reward_sim.compute_rewards(data.likes, data.retweets, data.instant)) == 1
+    assert r.hget("meme:3", "tier") == b"1" and r.hget("meme:3", "xp") == b"1"
+    assert r.get(f"wallet:xp:{WALLET}") == b"1"
+    assert r.get(f"wallet:version:{WALLET}") == b"1"
+
+    data = reward_sim.load_engagement(r)
+    assert reward_sim.write_back(r, data, reward_sim.compute_rewards(data.likes, data.retweets, data.instant)) == 0
+    assert r.get(f"wallet:version:{WALLET}") == b"1"
@@ -0,0 +1,380 @@
+"""
+Lightweight per-tweet and per-payout tracing.
+
+`trace()` starts a trace (a tweet being ingested, a payout, a poll) and
+`span()` / `@traced` time the steps inside it, giving one span tree per
+trace with attributes such as tweet id, wallet or check name. Outside a
+trace `span()` does nothing, so instrumented helpers cost nothing when they
+run from scripts. `instrument_redis` adds a span per Redis command or
+pipeline.
+
+Every trace is recorded (a span is a couple of perf_counter calls), then
+kept when it was sampled (TRACE_SAMPLE_RATE) or took at least TRACE_SLOW_MS,
+so slow outliers are never sampled away. Kept traces are:
+- held in memory for /admin/traces (TRACE_RECENT, per process)
+- appended to a rolling NDJSON file (TRACE_FILE, empty to disable)
+- posted as OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT when set
+
+Export runs on a background thread behind a bounded queue; traces are
+dropped and counted rather than slowing ingestion down.
+
+`python tracing.py --collector` runs a minimal OTLP/HTTP collector stand-in
+that appends what it receives to an NDJSON file.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))
+TRACE_RECENT = int(os.getenv("TRACE_RECENT", "500"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.ndjson")
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", 10 * 1024 * 1024))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", 3))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "").rstrip("/")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "waldo-twitter-bot")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("waldo_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "attributes", "trace_id", "span_id", "parent", "root", "start", "end",
+                 "wall_start", "error", "children", "span_count", "dropped_spans")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"] = None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.trace_id = self.root.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+        self.span_count = 1
+        self.dropped_spans = 0
+        if parent:
+            parent.children.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "start": round(self.wall_start, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def _error(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"[:200]
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Start a new trace. Nested in another trace it still gets its own tree, linked by parent_trace_id"""
+    if not TRACING_ENABLED:
+        yield None
+        return
+    outer = _current.get()
+    if outer is not None:
+        attributes["parent_trace_id"] = outer.trace_id
+    root = Span(name, attributes)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = _error(e)
+        raise
+    finally:
+        root.end = time.perf_counter()
+        _current.reset(token)
+        _finish(root)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a step of the current trace; a no-op outside one"""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    root = parent.root
+    if root.span_count >= TRACE_MAX_SPANS:
+        root.dropped_spans += 1
+        yield None
+        return
+    root.span_count += 1
+    s = Span(name, attributes, parent)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = _error(e)
+        raise
+    finally:
+        s.end = time.perf_counter()
+        _current.reset(token)
+
+
+def set_attributes(**attributes):
+    """Add attributes to the innermost open span, if any"""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the innermost open span, if any (for correlating log lines)"""
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run the function (sync or async) in a span named after it"""
+    def decorate(fn):
+        span_name = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_redis(r):
+    """Span per Redis command and per pipeline execute, when called inside a trace"""
+    execute_command, pipeline = r.execute_command, r.pipeline
+
+    def traced_execute_command(*args, **kwargs):
+        if _current.get() is None:
+            return execute_command(*args, **kwargs)
+        with span(f"redis.{str(args[0]).lower()}"):
+            return execute_command(*args, **kwargs)
+
+    def traced_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        pipe_execute = pipe.execute
+
+        def traced_execute(*a, **kw):
+            if _current.get() is None:
+                return pipe_execute(*a, **kw)
+            with span("redis.pipeline", commands=len(pipe)):
+                return pipe_execute(*a, **kw)
+
+        pipe.execute = traced_execute
+        return pipe
+
+    r.execute_command = traced_execute_command
+    r.pipeline = traced_pipeline
+    return r
+
+
+# === Keeping and exporting ===
+_recent: deque = deque(maxlen=TRACE_RECENT)
+_queue: queue.Queue = queue.Queue(maxsize=1000)
+_lock = threading.Lock()
+_counters = {"recorded": 0, "kept": 0, "exported": 0, "export_dropped": 0, "export_failed": 0}
+_exporter_started = False
+
+
+def _finish(root: Span):
+    slow = root.duration_ms >= TRACE_SLOW_MS
+    with _lock:
+        _counters["recorded"] += 1
+        if not (slow or random.random() < TRACE_SAMPLE_RATE):
+            return
+        _counters["kept"] += 1
+        _recent.append(root)
+    if not (TRACE_FILE or TRACE_OTLP_ENDPOINT):
+        return
+    _start_exporter()
+    try:
+        _queue.put_nowait(root)
+    except queue.Full:
+        with _lock:
+            _counters["export_dropped"] += 1
+
+
+def trace_record(root: Span) -> Dict[str, Any]:
+    record = {"trace_id": root.trace_id, "service": SERVICE_NAME, **root.to_dict()}
+    if root.dropped_spans:
+        record["dropped_spans"] = root.dropped_spans
+    return record
+
+
+def slowest(limit: int = 20, name: Optional[str] = None, min_ms: float = 0.0) -> List[Dict[str, Any]]:
+    """Slowest kept traces in this process, slowest first"""
+    with _lock:
+        roots = list(_recent)
+    roots = [root for root in roots if (not name or root.name == name) and root.duration_ms >= min_ms]
+    roots.sort(key=lambda root: root.duration_ms, reverse=True)
+    return [trace_record(root) for root in roots[:limit]]
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            **_counters,
+            "recent": len(_recent),
+            "sample_rate": TRACE_SAMPLE_RATE,
+            "slow_ms": TRACE_SLOW_MS,
+            "file": TRACE_FILE or None,
+            "otlp_endpoint": TRACE_OTLP_ENDPOINT or None,
+        }
+
+
+def _otlp_value(value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(roots: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON ExportTraceServiceRequest"""
+    spans = []
+    for root in roots:
+        for s in root.walk():
+            start_ns = int(s.wall_start * 1e9)
+            otlp = {
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(s.duration_ms * 1e6)),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            }
+            if s.parent:
+                otlp["parentSpanId"] = s.parent.span_id
+            spans.append(otlp)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "waldo.tracing"}, "spans": spans}],
+    }]}
+
+
+def _start_exporter():
+    global _exporter_started
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    threading.Thread(target=_export_loop, daemon=True).start()
+
+
+def _export_loop():
+    file_log = None
+    if TRACE_FILE:
+        file_log = logging.getLogger("waldo.traces")
+        file_log.propagate = False
+        handler = RotatingFileHandler(TRACE_FILE, maxBytes=TRACE_FILE_MAX_BYTES, backupCount=TRACE_FILE_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        file_log.addHandler(handler)
+        file_log.setLevel(logging.INFO)
+    session = None
+    if TRACE_OTLP_ENDPOINT:
+        import requests
+        session = requests.Session()
+
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < 100:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            if file_log:
+                for root in batch:
+                    file_log.info(json.dumps(trace_record(root), default=str))
+            if session:
+                session.post(f"{TRACE_OTLP_ENDPOINT}/v1/traces", json=to_otlp(batch), timeout=5).raise_for_status()
+            with _lock:
+                _counters["exported"] += len(batch)
+        except Exception as e:
+            print(f"⚠️ Trace export failed: {e}")
+            with _lock:
+                _counters["export_failed"] += len(batch)
+
+
+# === Collector stand-in ===
+def run_collector(port: int, out: str):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            spans = [s for rs in body.get("resourceSpans", []) for ss in rs.get("scopeSpans", []) for s in ss["spans"]]
+            with lock, open(out, "a") as f:
+                for s in spans:
+                    f.write(json.dumps(s) + "\n")
+            print(f"📥 {len(spans)} span(s) from {len({s['traceId'] for s in spans})} trace(s)")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    print(f"🛰️ OTLP/HTTP collector stand-in on :{port}, writing spans to {out}")
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="OTLP/HTTP trace collector stand-in")
+    ap.add_argument("--collector", action="store_true", required=True)
+    ap.add_argument("--port", type=int, default=4318)
+    ap.add_argument("--out", default="collected_spans.ndjson")
+    args = ap.parse_args()
+    run_collector(args.port, args.out)
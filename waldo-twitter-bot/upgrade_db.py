@@ -1,54 +1,164 @@
-import os
+import argparse
 from dotenv import load_dotenv
-import redis
+from migrations import Migration, run_migration
+from meme_store import SIDE_FIELDS, legacy_keys, memory_report, print_memory_report
+from redis_client import connect
+from redis_keys import tag_legacy_key
+from waldo_core.rewards import calculate_rewards
 
 load_dotenv()
 
 # Connect to Redis using the .env REDIS_URL
-r = redis.from_url(os.getenv("REDIS_URL"))
-
-def recalculate_tier(likes, retweets, reward_type):
-    tiers = [
-        {"tier": 5, "likes": 1000, "retweets": 100, "base": 50},
-        {"tier": 4, "likes": 500, "retweets": 50, "base": 25},
-        {"tier": 3, "likes": 100, "retweets": 10, "base": 5},
-        {"tier": 2, "likes": 50, "retweets": 5, "base": 2},
-        {"tier": 1, "likes": 25, "retweets": 0, "base": 1},
-    ]
-    for t in tiers:
-        if likes >= t["likes"] and retweets >= t["retweets"]:
-            base = t["base"]
-            if reward_type == "instant":
-                waldo = round(base * 0.9, 2)
-            else:
-                waldo = round(base * 1.15 * 0.95, 2)
-            return t["tier"], waldo
-    return 0, 0.0
-
-def upgrade_all():
-    keys = r.keys("meme:*")
-    updated = 0
-
-    for key in keys:
-        data = r.hgetall(key)
-        try:
-            likes = int(data.get(b"likes", b"0"))
-            retweets = int(data.get(b"retweets", b"0"))
-            reward_type = data.get(b"reward_type", b"stake").decode()
-
-            tier, waldo = recalculate_tier(likes, retweets, reward_type)
-
-            r.hset(key, mapping={
-                "reward_tier": tier,
-                "waldo_amount": waldo
-            })
-
-            updated += 1
-        except Exception as e:
-            print(f"❌ Error on {key.decode()}: {e}")
-
-    print(f"\n✅ Upgrade complete. Updated {updated} meme entries.")
+r = connect()
 
-if __name__ == "__main__":
-    upgrade_all()
+class RetierMigration(Migration):
+    """Recompute reward_tier / waldo_amount for every meme from its likes and retweets"""
+    name = "retier"
+
+    def read(self, pipe, key):
+        pipe.hmget(key, "likes", "retweets", "reward_type", "reward_tier", "waldo_amount")
+
+    def transform(self, key, values):
+        likes, retweets, reward_type, old_tier, old_waldo = values[0]
+        tier, waldo = calculate_rewards(int(likes or 0), int(retweets or 0), (reward_type or b"stake").decode())
+        if old_tier is not None and old_waldo is not None and \
+                int(old_tier) == tier and float(old_waldo) == waldo:
+            return None
+        return {"reward_tier": tier, "waldo_amount": waldo}
+
+    def describe(self, key, values, changes):
+        old_tier, old_waldo = values[0][3:]
+        return (f"{key.decode()}  reward_tier: {old_tier and old_tier.decode()} -> {changes['reward_tier']}, "
+                f"waldo_amount: {old_waldo and old_waldo.decode()} -> {changes['waldo_amount']}")
+
+class CollapseSideKeysMigration(Migration):
+    """Move meme:xp:/meme:waldo:/meme:nft_minted:/meme:ai_*: side keys into the meme hash"""
+    name = "collapse_side_keys"
+
+    def read(self, pipe, key):
+        pipe.hgetall(key)
+        # GETs rather than MGET: the legacy keys of one meme sit in different cluster slots
+        for legacy in legacy_keys(key.decode().split(":", 1)[1]):
+            pipe.get(legacy)
+
+    def transform(self, key, values):
+        data, legacy_values = values[0], values[1:]
+        fields = {}
+        delete = []
+        for field, legacy, value in zip(SIDE_FIELDS, legacy_keys(key.decode().split(":", 1)[1]), legacy_values):
+            if value is None:
+                continue
+            if field == "nft_minted" and value != b"false":
+                # Real mint record written by the backend: keep it, flag the hash
+                if data.get(b"nft_minted") != b"true":
+                    fields["nft_minted"] = "true"
+                continue
+            if field.encode() not in data:
+                fields[field] = value
+            delete.append(legacy)
+        if b"nft_minted" not in data and "nft_minted" not in fields:
+            fields["nft_minted"] = "false"
+        if not fields and not delete:
+            return None
+        return {"fields": fields, "delete": delete}
+
+    def write(self, pipe, key, changes):
+        if changes["fields"]:
+            pipe.hset(key, mapping=changes["fields"])
+        for legacy in changes["delete"]:
+            pipe.delete(legacy)
+
+    def describe(self, key, values, changes):
+        fields = ", ".join(f"{k}={v.decode() if isinstance(v, bytes) else v}" for k, v in changes["fields"].items())
+        return f"{key.decode()}  set [{fields}]  delete {changes['delete']}"
+
+class TagWalletKeysMigration(Migration):
+    """Rename per-wallet keys to the hash-tagged layout (see redis_keys.py).
+
+    Run on the single-node Redis, then set REDIS_KEY_LAYOUT=tagged for both
+    the bot and the Node backend (waldocoin-backend/utils/redisKeys.js);
+    meme_count: keys are left alone since they expire within a day.
+    """
+    name = "tag_wallet_keys"
+    match = "*"
+
+    def wants(self, key):
+        return tag_legacy_key(key) is not None
+
+    def read(self, pipe, key):
+        pipe.exists(tag_legacy_key(key))
+
+    def transform(self, key, values):
+        if values[0]:
+            print(f"⚠️ {tag_legacy_key(key)} already exists, leaving {key.decode()} in place")
+            return None
+        return {"to": tag_legacy_key(key)}
 
+    def write(self, pipe, key, changes):
+        # RENAME keeps the TTL (bans, violation counters)
+        pipe.renamenx(key, changes["to"])
+
+    def describe(self, key, values, changes):
+        return f"{key.decode()} -> {changes['to']}"
+
+class HolderFieldsOutOfUserMigration(Migration):
+    """Undo holder snapshots written into user:{wallet} hashes.
+
+    Early snapshots wrote every WALDO holder's balance and tiers there, which
+    made each holder look like a registered user to the Node backend. They
+    now live in holder:{wallet}. Hashes holding nothing but snapshot fields
+    are deleted; registered users keep their hash without the tier fields.
+    """
+    name = "holder_fields_out_of_user"
+    match = "user:*"
+    SNAPSHOT_FIELDS = (b"waldoBalance", b"memeTier", b"memeologyTier", b"holderSnapshot")
+
+    def wants(self, key):
+        return key.count(b":") == 1  # user:{wallet}, not user:{wallet}:battles
+
+    def transform(self, key, values):
+        data = values[0]
+        if b"holderSnapshot" not in data:
+            return None
+        if set(data) <= set(self.SNAPSHOT_FIELDS):
+            return {"delete": True}
+        return {"delete": False}
+
+    def write(self, pipe, key, changes):
+        if changes["delete"]:
+            pipe.delete(key)
+        else:
+            pipe.hdel(key, *self.SNAPSHOT_FIELDS[1:])
+
+    def describe(self, key, values, changes):
+        return f"{key.decode()}  {'delete' if changes['delete'] else 'drop snapshot fields'}"
+
+MIGRATIONS = {m.name: m for m in (RetierMigration, CollapseSideKeysMigration, TagWalletKeysMigration,
+                                  HolderFieldsOutOfUserMigration)}
+
+def upgrade_all(workers=4, batch_size=500, dry_run=False, ops_per_sec=None, reset=False, migration="retier"):
+    report_memory = migration == CollapseSideKeysMigration.name
+    if report_memory:
+        before = memory_report(r)
+        print_memory_report("Before", before)
+
+    totals = run_migration(r, MIGRATIONS[migration](), workers=workers, batch_size=batch_size,
+                           dry_run=dry_run, ops_per_sec=ops_per_sec, reset=reset)
+
+    if report_memory and not dry_run:
+        after = memory_report(r)
+        print_memory_report("After", after)
+        saved = sum(f["bytes"] for f in before.values()) - sum(f["bytes"] for f in after.values())
+        print(f"💾 Saved {saved / 1024 / 1024:.2f} MiB")
+    return totals
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run a meme keyspace migration (resumable)")
+    ap.add_argument("--migration", choices=sorted(MIGRATIONS), default="retier")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--batch-size", type=int, default=500, help="Keys per SCAN chunk")
+    ap.add_argument("--dry-run", action="store_true", help="Print the changes without writing")
+    ap.add_argument("--ops-per-sec", type=float, help="Throttle Redis commands to this rate")
+    ap.add_argument("--reset", action="store_true", help="Forget the saved checkpoint and start over")
+    args = ap.parse_args()
+    upgrade_all(args.workers, args.batch_size, args.dry_run, args.ops_per_sec, args.reset, args.migration)
@@ -1,22 +1,23 @@
-import os
-import redis
+import argparse
 from dotenv import load_dotenv
-from datetime import datetime
+from meme_index import latest_memes, memes_between
+from redis_client import connect
 
 load_dotenv()
-r = redis.from_url(os.getenv("REDIS_URL"))
+r = connect()
 
-def view_tweets(limit=50):
-    keys = sorted(r.keys("meme:*"), reverse=True)
-    if not keys:
+def view_tweets(limit=50, since=None, until=None):
+    if since or until:
+        memes = memes_between(r, since, until, limit=limit)
+    else:
+        memes = latest_memes(r, limit)
+    if not memes:
         print("📭 No tweets found in Redis.")
         return
 
-    print(f"📄 Displaying latest {min(limit, len(keys))} tweet(s):\n")
+    print(f"📄 Displaying latest {len(memes)} tweet(s):\n")
 
-    for key in keys[:limit]:
-        data = r.hgetall(key)
-        tweet_id = key.decode().split(":")[1]
+    for tweet_id, data in memes:
         author_id = data.get(b"author_id", b"?").decode()
         text = data.get(b"text", b"").decode().replace("\n", " ")
         likes = data.get(b"likes", b"0").decode()
@@ -34,4 +35,9 @@ def view_tweets(limit=50):
         print("-" * 40)
 
 if __name__ == "__main__":
-    view_tweets()
+    ap = argparse.ArgumentParser(description="Show the latest stored memes")
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--since", help="ISO timestamp, e.g. 2025-01-01T00:00:00Z")
+    ap.add_argument("--until", help="ISO timestamp")
+    args = ap.parse_args()
+    view_tweets(args.limit, args.since, args.until)
@@ -0,0 +1,24 @@
+"""
+Ingestion, reward and verification logic for the WALDO bot, importable
+without side effects.
+
+Importing anything here connects to nothing, builds no Flask app and loads
+no heavy third-party package: xrpl-py, redis-py, requests, prometheus_client
+(metrics.py) and msgpack/zstandard (meme_index.py) are imported by the
+functions that use them. `python bench_startup.py` lists what each entry
+point loads. So CLI tools start quickly:
+
+  config        settings from the environment (.env loaded on import)
+  rewards       tiers, calculate_rewards, calculate_xp
+  twitter       Twitter API GETs and handle lookup
+  verification  the free AI verification checks
+  violations    AI violation logging, consequences and status
+  ingest        store_meme_tweet and the daily meme limit
+  payouts       send_waldo (imports xrpl-py on first use)
+  holders       WALDO holder snapshot: balances and tiers for every holder
+
+Functions that touch Redis take the client as their first argument, like
+meme_index.py and leaderboard.py. main.py builds the web app and the poller
+on top of this package; scan_user.py, upgrade_db.py and reward_sim.py use it
+directly.
+"""
@@ -0,0 +1,40 @@
+"""Settings shared by the web app and the CLIs, read from the environment"""
+import os
+from urllib.parse import urlencode
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_REWARD_TYPE = "instant"
+
+# XRPL payouts
+XRPL_NODE = os.getenv("XRPL_NODE", "https://s.altnet.rippletest.net:51234")
+DISTRIBUTOR_SECRET = os.getenv("DISTRIBUTOR_SECRET")
+WALDO_ISSUER = os.getenv("WALDO_ISSUER")
+WALDO_CURRENCY = os.getenv("WALDO_CURRENCY", "WLO")
+
+# Holder snapshot (holders.py)
+HOLDER_SNAPSHOT_INTERVAL = int(os.getenv("HOLDER_SNAPSHOT_INTERVAL", "600"))
+HOLDER_SNAPSHOT_BATCH = int(os.getenv("HOLDER_SNAPSHOT_BATCH", "1000"))
+
+# AI content verification
+AI_VERIFICATION_ENABLED = os.getenv("AI_CONTENT_VERIFICATION_ENABLED", "false").lower() == "true"
+AI_CONFIDENCE_THRESHOLD = int(os.getenv("AI_CONFIDENCE_THRESHOLD", "70"))
+
+# Twitter API
+BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
+# Overridable so replay_ingest.py can point the bot at its fake Twitter API
+TWITTER_API_URL = os.getenv("TWITTER_API_URL", "https://api.twitter.com").rstrip("/")
+HEADERS = {
+    "Authorization": f"Bearer {BEARER_TOKEN}",
+    "User-Agent": "WaldoBot"
+}
+
+# Twitter search - catch all hashtag variations
+QUERY = "(#WaldoMeme OR #waldomeme OR #Waldomeme OR #WALDOMEME) -is:retweet"
+TWEET_FIELDS = "author_id,public_metrics,created_at"
+MAX_RESULTS = 50
+# Encoded, or the first "#" would cut the query short as a URL fragment
+SEARCH_URL = f"{TWITTER_API_URL}/2/tweets/search/recent?" + urlencode(
+    {"query": QUERY, "tweet.fields": TWEET_FIELDS, "max_results": MAX_RESULTS})
@@ -0,0 +1,205 @@
+"""
+WALDO holder snapshot: every holder's balance and tiers from one pass over
+the issuer's trustlines.
+
+`snapshot(r)` pages account_lines for WALDO_ISSUER on the last validated
+ledger (400 lines a page, every page pinned to the first page's ledger) and
+writes, in pipelined batches of HOLDER_SNAPSHOT_BATCH:
+
+  holder:{wallet}           waldoBalance, memeTier, memeologyTier, snapshot
+  {holders}:balances        sorted set, wallet -> balance, all current holders
+  {holders}:meta            version, ledger_index, holders, finished_at, ...
+
+The snapshot has its own key families. user:{wallet} hashes belong to
+registered users, and the Node backend lists and totals every one of them,
+so they are never written here.
+
+The balances set is built under {holders}:balances:next and renamed into
+place, so readers never see half a snapshot; the braces keep the {holders}
+keys in one cluster slot. Wallets in the previous snapshot that no longer
+hold WALDO have their holder hash deleted, and `balance()` reads a missing
+hash as 0. check_daily_meme_limit then reads its tier through `balance()`,
+and Memeology reads balances from {holders}:balances, instead of each
+asking XRPL.
+
+main.py runs it every HOLDER_SNAPSHOT_INTERVAL seconds; a Redis lock keeps
+two processes from running it at once. Only the run holding the lock's
+token releases it, so a run that outlived the lock cannot delete the next
+run's. Run it by hand with:
+  python -m waldo_core.holders
+"""
+import dataclasses
+import time
+import uuid
+from typing import Dict, Iterator, Optional, Tuple
+
+import logs
+import tracing
+from redis_keys import wallet_key
+from waldo_core.config import (HOLDER_SNAPSHOT_BATCH, HOLDER_SNAPSHOT_INTERVAL, WALDO_CURRENCY, WALDO_ISSUER,
+                               XRPL_NODE)
+
+BALANCES_KEY = "{holders}:balances"
+META_KEY = "{holders}:meta"
+VERSION_KEY = "{holders}:version"
+LOCK_KEY = "{holders}:lock"
+PAGE_SIZE = 400  # rippled's maximum for account_lines
+MAX_PAGES = 100000
+
+# DEL the lock only if it still holds our token
+_RELEASE_LOCK = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Daily meme limit tiers, by WALDO held (limits are read from limits:* keys)
+MEME_TIERS = ((50000, "VIP"), (10000, "Premium"), (0, "Standard"))
+# Memeology's holder tier (memeology/backend/main.py); premium there is a subscription
+MEMEOLOGY_WALDOCOIN_MIN = 1000
+
+log = logs.get_logger("holders")
+
+
+def meme_tier(balance: float) -> str:
+    return next(name for minimum, name in MEME_TIERS if balance >= minimum)
+
+
+def memeology_tier(balance: float) -> str:
+    return "waldocoin" if balance >= MEMEOLOGY_WALDOCOIN_MIN else "free"
+
+
+def balance(r, wallet: str) -> float:
+    """`wallet`'s WALDO balance in the current snapshot, 0 if it holds none"""
+    value = r.hget(wallet_key("holder", wallet), "waldoBalance")
+    return float(value) if value else 0.0
+
+
+def fetch_holders(client=None, issuer: Optional[str] = None) -> Tuple[Dict[str, float], Optional[int], int]:
+    """({wallet: balance}, ledger_index, pages) for every wallet holding WALDO"""
+    from xrpl.clients import JsonRpcClient
+    from xrpl.models.requests import AccountLines
+
+    client = client or JsonRpcClient(XRPL_NODE)
+    req = AccountLines(account=issuer or WALDO_ISSUER, ledger_index="validated", limit=PAGE_SIZE)
+    holders: Dict[str, float] = {}
+    ledger_index = None
+    for pages in range(1, MAX_PAGES + 1):
+        response = client.request(req)
+        if not response.is_successful():
+            raise RuntimeError(f"account_lines failed: {response.result.get('error')}")
+        ledger_index = response.result.get("ledger_index", ledger_index)
+        for line in response.result.get("lines", []):
+            # Seen from the issuer a holder's balance is negative
+            balance = -float(line["balance"])
+            if line.get("currency") == WALDO_CURRENCY and balance > 0:
+                holders[line["account"]] = holders.get(line["account"], 0.0) + balance
+        marker = response.result.get("marker")
+        if marker is None:
+            return holders, ledger_index, pages
+        req = dataclasses.replace(req, marker=marker, ledger_index=ledger_index or req.ledger_index)
+    raise RuntimeError(f"account_lines still paginating after {MAX_PAGES} pages")
+
+
+def _batches(items, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_snapshot(r, holders: Dict[str, float], ledger_index: Optional[int],
+                   batch_size: int = HOLDER_SNAPSHOT_BATCH) -> dict:
+    """Store `holders` as a new snapshot version; returns its meta"""
+    version = r.incr(VERSION_KEY)
+    next_key = f"{BALANCES_KEY}:next"
+    r.delete(next_key)
+    round_trips = 0
+
+    for batch in _batches(holders.items(), batch_size):
+        pipe = r.pipeline(transaction=False)
+        for wallet, balance in batch:
+            pipe.hset(wallet_key("holder", wallet), mapping={
+                "waldoBalance": int(balance),
+                "memeTier": meme_tier(balance),
+                "memeologyTier": memeology_tier(balance),
+                "snapshot": version,
+            })
+        pipe.zadd(next_key, dict(batch))
+        pipe.execute()
+        round_trips += 1
+
+    # Holders in the last snapshot that have sold out since
+    previous = {w.decode() for w in r.zrange(BALANCES_KEY, 0, -1)}
+    dropped = [w for w in previous if w not in holders]
+    for batch in _batches(dropped, batch_size):
+        pipe = r.pipeline(transaction=False)
+        for wallet in batch:
+            pipe.delete(wallet_key("holder", wallet))
+        pipe.execute()
+        round_trips += 1
+
+    meta = {
+        "version": version,
+        "ledger_index": ledger_index or 0,
+        "holders": len(holders),
+        "dropped": len(dropped),
+        "finished_at": time.time(),
+    }
+    pipe = r.pipeline()
+    if holders:
+        pipe.rename(next_key, BALANCES_KEY)
+    else:
+        pipe.delete(BALANCES_KEY)
+    pipe.hset(META_KEY, mapping=meta)
+    pipe.execute()
+    meta["round_trips"] = round_trips + 1
+    return meta
+
+
+@tracing.traced()
+def snapshot(r, client=None) -> Optional[dict]:
+    """Fetch and store a snapshot unless another process is already taking one"""
+    import metrics
+
+    token = uuid.uuid4().hex
+    if not r.set(LOCK_KEY, token, nx=True, ex=int(max(HOLDER_SNAPSHOT_INTERVAL, 60))):
+        log.info("holder_snapshot_skipped", stage="holders", reason="locked")
+        return None
+    started = time.perf_counter()
+    try:
+        holders, ledger_index, pages = fetch_holders(client)
+        fetched = time.perf_counter()
+        meta = write_snapshot(r, holders, ledger_index)
+    except Exception:
+        metrics.HOLDER_SNAPSHOTS.labels("error").inc()
+        raise
+    finally:
+        r.eval(_RELEASE_LOCK, 1, LOCK_KEY, token)
+    meta.update(pages=pages, fetch_seconds=round(fetched - started, 3),
+                write_seconds=round(time.perf_counter() - fetched, 3))
+    metrics.HOLDER_SNAPSHOTS.labels("ok").inc()
+    metrics.HOLDER_SNAPSHOT_DURATION.observe(time.perf_counter() - started)
+    metrics.HOLDERS.set(meta["holders"])
+    log.info("holder_snapshot", stage="holders", **meta)
+    return meta
+
+
+def status(r) -> dict:
+    """Meta of the current snapshot, with its age"""
+    meta = {k.decode(): v.decode() for k, v in r.hgetall(META_KEY).items()}
+    if meta.get("finished_at"):
+        meta["age_seconds"] = round(time.time() - float(meta["finished_at"]), 1)
+    return meta
+
+
+if __name__ == "__main__":
+    from redis_client import connect
+
+    result = snapshot(connect())
+    print(result if result else "⏳ Another snapshot is running")
@@ -0,0 +1,180 @@
+"""Turning a search result into a stored meme
+
+metrics (prometheus_client), leaderboard, meme_index (msgpack, zstandard via
+archive.py) and redis_client (redis-py) are imported by store_meme_tweet
+itself, so importing this module loads none of them.
+"""
+import asyncio
+from datetime import datetime
+
+import logs
+import tracing
+from redis_keys import meme_count_key, wallet_key
+from waldo_core import verification
+from waldo_core.config import AI_CONFIDENCE_THRESHOLD, AI_VERIFICATION_ENABLED, DEFAULT_REWARD_TYPE
+from waldo_core.holders import balance as holder_balance, meme_tier
+from waldo_core.rewards import calculate_rewards, calculate_xp
+from waldo_core.twitter import fetch_author_handle
+from waldo_core.violations import check_ai_violation_status, log_ai_violation
+
+log = logs.get_logger("ingest")
+
+# Daily meme limit per holder tier: (Redis override key, default)
+DAILY_LIMITS = {
+    "VIP": ("limits:meme_vip", 25),
+    "Premium": ("limits:meme_premium", 15),
+    "Standard": ("limits:meme_daily", 5),
+}
+
+
+@tracing.traced()
+def check_daily_meme_limit(r, handle, wallet):
+    """Check if user has exceeded their daily meme limit"""
+    try:
+        # Get user's WALDO balance to determine tier (from the holder snapshot)
+        waldo_balance = holder_balance(r, wallet)
+
+        # Determine daily limit based on WALDO holdings
+        tier = meme_tier(waldo_balance)
+        limit_key, default_limit = DAILY_LIMITS[tier]
+        daily_limit = int(r.get(limit_key) or default_limit)
+
+        # Get today's date for tracking
+        today = datetime.now().strftime('%Y-%m-%d')
+        daily_key = meme_count_key(handle, wallet, today)
+
+        # Get current count for today
+        current_count = int(r.get(daily_key) or 0)
+
+        log.info("daily_count", stage="daily_limit", handle=handle, wallet=wallet, tier=tier,
+                 count=current_count, limit=daily_limit)
+
+        return current_count < daily_limit, current_count, daily_limit, tier
+
+    except Exception as e:
+        log.error("daily_limit_check_failed", stage="daily_limit", handle=handle, wallet=wallet, error=str(e))
+        return True, 0, 5, "Standard"  # Default to allowing with standard limit
+
+
+@tracing.traced()
+def store_meme_tweet(r, tweet, journal=None):
+    """Verify a search result and store it as a meme. Returns whether it was stored.
+
+    `journal` is passed on to log_ai_violation().
+    """
+    import leaderboard
+    import metrics
+    from meme_index import MEME_INDEX_KEY, index_meme, wallet_version_key
+    from redis_client import execute_pipelines, wallet_pipelines
+
+    key = f"meme:{tweet['id']}"
+    # Archived memes no longer have a hash but stay in the time index
+    if r.exists(key) or r.zscore(MEME_INDEX_KEY, tweet["id"]) is not None:
+        metrics.TWEETS_REJECTED.labels("duplicate").inc()
+        return False
+
+    author_id = tweet["author_id"]
+    handle = fetch_author_handle(r, author_id)
+    if not handle:
+        metrics.TWEETS_REJECTED.labels("no_handle").inc()
+        return False
+
+    wallet = r.get(f"twitter:{handle.lower()}")
+    if not wallet:
+        log.info("tweet_rejected", stage="wallet", tweet_id=tweet["id"], handle=handle, reason="no_wallet")
+        metrics.TWEETS_REJECTED.labels("no_wallet").inc()
+        return False
+
+    wallet = wallet.decode()
+    tracing.set_attributes(handle=handle, wallet=wallet)
+
+    # Check AI violation status before processing
+    violation_status = check_ai_violation_status(r, wallet)
+    if violation_status["status"] in ["BANNED", "BLACKLISTED"]:
+        log.info("tweet_rejected", stage="violation_status", tweet_id=tweet["id"], handle=handle, wallet=wallet,
+                 reason=violation_status["status"].lower(), detail=violation_status.get("reason"))
+        metrics.TWEETS_REJECTED.labels(violation_status["status"].lower()).inc()
+        return False
+    elif violation_status["status"] == "REQUIRES_VERIFICATION":
+        log.info("tweet_rejected", stage="violation_status", tweet_id=tweet["id"], handle=handle, wallet=wallet,
+                 reason="requires_verification", detail=violation_status.get("reason"))
+        metrics.TWEETS_REJECTED.labels("requires_verification").inc()
+        return False
+
+    # Check daily meme limit
+    can_post, current_count, daily_limit, tier = check_daily_meme_limit(r, handle, wallet)
+    if not can_post:
+        log.info("tweet_rejected", stage="daily_limit", tweet_id=tweet["id"], handle=handle, wallet=wallet,
+                 reason="daily_limit", count=current_count, limit=daily_limit)
+        metrics.TWEETS_REJECTED.labels("daily_limit").inc()
+        return False
+    # AI Content Verification
+    ai_verification = asyncio.run(verification.verify_content_with_ai(r, tweet))
+
+    # Check AI verification threshold
+    if AI_VERIFICATION_ENABLED and ai_verification["confidence"] < AI_CONFIDENCE_THRESHOLD:
+        log.info("tweet_rejected", stage="ai_verification", tweet_id=tweet["id"], handle=handle, wallet=wallet,
+                 reason="ai_verification", confidence=ai_verification["confidence"],
+                 threshold=AI_CONFIDENCE_THRESHOLD)
+
+        # Log AI verification failure as violation
+        asyncio.run(log_ai_violation(r, handle, wallet, tweet['id'], ai_verification, journal))
+
+        metrics.TWEETS_REJECTED.labels("ai_verification").inc()
+        return False
+
+    public_metrics = tweet["public_metrics"]
+    xp = calculate_xp(public_metrics["like_count"], public_metrics["retweet_count"])
+    tier, waldo = calculate_rewards(public_metrics["like_count"], public_metrics["retweet_count"], DEFAULT_REWARD_TYPE)
+
+    key = f"meme:{tweet['id']}"
+    tweet_id = tweet["id"]
+
+    # One MULTI/EXEC for the meme, its indexes, XP, leaderboards and the daily count
+    # (on a cluster: one for the wallet's keys, plus a pipeline for the global ones)
+    pipe, wallet_pipe = wallet_pipelines(r)
+    pipe.hset(key, mapping={
+        "author_id": author_id,
+        "handle": handle,
+        "text": tweet["text"],
+        "likes": public_metrics["like_count"],
+        "retweets": public_metrics["retweet_count"],
+        "created_at": tweet["created_at"],
+        "wallet": wallet,
+        "tier": tier,
+        "waldo": waldo,
+        "xp": xp,
+        "claimed": 0,
+        "reward_type": DEFAULT_REWARD_TYPE,
+        "stake_selected": 0,
+        "stake_release": "",
+        # NFT and AI verification state live in the hash (see meme_store.py)
+        "nft_minted": "false",
+        "ai_verified": "true" if ai_verification["ai_verified"] else "false",
+        "ai_confidence": str(ai_verification["confidence"])
+    })
+
+    # 👇 Additional tweet-based indexes for frontend dashboard
+    index_meme(pipe, tweet_id, tweet["created_at"], wallet, wallet_pipe)
+    wallet_pipe.sadd(wallet_key("wallet:tweets", wallet), tweet_id)
+    wallet_pipe.incr(wallet_version_key(wallet))
+
+    # XP tracking (NFT eligibility removed - whitepaper doesn't specify XP requirement)
+    wallet_pipe.incrby(wallet_key("wallet:xp", wallet), xp)
+    # All memes are eligible for NFT minting (50 WALDO cost only)
+
+    # XP / WALDO / meme-count leaderboards (all-time + monthly)
+    leaderboard.record_meme(pipe, wallet, xp, waldo, tweet["created_at"])
+
+    # Increment daily meme count
+    today = datetime.now().strftime('%Y-%m-%d')
+    daily_key = meme_count_key(handle, wallet, today)
+    wallet_pipe.incr(daily_key)
+    wallet_pipe.expire(daily_key, 60*60*24)  # Expire at end of day
+
+    new_count = execute_pipelines(pipe, wallet_pipe)[-2]  # result of the INCR above
+    log.info("meme_stored", stage="store", tweet_id=tweet_id, handle=handle, wallet=wallet, tier=tier,
+             waldo=waldo, xp=xp, count=new_count, limit=daily_limit)
+    metrics.TWEETS_ACCEPTED.inc()
+
+    return True
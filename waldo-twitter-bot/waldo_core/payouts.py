@@ -0,0 +1,84 @@
+"""WALDO payouts from the distributor wallet. xrpl-py is imported on first use"""
+import time
+
+import tracing
+from waldo_core.config import DISTRIBUTOR_SECRET, WALDO_CURRENCY, WALDO_ISSUER, XRPL_NODE
+
+
+# Seconds between checks for the submitted payment in a validated ledger (about one ledger close)
+VALIDATION_POLL_SECONDS = 1.0
+
+
+@tracing.traced()
+async def send_waldo(wallet, amount, client=None, timings=None):
+    """Send WALDO from the distributor wallet.
+
+    Pass a dict as `timings` to get per-phase durations (seconds) back for
+    autofill, sign, submit and validation.
+    """
+    from xrpl.asyncio.transaction import XRPLReliableSubmissionException, autofill, sign, submit
+    from xrpl.clients import JsonRpcClient
+    from xrpl.models.transactions import Payment
+    from xrpl.wallet import Wallet
+
+    client = client or JsonRpcClient(XRPL_NODE)
+    dist_wallet = Wallet.from_seed(DISTRIBUTOR_SECRET)
+    tx = Payment(account=dist_wallet.classic_address, destination=wallet,
+                 amount={"currency": WALDO_CURRENCY, "value": str(amount), "issuer": WALDO_ISSUER})
+
+    tracing.set_attributes(wallet=wallet, amount=amount)
+    started = time.perf_counter()
+    with tracing.span("xrpl.autofill"):
+        filled = await autofill(tx, client)
+    autofilled = time.perf_counter()
+    with tracing.span("xrpl.sign"):
+        signed = sign(filled, dist_wallet)
+    signed_at = time.perf_counter()
+    with tracing.span("xrpl.submit"):
+        submitted = await submit(signed, client)
+    prelim = submitted.result["engine_result"]
+    if prelim.startswith("tem"):
+        raise XRPLReliableSubmissionException(f"{prelim}: {submitted.result.get('engine_result_message')}")
+    submitted_at = time.perf_counter()
+    with tracing.span("xrpl.validation"):
+        result = await wait_for_validation(client, signed.get_hash(), prelim, signed.last_ledger_sequence)
+
+    if timings is not None:
+        timings["autofill"] = autofilled - started
+        timings["sign"] = signed_at - autofilled
+        timings["submit"] = submitted_at - signed_at
+        timings["validation"] = time.perf_counter() - submitted_at
+    return result
+
+
+async def wait_for_validation(client, tx_hash, prelim_result, last_ledger_sequence):
+    """The `tx` response once the payment is in a validated ledger, as xrpl-py's submit_and_wait does.
+
+    Raises XRPLReliableSubmissionException if it failed or its
+    LastLedgerSequence passed without it being validated.
+    """
+    import asyncio
+
+    from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+    from xrpl.asyncio.transaction import XRPLReliableSubmissionException
+    from xrpl.clients import XRPLRequestFailureException
+    from xrpl.models.requests import Tx
+
+    while True:
+        await asyncio.sleep(VALIDATION_POLL_SECONDS)
+        # _request_impl is the coroutine behind both client flavours (the sync one's request() runs its own loop)
+        response = await client._request_impl(Tx(transaction=tx_hash))
+        if not response.is_successful():
+            if response.result.get("error") != "txnNotFound":  # still queued
+                raise XRPLRequestFailureException(response.result)
+        elif response.result.get("validated"):
+            code = response.result["meta"]["TransactionResult"]
+            if code != "tesSUCCESS":
+                raise XRPLReliableSubmissionException(f"Transaction failed: {code}")
+            return response
+        # It can still make it into the LastLedgerSequence ledger itself
+        validated_ledger = await get_latest_validated_ledger_sequence(client)
+        if validated_ledger > last_ledger_sequence:
+            raise XRPLReliableSubmissionException(
+                f"Validated ledger {validated_ledger} passed LastLedgerSequence {last_ledger_sequence}. "
+                f"Prelim result: {prelim_result}")
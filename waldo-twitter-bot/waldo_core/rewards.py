@@ -0,0 +1,43 @@
+"""Meme reward tiers and XP, shared by ingestion, upgrade_db.py and reward_sim.py"""
+from datetime import datetime, timedelta, timezone
+
+# First matching tier wins
+TIERS = [
+    {"tier": 5, "likes": 1000, "retweets": 100, "base": 50},
+    {"tier": 4, "likes": 500, "retweets": 50, "base": 25},
+    {"tier": 3, "likes": 100, "retweets": 10, "base": 5},
+    {"tier": 2, "likes": 50, "retweets": 5, "base": 2},
+    {"tier": 1, "likes": 25, "retweets": 0, "base": 1},
+]
+INSTANT_MULTIPLIER = 0.9
+STAKE_MULTIPLIER = 1.15 * 0.95
+XP_LIKES_PER_POINT = 25
+XP_RETWEETS_PER_POINT = 15
+XP_CAP = 10
+
+
+def get_month_end():
+    now = datetime.now(timezone.utc)
+    next_month = now.replace(day=28) + timedelta(days=4)
+    return next_month.replace(day=1) - timedelta(seconds=1)
+
+
+def calculate_xp(likes, retweets):
+    """Calculate XP based on engagement (1 XP per 25 likes, 1 XP per 15 retweets, max 10 XP per meme)"""
+    xp_from_likes = likes // XP_LIKES_PER_POINT
+    xp_from_retweets = retweets // XP_RETWEETS_PER_POINT
+    total_xp = xp_from_likes + xp_from_retweets
+
+    # Cap at 10 XP per meme as per whitepaper
+    return min(total_xp, XP_CAP)
+
+
+def calculate_rewards(likes, retweets, reward_type):
+    for t in TIERS:
+        if likes >= t["likes"] and retweets >= t["retweets"]:
+            base = t["base"]
+            if reward_type == "instant":
+                return t["tier"], round(base * INSTANT_MULTIPLIER, 2)
+            else:
+                return t["tier"], round(base * STAKE_MULTIPLIER, 2)
+    return 0, 0.0
@@ -0,0 +1,34 @@
+"""Twitter API v2 GETs, with metrics and tracing"""
+import tracing
+from waldo_core.config import HEADERS, TWITTER_API_URL
+
+
+def twitter_get(endpoint, url):
+    """GET a Twitter API URL, recording latency, status codes and 429s"""
+    import requests
+
+    import metrics
+
+    with metrics.TWITTER_DURATION.labels(endpoint).time(), tracing.span("twitter.get", endpoint=endpoint):
+        res = requests.get(url, headers=HEADERS)
+        tracing.set_attributes(status=res.status_code)
+    metrics.TWITTER_REQUESTS.labels(endpoint, res.status_code).inc()
+    if res.status_code == 429:
+        metrics.TWITTER_RATE_LIMITED.labels(endpoint).inc()
+    return res
+
+
+@tracing.traced()
+def fetch_author_handle(r, user_id):
+    cache_key = f"twitter_id:{user_id}"
+    cached = r.get(cache_key)
+    if cached:
+        return cached.decode()
+    url = f"{TWITTER_API_URL}/2/users/{user_id}"
+    res = twitter_get("users", url)
+    if res.status_code != 200:
+        return None
+    username = res.json().get("data", {}).get("username")
+    if username:
+        r.set(cache_key, username, ex=86400)
+    return username
@@ -0,0 +1,481 @@
+"""Free, heuristic content verification of meme tweets
+
+Each check returns a dict with a confidence and a verdict; verify_content_with_ai()
+runs them all and averages the confidence. Checks that read Redis take the
+client as their first argument.
+"""
+import json
+
+import logs
+import tracing
+from waldo_core.config import AI_VERIFICATION_ENABLED
+
+log = logs.get_logger("verification")
+
+
+@tracing.traced()
+async def verify_content_with_ai(r, tweet_data):
+    """FREE AI-powered content verification"""
+    if not AI_VERIFICATION_ENABLED:
+        return {"ai_verified": True, "confidence": 0, "reason": "AI_DISABLED"}
+    import metrics
+
+    try:
+        log.debug("ai_verification_started", stage="ai_verification", tweet_id=tweet_data["id"])
+
+        # FREE Content Verification
+        ai_result = await run_free_ai_verification(r, tweet_data)
+
+        # Store AI verification result
+        r.set(f"ai:free:{tweet_data['id']}", json.dumps(ai_result), ex=60*60*24*7)
+
+        log.info("ai_verified", stage="ai_verification", tweet_id=tweet_data["id"],
+                 ai_verified=ai_result["ai_verified"], confidence=ai_result["confidence"])
+        metrics.AI_CONFIDENCE.observe(ai_result["confidence"])
+        return ai_result
+
+    except Exception as e:
+        log.error("ai_verification_failed", stage="ai_verification", tweet_id=tweet_data.get("id"), error=str(e))
+        return {"ai_verified": True, "confidence": 0, "error": str(e)}
+
+
+async def run_free_ai_verification(r, tweet_data):
+    """Run FREE AI verification checks"""
+    import metrics
+
+    try:
+        results = {
+            "ai_verified": True,
+            "confidence": 0,
+            "method": "FREE_VERIFICATION",
+            "checks": {}
+        }
+
+        # 1. FREE Engagement Analysis
+        with metrics.VERIFICATION_CHECK_DURATION.labels("engagement").time(), \
+                tracing.span("verify.check", check="engagement"):
+            engagement_check = analyze_engagement_patterns_free(tweet_data)
+        results["checks"]["engagement"] = engagement_check
+
+        # 2. FREE Content Analysis
+        with metrics.VERIFICATION_CHECK_DURATION.labels("content").time(), \
+                tracing.span("verify.check", check="content"):
+            content_check = analyze_content_free(tweet_data.get("text", ""))
+        results["checks"]["content"] = content_check
+
+        # 3. FREE Originality Check (basic)
+        with metrics.VERIFICATION_CHECK_DURATION.labels("originality").time(), \
+                tracing.span("verify.check", check="originality"):
+            originality_check = await check_originality_free(r, tweet_data)
+        results["checks"]["originality"] = originality_check
+
+        # 4. FREE Profile Analysis (NEW!)
+        with metrics.VERIFICATION_CHECK_DURATION.labels("profile").time(), \
+                tracing.span("verify.check", check="profile"):
+            profile_check = analyze_twitter_profile_free(r, tweet_data)
+        results["checks"]["profile"] = profile_check
+
+        # Calculate overall confidence
+        confidence_scores = [
+            engagement_check.get("confidence", 0),
+            content_check.get("confidence", 0),
+            originality_check.get("confidence", 0),
+            profile_check.get("confidence", 0)
+        ]
+
+        valid_scores = [s for s in confidence_scores if s > 0]
+        results["confidence"] = sum(valid_scores) / len(valid_scores) if valid_scores else 0
+
+        # Determine verification status (now includes profile check)
+        results["ai_verified"] = (
+            engagement_check.get("is_legitimate", True) and
+            content_check.get("is_appropriate", True) and
+            originality_check.get("is_original", True) and
+            profile_check.get("is_legitimate", True)
+        )
+
+        return results
+
+    except Exception as e:
+        return {
+            "ai_verified": True,
+            "confidence": 0,
+            "error": str(e),
+            "method": "FREE_VERIFICATION"
+        }
+
+
+def analyze_engagement_patterns_free(tweet_data):
+    """FREE engagement pattern analysis"""
+    try:
+        metrics = tweet_data.get("public_metrics", {})
+        likes = metrics.get("like_count", 0)
+        retweets = metrics.get("retweet_count", 0)
+
+        suspicious_patterns = []
+        confidence = 100
+
+        # Check engagement ratio
+        ratio = likes / max(retweets, 1)
+        if ratio > 100 or ratio < 1:
+            suspicious_patterns.append("EXTREME_RATIO")
+            confidence -= 30
+
+        # Check for round numbers (bot indicator)
+        if likes > 0 and likes % 10 == 0 and retweets > 0 and retweets % 10 == 0:
+            suspicious_patterns.append("ROUND_NUMBERS")
+            confidence -= 20
+
+        # Check for unrealistic engagement
+        total_engagement = likes + retweets
+        if total_engagement > 10000:  # Very high engagement
+            suspicious_patterns.append("HIGH_ENGAGEMENT")
+            confidence -= 15
+
+        is_legitimate = confidence >= 60
+
+        return {
+            "is_legitimate": is_legitimate,
+            "confidence": max(confidence, 0),
+            "suspicious_patterns": suspicious_patterns,
+            "engagement_ratio": ratio
+        }
+
+    except Exception as e:
+        return {
+            "is_legitimate": True,
+            "confidence": 0,
+            "error": str(e)
+        }
+
+
+def analyze_content_free(text):
+    """FREE content analysis"""
+    try:
+        confidence = 100
+        issues = []
+
+        # Check spam indicators
+        spam_score = calculate_spam_score_free(text)
+        if spam_score > 70:
+            issues.append("HIGH_SPAM")
+            confidence -= 40
+
+        # Check WALDO relevance
+        waldo_score = check_waldo_relevance_free(text)
+        if waldo_score < 20:
+            issues.append("LOW_RELEVANCE")
+            confidence -= 20
+
+        # Check inappropriate content
+        if has_inappropriate_content_free(text):
+            issues.append("INAPPROPRIATE")
+            confidence -= 50
+
+        is_appropriate = confidence >= 50
+
+        return {
+            "is_appropriate": is_appropriate,
+            "confidence": max(confidence, 0),
+            "issues": issues,
+            "spam_score": spam_score,
+            "waldo_score": waldo_score
+        }
+
+    except Exception as e:
+        return {
+            "is_appropriate": True,
+            "confidence": 0,
+            "error": str(e)
+        }
+
+
+async def check_originality_free(r, tweet_data):
+    """FREE originality check using text hashing"""
+    try:
+        text = tweet_data.get("text", "")
+        tweet_id = tweet_data["id"]
+
+        # Generate text hash for duplicate detection
+        text_hash = hash(text.lower().strip())
+        hash_key = f"text_hash:{text_hash}"
+
+        # Check if we've seen this text before
+        existing_tweet = r.get(hash_key)
+        if existing_tweet and existing_tweet.decode() != tweet_id:
+            return {
+                "is_original": False,
+                "confidence": 95,
+                "reason": "DUPLICATE_TEXT",
+                "original_tweet": existing_tweet.decode()
+            }
+
+        # Store hash for future checks
+        r.set(hash_key, tweet_id, ex=60*60*24*30)  # 30 days
+
+        return {
+            "is_original": True,
+            "confidence": 85,
+            "reason": "APPEARS_ORIGINAL"
+        }
+
+    except Exception as e:
+        return {
+            "is_original": True,
+            "confidence": 0,
+            "error": str(e)
+        }
+
+
+def calculate_spam_score_free(text):
+    """Calculate spam score using FREE methods"""
+    score = 0
+
+    # Excessive caps
+    caps_ratio = sum(1 for c in text if c.isupper()) / max(len(text), 1)
+    if caps_ratio > 0.5:
+        score += 30
+
+    # Excessive punctuation
+    punct_count = sum(1 for c in text if c in "!?.,;:")
+    if punct_count > len(text) * 0.2:
+        score += 20
+
+    # Repeated characters
+    if any(text.count(char * 4) > 0 for char in "abcdefghijklmnopqrstuvwxyz"):
+        score += 25
+
+    # Too short
+    if len(text.strip()) < 10:
+        score += 15
+
+    return min(score, 100)
+
+
+def check_waldo_relevance_free(text):
+    """Check WALDO relevance using FREE methods"""
+    waldo_keywords = ["waldo", "waldocoin", "wlo", "$wlo", "#waldomeme", "meme"]
+    text_lower = text.lower()
+
+    matches = sum(1 for keyword in waldo_keywords if keyword in text_lower)
+    return (matches / len(waldo_keywords)) * 100
+
+
+def has_inappropriate_content_free(text):
+    """Check for inappropriate content using FREE methods"""
+    inappropriate_words = ["scam", "fraud", "steal", "hack", "illegal", "fake"]
+    text_lower = text.lower()
+
+    return any(word in text_lower for word in inappropriate_words)
+
+
+def analyze_twitter_profile_free(r, tweet_data):
+    """FREE Twitter profile analysis for fake account detection"""
+    try:
+        author_id = tweet_data.get("author_id")
+        if not author_id:
+            return {
+                "is_legitimate": True,
+                "confidence": 0,
+                "reason": "NO_AUTHOR_ID"
+            }
+
+        confidence = 100
+        suspicious_indicators = []
+
+        # Get cached profile data (if available)
+        profile_data = get_cached_profile_data(r, author_id)
+
+        if not profile_data:
+            # No profile data available, use basic checks
+            return {
+                "is_legitimate": True,
+                "confidence": 50,
+                "reason": "PROFILE_DATA_UNAVAILABLE"
+            }
+
+        # 1. Account Age Analysis
+        if "created_at" in profile_data:
+            account_age = analyze_account_age_free(profile_data["created_at"])
+            if account_age["is_suspicious"]:
+                suspicious_indicators.append("NEW_ACCOUNT")
+                confidence -= 25
+
+        # 2. Username Pattern Analysis
+        if "username" in profile_data:
+            username_analysis = analyze_username_pattern_free(profile_data["username"])
+            if username_analysis["is_suspicious"]:
+                suspicious_indicators.append("SUSPICIOUS_USERNAME")
+                confidence -= 15
+
+        # 3. Follower Ratio Analysis
+        if "public_metrics" in profile_data:
+            follower_analysis = analyze_follower_ratio_free(profile_data["public_metrics"])
+            if follower_analysis["is_suspicious"]:
+                suspicious_indicators.append("SUSPICIOUS_FOLLOWER_RATIO")
+                confidence -= 30
+
+        # 4. Profile Picture Analysis
+        if "profile_image_url" in profile_data:
+            pic_analysis = analyze_profile_picture_free(profile_data["profile_image_url"])
+            if pic_analysis["is_suspicious"]:
+                suspicious_indicators.append("SUSPICIOUS_PROFILE_PIC")
+                confidence -= 20
+
+        is_legitimate = confidence >= 60
+
+        return {
+            "is_legitimate": is_legitimate,
+            "confidence": max(confidence, 0),
+            "suspicious_indicators": suspicious_indicators,
+            "profile_checks": len(suspicious_indicators) == 0
+        }
+
+    except Exception as e:
+        return {
+            "is_legitimate": True,
+            "confidence": 0,
+            "error": str(e)
+        }
+
+
+def get_cached_profile_data(r, author_id):
+    """Get cached profile data from Redis"""
+    try:
+        cache_key = f"profile:{author_id}"
+        cached_data = r.get(cache_key)
+        if cached_data:
+            return json.loads(cached_data)
+        return None
+    except Exception as e:
+        log.warning("profile_cache_read_failed", stage="ai_verification", author_id=author_id, error=str(e))
+        return None
+
+
+def analyze_account_age_free(created_at):
+    """Analyze account age for suspicious patterns"""
+    try:
+        from datetime import datetime, timezone
+
+        # Parse Twitter date format
+        account_date = datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%S.%fZ")
+        account_date = account_date.replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc)
+
+        age_days = (now - account_date).days
+
+        # Accounts less than 30 days old are suspicious
+        is_suspicious = age_days < 30
+
+        return {
+            "is_suspicious": is_suspicious,
+            "age_days": age_days,
+            "reason": "ACCOUNT_TOO_NEW" if is_suspicious else "ACCOUNT_AGE_OK"
+        }
+
+    except Exception as e:
+        return {"is_suspicious": False, "error": str(e)}
+
+
+def analyze_username_pattern_free(username):
+    """Analyze username for bot-like patterns"""
+    try:
+        import re
+
+        suspicious_reasons = []
+
+        # 1. Letters followed by many numbers (bot pattern)
+        if re.match(r'^[a-zA-Z]+\d{4,}$', username):
+            suspicious_reasons.append("LETTERS_PLUS_NUMBERS")
+
+        # 2. Excessive numbers
+        number_count = len(re.findall(r'\d', username))
+        if number_count > len(username) * 0.5:
+            suspicious_reasons.append("EXCESSIVE_NUMBERS")
+
+        # 3. Bot keywords
+        bot_keywords = ['bot', 'auto', 'gen', 'fake', 'temp', 'test']
+        if any(keyword in username.lower() for keyword in bot_keywords):
+            suspicious_reasons.append("BOT_KEYWORDS")
+
+        # 4. Very long username
+        if len(username) > 15:
+            suspicious_reasons.append("VERY_LONG_USERNAME")
+
+        return {
+            "is_suspicious": len(suspicious_reasons) > 0,
+            "reasons": suspicious_reasons,
+            "username": username
+        }
+
+    except Exception as e:
+        return {"is_suspicious": False, "error": str(e)}
+
+
+def analyze_follower_ratio_free(public_metrics):
+    """Analyze follower/following ratios for suspicious patterns"""
+    try:
+        followers = public_metrics.get("followers_count", 0)
+        following = public_metrics.get("following_count", 0)
+
+        suspicious_reasons = []
+
+        # 1. Following way more than followers
+        if following > 100 and followers > 0:
+            ratio = following / followers
+            if ratio > 10:
+                suspicious_reasons.append("HIGH_FOLLOWING_RATIO")
+
+        # 2. Very low followers but high following
+        if followers < 10 and following > 500:
+            suspicious_reasons.append("LOW_FOLLOWERS_HIGH_FOLLOWING")
+
+        # 3. Identical counts (bot pattern)
+        if followers == following and followers > 0:
+            suspicious_reasons.append("IDENTICAL_COUNTS")
+
+        # 4. Round numbers (bot indicator)
+        if (followers > 0 and followers % 100 == 0 and
+            following > 0 and following % 100 == 0):
+            suspicious_reasons.append("ROUND_NUMBERS")
+
+        return {
+            "is_suspicious": len(suspicious_reasons) > 0,
+            "reasons": suspicious_reasons,
+            "followers": followers,
+            "following": following
+        }
+
+    except Exception as e:
+        return {"is_suspicious": False, "error": str(e)}
+
+
+def analyze_profile_picture_free(profile_image_url):
+    """Analyze profile picture for default/suspicious patterns"""
+    try:
+        suspicious_reasons = []
+
+        # Check for default Twitter profile pictures
+        default_patterns = [
+            'default_profile_images',
+            'default_profile',
+            'sticky/default_profile',
+            '_normal.jpg'
+        ]
+
+        if any(pattern in profile_image_url for pattern in default_patterns):
+            suspicious_reasons.append("DEFAULT_PROFILE_PIC")
+
+        # Check for suspicious URL patterns
+        suspicious_patterns = ['temp', 'generated', 'fake', 'bot', 'auto']
+        if any(pattern in profile_image_url.lower() for pattern in suspicious_patterns):
+            suspicious_reasons.append("SUSPICIOUS_PIC_URL")
+
+        return {
+            "is_suspicious": len(suspicious_reasons) > 0,
+            "reasons": suspicious_reasons,
+            "profile_image_url": profile_image_url
+        }
+
+    except Exception as e:
+        return {"is_suspicious": False, "error": str(e)}
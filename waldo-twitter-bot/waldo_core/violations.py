@@ -0,0 +1,274 @@
+"""AI verification violations and their escalating consequences"""
+import json
+
+import logs
+import tracing
+from redis_keys import wallet_key
+
+log = logs.get_logger("violations")
+
+
+@tracing.traced()
+async def log_ai_violation(r, handle, wallet, tweet_id, ai_verification, journal=None):
+    """Log AI verification failure and apply escalating consequences.
+
+    With a `journal`, a Redis outage journals the violation for replay;
+    without one the error propagates (as when replaying the journal).
+    """
+    from journal import REDIS_DOWN
+
+    try:
+        from datetime import datetime
+        # Determine violation type based on AI checks
+        violation_type = determine_violation_type(ai_verification)
+
+        # Get current violation count
+        violation_key = wallet_key("ai_violations", wallet)
+        current_violations = r.get(violation_key)
+        violation_count = int(current_violations) if current_violations else 0
+        violation_count += 1
+
+        # Store violation details
+        violation_data = {
+            "wallet": wallet,
+            "handle": handle,
+            "tweet_id": tweet_id,
+            "violation_type": violation_type,
+            "confidence": ai_verification.get("confidence", 0),
+            "checks": ai_verification.get("checks", {}),
+            "timestamp": datetime.now().isoformat(),
+            "violation_number": violation_count
+        }
+
+        # Store violation record
+        violation_record_key = wallet_key("ai_violation", wallet, tweet_id)
+        r.set(violation_record_key, json.dumps(violation_data), ex=60*60*24*30)  # 30 days
+
+        # Update violation count
+        r.set(violation_key, violation_count, ex=60*60*24*7)  # 7 days expiry
+
+        # Apply escalating consequences
+        consequences = await apply_ai_violation_consequences(r, wallet, handle, violation_count, violation_type)
+
+        log.warning("ai_violation", stage="violation", tweet_id=tweet_id, handle=handle, wallet=wallet,
+                    violation_type=violation_type, violation_count=violation_count, consequences=consequences)
+
+        # Store in security events for admin monitoring
+        security_event = {
+            "type": "AI_VERIFICATION_FAILURE",
+            "wallet": wallet,
+            "handle": handle,
+            "violation_type": violation_type,
+            "violation_count": violation_count,
+            "consequences": consequences,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        r.lpush("security:events", json.dumps(security_event))
+        r.ltrim("security:events", 0, 99)  # Keep last 100 events
+
+        return consequences
+
+    except REDIS_DOWN as e:
+        if journal is None:
+            raise
+        log.warning("ai_violation_journaled", stage="violation", tweet_id=tweet_id, handle=handle, wallet=wallet,
+                    error=str(e))
+        journal.append("ai_violation", wallet_key("ai_violation", wallet, tweet_id), {
+            "handle": handle, "wallet": wallet, "tweet_id": tweet_id, "ai_verification": ai_verification
+        })
+        return "JOURNALED"
+    except Exception as e:
+        log.error("ai_violation_log_failed", stage="violation", tweet_id=tweet_id, wallet=wallet, error=str(e))
+        return "ERROR_LOGGING_VIOLATION"
+
+
+def determine_violation_type(ai_verification):
+    """Determine the primary violation type from AI verification results"""
+    checks = ai_verification.get("checks", {})
+
+    # Priority order: Profile > Content > Engagement > Originality
+    if not checks.get("profile", {}).get("is_legitimate", True):
+        profile_indicators = checks.get("profile", {}).get("suspicious_indicators", [])
+        if "NEW_ACCOUNT" in profile_indicators:
+            return "FAKE_PROFILE_NEW_ACCOUNT"
+        elif "SUSPICIOUS_USERNAME" in profile_indicators:
+            return "FAKE_PROFILE_BOT_USERNAME"
+        elif "SUSPICIOUS_FOLLOWER_RATIO" in profile_indicators:
+            return "FAKE_PROFILE_FOLLOWER_MANIPULATION"
+        else:
+            return "FAKE_PROFILE_GENERAL"
+
+    elif not checks.get("content", {}).get("is_appropriate", True):
+        content_issues = checks.get("content", {}).get("issues", [])
+        if "INAPPROPRIATE" in content_issues:
+            return "INAPPROPRIATE_CONTENT"
+        elif "HIGH_SPAM" in content_issues:
+            return "SPAM_CONTENT"
+        else:
+            return "CONTENT_VIOLATION"
+
+    elif not checks.get("engagement", {}).get("is_legitimate", True):
+        engagement_patterns = checks.get("engagement", {}).get("suspicious_patterns", [])
+        if "ENGAGEMENT_SPIKE" in engagement_patterns:
+            return "ENGAGEMENT_MANIPULATION"
+        else:
+            return "SUSPICIOUS_ENGAGEMENT"
+
+    elif not checks.get("originality", {}).get("is_original", True):
+        return "DUPLICATE_CONTENT"
+
+    else:
+        return "LOW_CONFIDENCE_SCORE"
+
+
+async def apply_ai_violation_consequences(r, wallet, handle, violation_count, violation_type):
+    """Apply escalating consequences based on violation count and type"""
+    try:
+        from datetime import datetime
+        consequences = []
+
+        # Violation 1: Warning + Temporary Rate Limit
+        if violation_count == 1:
+            consequences.append("WARNING_ISSUED")
+            consequences.append("RATE_LIMITED_1_HOUR")
+
+            # Set 1-hour rate limit
+            rate_limit_key = wallet_key("rate_limit", wallet, "ai_violation")
+            r.set(rate_limit_key, "1", ex=60*60)  # 1 hour
+
+        # Violation 2: Stricter Rate Limit + Daily Limit Reduction
+        elif violation_count == 2:
+            consequences.append("FINAL_WARNING")
+            consequences.append("RATE_LIMITED_6_HOURS")
+            consequences.append("DAILY_LIMIT_REDUCED")
+
+            # Set 6-hour rate limit
+            rate_limit_key = wallet_key("rate_limit", wallet, "ai_violation")
+            r.set(rate_limit_key, "2", ex=60*60*6)  # 6 hours
+
+            # Reduce daily meme limit by 50%
+            daily_limit_key = wallet_key("daily_limit_reduction", wallet)
+            r.set(daily_limit_key, "50", ex=60*60*24*7)  # 7 days
+
+        # Violation 3: Temporary Ban
+        elif violation_count == 3:
+            consequences.append("TEMPORARY_BAN_24_HOURS")
+
+            # Set 24-hour ban
+            ban_key = wallet_key("banned", wallet)
+            r.set(ban_key, json.dumps({
+                "reason": f"AI_VIOLATIONS_{violation_type}",
+                "violation_count": violation_count,
+                "banned_at": datetime.now().isoformat(),
+                "ban_duration": "24_HOURS"
+            }), ex=60*60*24)  # 24 hours
+
+        # Violation 4: Extended Ban
+        elif violation_count == 4:
+            consequences.append("EXTENDED_BAN_7_DAYS")
+
+            # Set 7-day ban
+            ban_key = wallet_key("banned", wallet)
+            r.set(ban_key, json.dumps({
+                "reason": f"REPEATED_AI_VIOLATIONS_{violation_type}",
+                "violation_count": violation_count,
+                "banned_at": datetime.now().isoformat(),
+                "ban_duration": "7_DAYS"
+            }), ex=60*60*24*7)  # 7 days
+
+        # Violation 5+: Permanent Ban
+        elif violation_count >= 5:
+            consequences.append("PERMANENT_BAN")
+
+            # Set permanent ban (1 year expiry for safety)
+            ban_key = wallet_key("banned", wallet)
+            r.set(ban_key, json.dumps({
+                "reason": f"PERSISTENT_AI_VIOLATIONS_{violation_type}",
+                "violation_count": violation_count,
+                "banned_at": datetime.now().isoformat(),
+                "ban_duration": "PERMANENT"
+            }), ex=60*60*24*365)  # 1 year
+
+            # Add to permanent blacklist
+            blacklist_key = wallet_key("blacklist", wallet)
+            r.set(blacklist_key, json.dumps({
+                "reason": f"PERSISTENT_AI_VIOLATIONS_{violation_type}",
+                "blacklisted_at": datetime.now().isoformat(),
+                "handle": handle
+            }))
+
+        # Special handling for severe violations (fake profiles)
+        if violation_type.startswith("FAKE_PROFILE"):
+            if violation_count == 1:
+                consequences.append("PROFILE_FLAGGED_FOR_REVIEW")
+            elif violation_count >= 2:
+                consequences.append("PROFILE_VERIFICATION_REQUIRED")
+
+                # Require manual verification
+                verification_key = wallet_key("requires_verification", wallet)
+                r.set(verification_key, json.dumps({
+                    "reason": "FAKE_PROFILE_DETECTED",
+                    "violation_count": violation_count,
+                    "flagged_at": datetime.now().isoformat()
+                }))
+
+        return consequences
+
+    except Exception as e:
+        log.error("ai_violation_consequences_failed", stage="violation", wallet=wallet, error=str(e))
+        return ["ERROR_APPLYING_CONSEQUENCES"]
+
+
+@tracing.traced()
+def check_ai_violation_status(r, wallet):
+    """Check if wallet has AI violation restrictions"""
+    try:
+        # One MGET: all four keys share the wallet's hash slot under the tagged layout
+        ban_data, blacklist_data, rate_limited, verification_data = r.mget(
+            wallet_key("banned", wallet),
+            wallet_key("blacklist", wallet),
+            wallet_key("rate_limit", wallet, "ai_violation"),
+            wallet_key("requires_verification", wallet)
+        )
+
+        # Check if banned
+        if ban_data:
+            ban_info = json.loads(ban_data)
+            return {
+                "status": "BANNED",
+                "reason": ban_info.get("reason"),
+                "duration": ban_info.get("ban_duration"),
+                "banned_at": ban_info.get("banned_at")
+            }
+
+        # Check if blacklisted
+        if blacklist_data:
+            blacklist_info = json.loads(blacklist_data)
+            return {
+                "status": "BLACKLISTED",
+                "reason": blacklist_info.get("reason"),
+                "blacklisted_at": blacklist_info.get("blacklisted_at")
+            }
+
+        # Check if rate limited
+        if rate_limited:
+            return {
+                "status": "RATE_LIMITED",
+                "level": rate_limited.decode() if isinstance(rate_limited, bytes) else rate_limited
+            }
+
+        # Check if requires verification
+        if verification_data:
+            verification_info = json.loads(verification_data)
+            return {
+                "status": "REQUIRES_VERIFICATION",
+                "reason": verification_info.get("reason"),
+                "flagged_at": verification_info.get("flagged_at")
+            }
+
+        return {"status": "CLEAR"}
+
+    except Exception as e:
+        log.error("violation_status_check_failed", stage="violation_status", wallet=wallet, error=str(e))
+        return {"status": "ERROR"}
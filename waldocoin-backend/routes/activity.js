@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { walletKey } from '../utils/redisKeys.js';
 
 const router = express.Router();
 
@@ -32,7 +33,7 @@ router.get('/', async (req, res) => {
 
     // If no activities found, create some sample activities based on user data
     if (parsedActivities.length === 0) {
-      const userData = await redis.hGetAll(`user:${wallet}`);
+      const userData = await redis.hGetAll(walletKey('user', wallet));
       const sampleActivities = [];
 
       // Add Twitter linking activity if linked
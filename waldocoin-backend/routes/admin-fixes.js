@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { walletKey } from '../utils/redisKeys.js';
 
 const router = express.Router();
 
@@ -35,7 +36,7 @@ router.get('/users/list', validateAdmin, async (req, res) => {
     const users = [];
     for (let i = 0; i < Math.min(claimedWallets.length, limit); i++) {
       const wallet = claimedWallets[i];
-      const userData = await redis.hGetAll(`user:${wallet}`);
+      const userData = await redis.hGetAll(walletKey('user', wallet));
       
       users.push({
         walletAddress: wallet,
@@ -156,7 +156,8 @@ router.post("/test-user", requireAdmin, async (req, res) => {
     
     // Get all user's tweets
     const { redis } = await import("../../redisClient.js");
-    const userTweets = await redis.sMembers(`wallet:tweets:${userWallet}`);
+    const { walletKey } = await import("../../utils/redisKeys.js");
+    const userTweets = await redis.sMembers(walletKey("wallet:tweets", userWallet));
     
     if (userTweets.length === 0) {
       return res.json({
@@ -1,5 +1,6 @@
 import express from "express";
 import { redis } from "../../redisClient.js";
+import { walletKey } from "../../utils/redisKeys.js";
 
 const router = express.Router();
 
@@ -64,7 +65,7 @@ router.get("/", async (req, res) => {
     leaderboard = await Promise.all(
       leaderboard.map(async (entry) => {
         // Try to get user profile from Redis
-        const user = await redis.hgetall(`user:${entry.wallet}`);
+        const user = await redis.hgetall(walletKey("user", entry.wallet));
         return {
           wallet: entry.wallet,
           wins: entry.wins,
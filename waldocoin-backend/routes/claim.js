@@ -5,6 +5,7 @@ import { fileURLToPath } from "url";
 import { v4 as uuidv4 } from "uuid";
 import dayjs from "dayjs";
 import { redis } from "../redisClient.js";
+import { walletKey } from "../utils/redisKeys.js";
 import { xummClient } from "../utils/xummClient.js";
 import { rateLimitMiddleware } from "../utils/rateLimiter.js";
 import { createErrorResponse, logError } from "../utils/errorHandler.js";
@@ -297,7 +298,7 @@ router.post('/', rateLimitMiddleware('PAYMENT_CREATE', (req) => req.body.wallet)
     }
 
     // Check minimum WALDO balance requirement (dynamic from admin settings)
-    const userData = await redis.hGetAll(`user:${wallet}`);
+    const userData = await redis.hGetAll(walletKey("user", wallet));
     const waldoBalance = parseInt(userData.waldoBalance) || 0;
 
     // Get current minimum requirement from admin settings
@@ -356,7 +357,7 @@ router.post('/', rateLimitMiddleware('PAYMENT_CREATE', (req) => req.body.wallet)
     }), { EX: 60 * 60 * 24 * 30 }); // 30 day expiry
 
     // Update user stats
-    const userKey = `user:${wallet}`;
+    const userKey = walletKey("user", wallet);
     await redis.hIncrBy(userKey, 'totalClaimed', finalReward);
     await redis.hIncrBy(userKey, 'totalClaims', 1);
 
@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { walletKey } from '../utils/redisKeys.js';
 
 const router = express.Router();
 
@@ -480,8 +481,8 @@ router.post('/vote', async (req, res) => {
     await redis.hIncrBy(`dao:proposal:${proposalId}`, 'totalVotingPower', votingPower);
 
     // Update user stats
-    await redis.hIncrBy(`user:${wallet}`, 'daoVotes', votingPower);
-    await redis.hIncrBy(`user:${wallet}`, 'daoVotingPower', votingPower);
+    await redis.hIncrBy(walletKey('user', wallet), 'daoVotes', votingPower);
+    await redis.hIncrBy(walletKey('user', wallet), 'daoVotingPower', votingPower);
 
     console.log(`🗳️ DAO vote recorded: ${wallet} voted ${vote ? 'YES' : 'NO'} on ${proposalId} with ${votingPower} voting power (${waldoBalance.toLocaleString()} WALDO)`);
 
@@ -2,6 +2,7 @@ import express from "express";
 import path from "path";
 import { fileURLToPath } from "url";
 import { redis } from "../redisClient.js";
+import { walletKey } from "../utils/redisKeys.js";
 import { scan_user } from "../utils/scan_user.js"; // adjust path if needed
 
 const __filename = fileURLToPath(import.meta.url);
@@ -22,7 +23,7 @@ router.post("/", async (req, res) => {
   // Clean handle (remove @ if present)
   const cleanHandle = twitterHandle.replace(/^@/, '').toLowerCase();
 
-  const key = `user:${wallet}`;
+  const key = walletKey("user", wallet);
 
   try {
     const existing = await redis.hGet(key, "twitterHandle");
@@ -131,7 +132,7 @@ router.delete("/clear", async (req, res) => {
 
   try {
     // Get current handle to delete all related keys
-    const currentHandle = await redis.hGet(`user:${wallet}`, 'twitterHandle');
+    const currentHandle = await redis.hGet(walletKey("user", wallet), 'twitterHandle');
 
     const deleted = {
       twitterHandle: currentHandle || null,
@@ -148,7 +149,7 @@ router.delete("/clear", async (req, res) => {
       deleted.keysDeleted.push(`wallet:handle:${wallet}`);
 
       // Delete twitterHandle field from user hash
-      await redis.hDel(`user:${wallet}`, 'twitterHandle');
+      await redis.hDel(walletKey("user", wallet), 'twitterHandle');
       deleted.keysDeleted.push(`user:${wallet}:twitterHandle (field)`);
     }
 
@@ -176,7 +177,7 @@ router.get("/status", async (req, res) => {
   }
 
   try {
-    const twitterHandle = await redis.hGet(`user:${wallet}`, 'twitterHandle');
+    const twitterHandle = await redis.hGet(walletKey("user", wallet), 'twitterHandle');
     const twitterKey = twitterHandle ? await redis.get(`twitter:${twitterHandle}`) : null;
     const walletHandleKey = await redis.get(`wallet:handle:${wallet}`);
 
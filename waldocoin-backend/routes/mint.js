@@ -55,12 +55,14 @@ router.post("/", mintFraudPrevention, async (req, res) => {
 
     const alreadyMinted = await redis.get(`meme:nft_minted:${tweetId}`);
 
-    if (alreadyMinted) {
+    if (alreadyMinted && alreadyMinted !== "false") {
       return res.status(409).json({ success: false, error: "NFT already minted for this meme." });
     }
 
     // Enforce minimum XP for NFT minting (project policy)
-    const memeXP = parseInt(await redis.get(`meme:xp:${tweetId}`)) || 0;
+    const memeXP = parseInt(
+      (await redis.hGet(`meme:${tweetId}`, "xp")) ?? (await redis.get(`meme:xp:${tweetId}`))
+    ) || 0;
     if (memeXP < 60) {
       return res.status(403).json({ success: false, error: "Meme needs at least 60 XP to mint." });
     }
@@ -3,6 +3,7 @@ import dotenv from "dotenv";
 
 import xrpl from "xrpl";
 import { redis } from "../../redisClient.js";
+import { walletKey } from "../../utils/redisKeys.js";
 import { uploadToIPFS } from "../../utils/ipfsUploader.js";
 import { getXrplClient } from "../../utils/xrplClient.js"; // Optional: If you’re centralizing XRPL connections
 import { xummClient } from "../../utils/xummClient.js";
@@ -116,6 +117,10 @@ router.post("/", async (req, res) => {
       mintedAt: Date.now()
     };
     await redis.set(`meme:nft_minted:${tweetId}`, JSON.stringify(nftData));
+    if (await redis.exists(`meme:${tweetId}`)) {
+      await redis.hSet(`meme:${tweetId}`, "nft_minted", "true");
+      await redis.incr(walletKey("wallet:version", wallet));
+    }
     await redis.del(`meme:mint_pending:${tweetId}`);
 
     // Store deposit/base value for the NFT (for marketplace reference)
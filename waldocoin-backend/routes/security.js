@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { walletKey } from '../utils/redisKeys.js';
 
 const router = express.Router();
 
@@ -99,7 +100,7 @@ router.get('/check/:wallet', async (req, res) => {
     const suspiciousReason = isSuspicious ? await redis.get(`security:suspicious:${wallet}`) : null;
 
     // Get user activity data
-    const userData = await redis.hGetAll(`user:${wallet}`);
+    const userData = await redis.hGetAll(walletKey('user', wallet));
     const userBattles = await redis.hGetAll(`user:${wallet}:battles`);
     const userStaking = await redis.hGetAll(`user:${wallet}:staking`);
 
@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { walletKey } from '../utils/redisKeys.js';
 import getWaldoBalance from '../utils/getWaldoBalance.js';
 import { xummClient } from '../utils/xummClient.js';
 import xrpl from 'xrpl';
@@ -1592,8 +1593,8 @@ router.post('/stake', rateLimitMiddleware('PAYMENT_CREATE', (req) => req.body.wa
     await redis.sAdd('staking:active', stakeId);
 
     // Update user stats
-    await redis.hIncrBy(`user:${wallet}`, 'totalStaked', amount);
-    await redis.hIncrBy(`user:${wallet}`, 'activeStakes', 1);
+    await redis.hIncrBy(walletKey('user', wallet), 'totalStaked', amount);
+    await redis.hIncrBy(walletKey('user', wallet), 'activeStakes', 1);
 
     // Update global stats
     await redis.incrBy('staking:total_staked', amount);
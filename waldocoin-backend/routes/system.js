@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { memeCountKey, memeCountPattern, tagged, walletKey } from '../utils/redisKeys.js';
 
 const router = express.Router();
 
@@ -426,9 +427,10 @@ router.get('/user-meme-usage/:wallet', async (req, res) => {
 
     const { wallet } = req.params;
 
-    // Get user's WALDO balance to determine tier
-    const userData = await redis.hGetAll(`user:${wallet}`);
-    const waldoBalance = parseInt(userData.waldoBalance) || 0;
+    // Get user's WALDO balance to determine tier (from the bot's holder
+    // snapshot, waldo-twitter-bot/waldo_core/holders.py, like the bot itself)
+    const userData = await redis.hGetAll(walletKey('user', wallet));
+    const waldoBalance = parseInt(await redis.hGet(walletKey('holder', wallet), 'waldoBalance')) || 0;
 
     // Determine daily limit based on WALDO holdings
     let dailyLimit, tier;
@@ -446,7 +448,7 @@ router.get('/user-meme-usage/:wallet', async (req, res) => {
     // Get today's usage
     const today = new Date().toISOString().split('T')[0];
     const twitterHandle = userData.twitterHandle || 'unknown';
-    const dailyKey = `meme_count:${twitterHandle}:${today}`;
+    const dailyKey = memeCountKey(twitterHandle, wallet, today);
     const todayCount = parseInt(await redis.get(dailyKey)) || 0;
 
     // Calculate reset times
@@ -497,7 +499,7 @@ router.get('/meme-usage-stats', async (req, res) => {
     const today = new Date().toISOString().split('T')[0];
 
     // Get all daily meme count keys for today
-    const dailyKeys = await redis.keys(`meme_count:*:${today}`);
+    const dailyKeys = await redis.keys(memeCountPattern(today));
 
     let totalUsers = 0;
     let totalMemes = 0;
@@ -515,12 +517,12 @@ router.get('/meme-usage-stats', async (req, res) => {
         totalMemes += count;
 
         // Extract handle from key to check their limit
-        const handle = key.split(':')[1];
+        // meme_count:<handle>:<day>, or meme_count:{<wallet>}:<handle>:<day> when tagged
+        const handle = key.split(':')[tagged() ? 2 : 1];
         const wallet = await redis.get(`twitter:${handle.toLowerCase()}`);
 
         if (wallet) {
-          const userData = await redis.hGetAll(`user:${wallet}`);
-          const waldoBalance = parseInt(userData.waldoBalance) || 0;
+          const waldoBalance = parseInt(await redis.hGet(walletKey('holder', wallet), 'waldoBalance')) || 0;
 
           let userLimit = dailyLimit;
           if (waldoBalance >= 50000) userLimit = vipLimit;
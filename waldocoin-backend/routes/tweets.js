@@ -6,6 +6,8 @@ import { fileURLToPath } from "url";
 import dotenv from "dotenv";
 import { TwitterApi } from "twitter-api-v2";
 import { redis } from "../redisClient.js";
+import { walletKey } from "../utils/redisKeys.js";
+import { getMemes } from "../utils/memeArchive.js";
 
 dotenv.config();
 
@@ -40,7 +42,8 @@ router.get("/", async (req, res) => {
   }
 
   try {
-    const tweetIds = await redis.sMembers(`wallet:tweets:${wallet}`);
+    const tweetIds = await redis.sMembers(walletKey("wallet:tweets", wallet));
+    const memes = await getMemes(tweetIds);
     const tweets = [];
 
     for (const id of tweetIds) {
@@ -53,9 +56,12 @@ router.get("/", async (req, res) => {
       const mediaUrl = tweet?.includes?.media?.[0]?.url;
       const likes = tweet?.data?.public_metrics?.like_count || 0;
       const retweets = tweet?.data?.public_metrics?.retweet_count || 0;
-      const xp = parseInt(await redis.get(`meme:xp:${id}`)) || 0;
-      const waldo = parseFloat(await redis.get(`meme:waldo:${id}`)) || 0;
-      const isMinted = !!(await redis.get(`meme:nft_minted:${id}`));
+      // xp/waldo live in the meme hash (or its archive segment); meme:xp:/meme:waldo: are legacy keys from older ingests
+      const meme = memes[id] || {};
+      const xp = parseInt(meme.xp ?? await redis.get(`meme:xp:${id}`)) || 0;
+      const waldo = parseFloat(meme.waldo ?? await redis.get(`meme:waldo:${id}`)) || 0;
+      const mintRecord = await redis.get(`meme:nft_minted:${id}`);
+      const isMinted = meme.nft_minted === "true" || !!(mintRecord && mintRecord !== "false");
 
       tweets.push({
         wallet,
@@ -1,5 +1,7 @@
 import express from "express";
 import { redis } from "../redisClient.js";
+import { walletKey } from "../utils/redisKeys.js";
+import { getMemes } from "../utils/memeArchive.js";
 
 const router = express.Router();
 
@@ -12,16 +14,18 @@ router.get("/", async (req, res) => {
       return res.status(400).json({ success: false, error: "Invalid or missing wallet" });
     }
 
-    const tweetIds = await redis.sMembers(`wallet:tweets:${wallet}`);
+    const tweetIds = await redis.sMembers(walletKey("wallet:tweets", wallet));
     if (!Array.isArray(tweetIds) || tweetIds.length === 0) {
       return res.json({ success: true, memes: [] });
     }
 
+    // Archived memes are read back from their segments
+    const found = await getMemes(tweetIds);
     const memes = [];
     for (const id of tweetIds) {
       try {
-        const data = await redis.hGetAll(`meme:${id}`);
-        const mintedVal = await redis.get(`meme:nft_minted:${id}`);
+        const data = found[id] || {};
+        const mintedVal = data.nft_minted === "true" || await redis.get(`meme:nft_minted:${id}`);
         const meme = {
           tweet_id: id,
           likes: parseInt(data.likes) || 0,
@@ -1,5 +1,6 @@
 import express from 'express';
 import { redis } from '../redisClient.js';
+import { walletKey, walletFromKey } from '../utils/redisKeys.js';
 
 const router = express.Router();
 
@@ -28,7 +29,7 @@ router.get('/list', async (req, res) => {
         const userData = await redis.hGetAll(key);
         
         if (userData && Object.keys(userData).length > 0) {
-          const walletAddress = key.split(':')[1];
+          const walletAddress = walletFromKey(key, 'user');
           
           // Apply search filter if provided
           if (!search || 
@@ -249,7 +250,7 @@ router.get('/:wallet', async (req, res) => {
     }
 
     // Get user data
-    const userData = await redis.hGetAll(`user:${wallet}`);
+    const userData = await redis.hGetAll(walletKey('user', wallet));
     
     if (!userData || Object.keys(userData).length === 0) {
       return res.status(404).json({
@@ -4,6 +4,8 @@ import express from "express";
 import path from "path";
 import { fileURLToPath } from "url";
 import { redis } from "../redisClient.js";
+import { walletKey, walletFromKey } from "../utils/redisKeys.js";
+import { getMemes } from "../utils/memeArchive.js";
 
 // Shared level thresholds and titles (must match frontend) - 7 levels
 const LEVEL_THRESHOLDS = [0, 1000, 3000, 7000, 15000, 30000, 50000];
@@ -21,7 +23,7 @@ const LEVEL_TITLES = {
 async function getEffectiveXP(wallet) {
   const keyCandidates = [
     `user:${wallet}:xp`,
-    `wallet:xp:${wallet}`,
+    walletKey("wallet:xp", wallet),
     `xp:${wallet}`
   ];
 
@@ -130,10 +132,11 @@ router.get("/", async (req, res) => {
     // Count minted NFTs for this wallet
     let mintedCount = 0;
     try {
-      const tweetIds = await redis.sMembers(`wallet:tweets:${wallet}`);
+      const tweetIds = await redis.sMembers(walletKey("wallet:tweets", wallet));
       if (Array.isArray(tweetIds) && tweetIds.length) {
+        const memes = await getMemes(tweetIds);
         for (const id of tweetIds) {
-          const minted = await redis.get(`meme:nft_minted:${id}`);
+          const minted = memes[id]?.nft_minted === "true" || await redis.get(`meme:nft_minted:${id}`);
           if (minted && minted !== "false") mintedCount++;
         }
       }
@@ -211,7 +214,7 @@ router.get("/", async (req, res) => {
     // Get linked Twitter handle (locked once set)
     let twitterHandle = null;
     try {
-      const rawHandle = await redis.hGet(`user:${wallet}`, 'twitterHandle');
+      const rawHandle = await redis.hGet(walletKey("user", wallet), 'twitterHandle');
       // Only set if it's a non-empty string
       if (rawHandle && typeof rawHandle === 'string' && rawHandle.trim().length > 0) {
         twitterHandle = rawHandle.trim();
@@ -271,11 +274,9 @@ router.get("/leaderboard", async (req, res) => {
     try {
       const legacyWalletKeys = await redis.keys("wallet:xp:*");
       for (const key of legacyWalletKeys || []) {
-        const parts = key.split(":");
-        if (parts.length >= 3) {
-          const w = parts[2];
-          if (w && w.startsWith("r") && w.length >= 25) walletSet.add(w);
-        }
+        // wallet:xp:<wallet> or, with REDIS_KEY_LAYOUT=tagged, wallet:xp:{<wallet>}
+        const w = walletFromKey(key, "wallet:xp");
+        if (w && w.startsWith("r") && w.length >= 25) walletSet.add(w);
       }
     } catch {
       // non-fatal
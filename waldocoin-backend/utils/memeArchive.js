@@ -0,0 +1,90 @@
+// utils/memeArchive.js - Meme hashes, falling back to the cold archive
+// written by waldo-twitter-bot/archive_memes.py (format in its archive.py).
+//
+// An archived meme keeps its id in memes:by_time, wallet:tweets and
+// wallet:memes, but its meme:{id} hash is gone. Its fields live in a
+// zstd-compressed msgpack segment ({tweet_id: {field: value}}):
+//
+//   archive:segments:{YYYY-MM}     list of segment keys for the month
+//   archive:segment:{YYYY-MM}:{n}  compressed segment
+//
+// where the month is the UTC month of the meme's memes:by_time score.
+// Only segments kept in Redis are reachable from here; a bot archiving to
+// ARCHIVE_DIR keeps them on its own disk.
+
+import { decompress } from "fzstd";
+import { decode } from "@msgpack/msgpack";
+import { RESP_TYPES } from "redis";
+import { redis } from "../redisClient.js";
+
+const MEME_INDEX_KEY = "memes:by_time";
+const SEGMENT_CACHE_SIZE = parseInt(process.env.ARCHIVE_SEGMENT_CACHE || "32", 10);
+
+// Segments never change once written. Map keeps insertion order, oldest first
+const segmentCache = new Map();
+
+function monthOfScore(score) {
+  return new Date(score * 1000).toISOString().slice(0, 7);
+}
+
+async function loadSegments(names) {
+  const missing = names.filter(name => !segmentCache.has(name));
+  if (missing.length) {
+    const raw = redis.withTypeMapping({ [RESP_TYPES.BLOB_STRING]: Buffer });
+    const blobs = await Promise.all(missing.map(name => raw.get(name)));
+    missing.forEach((name, i) => {
+      segmentCache.set(name, blobs[i] ? decode(decompress(blobs[i])) : {});
+    });
+  }
+
+  const loaded = {};
+  for (const name of names) {
+    loaded[name] = segmentCache.get(name);
+    segmentCache.delete(name);
+    segmentCache.set(name, loaded[name]);
+  }
+  while (segmentCache.size > SEGMENT_CACHE_SIZE) {
+    segmentCache.delete(segmentCache.keys().next().value);
+  }
+  return loaded;
+}
+
+async function getArchived(ids) {
+  const scores = await Promise.all(ids.map(id => redis.zScore(MEME_INDEX_KEY, id)));
+  const byMonth = {};
+  ids.forEach((id, i) => {
+    if (scores[i] !== null) (byMonth[monthOfScore(scores[i])] ||= []).push(id);
+  });
+
+  const months = Object.keys(byMonth);
+  const lists = await Promise.all(months.map(month => redis.lRange(`archive:segments:{${month}}`, 0, -1)));
+  const loaded = await loadSegments(lists.flat());
+
+  const found = {};
+  months.forEach((month, i) => {
+    // Newest segment first, in case a meme was archived twice after an interrupted run
+    for (const name of [...lists[i]].reverse()) {
+      for (const id of byMonth[month]) {
+        if (!(id in found) && loaded[name][id]) found[id] = loaded[name][id];
+      }
+    }
+  });
+  return found;
+}
+
+// Fields of each meme by tweet id, hot or archived. Ids found in neither are left out
+export async function getMemes(ids) {
+  const hashes = await Promise.all(ids.map(id => redis.hGetAll(`meme:${id}`)));
+  const found = {};
+  const cold = [];
+  ids.forEach((id, i) => {
+    if (hashes[i] && Object.keys(hashes[i]).length) found[id] = hashes[i];
+    else cold.push(id);
+  });
+  if (cold.length) Object.assign(found, await getArchived(cold));
+  return found;
+}
+
+export async function getMeme(id) {
+  return (await getMemes([id]))[id] || null;
+}
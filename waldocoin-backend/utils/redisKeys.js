@@ -0,0 +1,41 @@
+// utils/redisKeys.js - Per-wallet key names shared with the Python bot
+// (waldo-twitter-bot/redis_keys.py). Keep the two in step.
+//
+// With REDIS_KEY_LAYOUT=tagged the wallet address is wrapped in braces so
+// Redis Cluster puts all of a wallet's keys in one slot:
+//
+//   legacy                      tagged
+//   user:rAbc...                user:{rAbc...}
+//   wallet:xp:rAbc...           wallet:xp:{rAbc...}
+//   meme_count:handle:day       meme_count:{rAbc...}:handle:day
+//
+// Switch both services together, after running
+// `python upgrade_db.py --migration tag_wallet_keys` in waldo-twitter-bot.
+// Sub-keys such as user:{wallet}:battles are not renamed by that migration
+// and keep their legacy names.
+
+export function tagged() {
+  return (process.env.REDIS_KEY_LAYOUT || "legacy") === "tagged";
+}
+
+// walletKey("wallet:xp", wallet), walletKey("user", wallet)
+export function walletKey(family, wallet, ...parts) {
+  const tag = tagged() ? `{${wallet}}` : wallet;
+  return [family, tag, ...parts.map(String)].join(":");
+}
+
+// Daily meme counter. Keyed by handle, so the tagged form adds the wallet
+export function memeCountKey(handle, wallet, day) {
+  return tagged() ? `meme_count:{${wallet}}:${handle}:${day}` : `meme_count:${handle}:${day}`;
+}
+
+// Pattern matching every daily meme counter for `day`, in either layout
+export function memeCountPattern(day) {
+  return tagged() ? `meme_count:{*}:*:${day}` : `meme_count:*:${day}`;
+}
+
+// Wallet named by a per-wallet key: "user:{rAbc}" and "user:rAbc" both give "rAbc"
+export function walletFromKey(key, family) {
+  const rest = key.slice(family.length + 1);
+  return rest.startsWith("{") ? rest.slice(1, rest.indexOf("}")) : rest.split(":")[0];
+}
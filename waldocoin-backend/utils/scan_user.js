@@ -1,6 +1,7 @@
 // utils/scan_user.js - JavaScript version of Python scan_user
 import fetch from 'node-fetch';
 import { redis } from '../redisClient.js';
+import { walletKey } from '../utils/redisKeys.js';
 
 const BEARER_TOKEN = process.env.TWITTER_BEARER_TOKEN;
 
@@ -71,17 +72,19 @@ async function storeMemetweet(tweet, handle, wallet) {
     claimed: 0,
     reward_type: "instant",
     stake_selected: 0,
-    stake_release: ""
+    stake_release: "",
+    nft_minted: "false"
   });
 
-  // Additional indexes
-  await redis.sAdd(`wallet:tweets:${wallet}`, tweet.id);
-  await redis.set(`meme:xp:${tweet.id}`, xp);
-  await redis.set(`meme:waldo:${tweet.id}`, waldo);
-  await redis.set(`meme:nft_minted:${tweet.id}`, "false");
+  // Additional indexes (time-ordered, see waldo-twitter-bot/meme_index.py)
+  const score = Date.parse(tweet.created_at) / 1000;
+  await redis.sAdd(walletKey('wallet:tweets', wallet), tweet.id);
+  await redis.zAdd("memes:by_time", { score, value: tweet.id });
+  await redis.zAdd(walletKey('wallet:memes', wallet), { score, value: tweet.id });
+  await redis.incr(walletKey('wallet:version', wallet));
 
   // XP tracking
-  await redis.incrBy(`wallet:xp:${wallet}`, xp);
+  await redis.incrBy(walletKey('wallet:xp', wallet), xp);
   
   // NFT eligibility (60+ XP threshold)
   if (xp >= 60) {
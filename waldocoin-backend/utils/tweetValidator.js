@@ -1,4 +1,6 @@
 import { redis } from "../redisClient.js";
+import { walletKey } from "../utils/redisKeys.js";
+import { getMeme } from "./memeArchive.js";
 import { TwitterApi } from "twitter-api-v2";
 
 console.log("🧩 Loaded: utils/tweetValidator.js");
@@ -32,7 +34,7 @@ export async function validateTweetForBattle(tweetId, userWallet) {
     }
 
     // 2. Check if tweet belongs to user's wallet in our system
-    const userTweets = await redis.sMembers(`wallet:tweets:${userWallet}`);
+    const userTweets = await redis.sMembers(walletKey("wallet:tweets", userWallet));
     if (!userTweets.includes(tweetId)) {
       return {
         valid: false,
@@ -41,7 +43,7 @@ export async function validateTweetForBattle(tweetId, userWallet) {
     }
 
     // 3. Check if tweet exists in our meme database
-    const memeData = await redis.hGetAll(`meme:${tweetId}`);
+    const memeData = await getMeme(tweetId);
     if (!memeData || Object.keys(memeData).length === 0) {
       return {
         valid: false,
@@ -177,7 +179,7 @@ async function isTweetInActiveBattle(tweetId) {
  */
 export async function validateTweetOwnership(tweetId, userWallet) {
   try {
-    const userTweets = await redis.sMembers(`wallet:tweets:${userWallet}`);
+    const userTweets = await redis.sMembers(walletKey("wallet:tweets", userWallet));
     return userTweets.includes(tweetId);
   } catch (error) {
     console.error(`❌ Error validating tweet ownership:`, error);
@@ -192,7 +194,7 @@ export async function validateTweetOwnership(tweetId, userWallet) {
  */
 export async function getTweetDataForBattle(tweetId) {
   try {
-    const memeData = await redis.hGetAll(`meme:${tweetId}`);
+    const memeData = await getMeme(tweetId);
     
     if (!memeData || Object.keys(memeData).length === 0) {
       return null;